@@ -285,7 +285,14 @@ router.post("/detect-grid", auth(["owner"]), async (req, res) => {
  * Start AI Detection - Backend-owned camera
  */
 router.post("/start-detection", auth(["owner"]), async (req, res) => {
-  const { parking_spot_id, grid_config } = req.body;
+  const {
+    parking_spot_id,
+    grid_config,
+    annotated_frames,
+    stream_output,
+    preview,
+    ensemble,
+  } = req.body;
 
   if (!parking_spot_id) {
     return res.status(400).json({
@@ -325,6 +332,10 @@ router.post("/start-detection", auth(["owner"]), async (req, res) => {
             parking_spot_id,
             grid_config,
             slot_mapping,
+            annotated_frames,
+            stream_output,
+            preview,
+            ensemble,
           },
           { timeout: 10000 },
         );
@@ -516,5 +527,24 @@ router.get("/stream/:spot_id", auth(["owner"]), (req, res) => {
   }
 });
 
+/**
+ * Annotated MJPEG Stream Proxy - Python encodes each annotated frame once
+ * and shares it between all viewers
+ */
+router.get("/processed-stream/:spot_id", auth(["owner"]), (req, res) => {
+  const { spot_id } = req.params;
+
+  if (!activeSessions.has(parseInt(spot_id))) {
+    return res.status(404).json({ error: "No active detection session" });
+  }
+
+  const proxy = new MjpegProxy(`${PYTHON_AI_SERVER}/stream/${spot_id}`);
+  proxy.proxyRequest(req, res);
+
+  req.on("close", () => {
+    console.log(`📹 Annotated stream closed for spot ${spot_id}`);
+  });
+});
+
 module.exports = router;
 module.exports.setSocketIO = setSocketIO;
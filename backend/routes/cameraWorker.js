@@ -35,6 +35,14 @@ function startCameraWorker({ spotId, cameraUrl, pythonServer, io }) {
   let request = null;
   let isProcessing = false; // 🚀 Prevent overlapping requests
 
+  // Delta responses: Python only sends slots changed after ackSeq
+  let ackSeq = null;
+  let slots = {};
+  let numSlots = 0;
+
+  // Geometry response mode: slot outlines arrive once, the browser draws them
+  let geometry = null;
+
   // Create MJPEG consumer
   const camera = new MjpegConsumer();
 
@@ -82,18 +90,15 @@ function startCameraWorker({ spotId, cameraUrl, pythonServer, io }) {
       isProcessing = true;
       lastProcessTime = now;
 
-      // Convert buffer to base64
-      const base64Frame = frameBuffer.toString("base64");
-
-      // Send to Python AI server with shorter timeout
+      // Send raw JPEG bytes to Python AI server (no base64/JSON overhead)
       const response = await axios.post(
         `${pythonServer}/process-frame`,
+        frameBuffer,
         {
-          spot_id: spotId,
-          frame: base64Frame,
-          timestamp: now,
+          params: { spot_id: spotId, timestamp: now, delta: 1, ack_seq: ackSeq },
+          headers: { "Content-Type": "image/jpeg" },
+          timeout: 3000, // Reduced timeout for faster failure
         },
-        { timeout: 3000 }, // Reduced timeout for faster failure
       );
 
       isProcessing = false;
@@ -108,20 +113,43 @@ function startCameraWorker({ spotId, cameraUrl, pythonServer, io }) {
         });
       }
 
-      // Broadcast occupancy data
-      if (response.data.occupancy) {
+      if (response.data.geometry) {
+        geometry = response.data.geometry;
+        io.to(`spot_${spotId}`).emit("slot_geometry", {
+          spot_id: spotId,
+          geometry,
+        });
+      }
+
+      // Merge occupancy delta; broadcast only when a slot changed.
+      // A response without seq comes from a server without delta support:
+      // treat it as a full snapshot and keep sending without an ack.
+      const delta = response.data.occupancy?.slots || {};
+      const full = response.data.full || response.data.seq === undefined;
+      if (full) {
+        slots = {};
+        numSlots = response.data.num_slots ?? Object.keys(delta).length;
+      }
+      Object.assign(slots, delta);
+      ackSeq = response.data.seq ?? null;
+
+      if (full || Object.keys(delta).length > 0) {
         io.to(`spot_${spotId}`).emit("occupancy_update", {
           spot_id: spotId,
-          occupancy: response.data.occupancy,
-          num_slots: response.data.num_slots,
+          occupancy: { slots },
+          num_slots: numSlots,
         });
       }
 
-      // If state changed, broadcast that too
-      if (response.data.state_change) {
+      // Broadcast every state change (several slots can flip in one frame);
+      // older servers only report the last one as state_change
+      const stateChanges =
+        response.data.state_changes ||
+        (response.data.state_change ? [response.data.state_change] : []);
+      for (const change of stateChanges) {
         io.to(`spot_${spotId}`).emit("state_change", {
           spot_id: spotId,
-          change: response.data.state_change,
+          change,
         });
       }
 
@@ -136,6 +164,19 @@ function startCameraWorker({ spotId, cameraUrl, pythonServer, io }) {
           spot_id: spotId,
           fps: currentFps,
         });
+
+        // Periodic full occupancy for viewers that joined since the last change
+        io.to(`spot_${spotId}`).emit("occupancy_update", {
+          spot_id: spotId,
+          occupancy: { slots },
+          num_slots: numSlots,
+        });
+        if (geometry) {
+          io.to(`spot_${spotId}`).emit("slot_geometry", {
+            spot_id: spotId,
+            geometry,
+          });
+        }
       }
 
       // Reset error counter on success
@@ -25,6 +25,11 @@ function AICameraSetup() {
   const [fps, setFps] = useState(0);
   const [occupancyStatus, setOccupancyStatus] = useState({});
   const [processedFrame, setProcessedFrame] = useState(null);
+  const [slotGeometry, setSlotGeometry] = useState(null);
+  // Opt-in: draw slot overlays in the browser instead of server-annotated frames
+  const [clientOverlay, setClientOverlay] = useState(
+    () => localStorage.getItem("aiClientOverlay") === "true",
+  );
   const [totalSlots, setTotalSlots] = useState(0);
   const [isLoading, setIsLoading] = useState(true);
 
@@ -55,6 +60,7 @@ function AICameraSetup() {
   const canvasRef = useRef(null);
   const drawingCanvasRef = useRef(null);
   const frozenCanvasRef = useRef(null);
+  const overlayCanvasRef = useRef(null);
   const socketRef = useRef(null);
 
   const token = localStorage.getItem("token");
@@ -222,6 +228,12 @@ function AICameraSetup() {
       }
     });
 
+    socketRef.current.on("slot_geometry", (data) => {
+      if (data.spot_id == spotId && data.geometry) {
+        setSlotGeometry(data.geometry);
+      }
+    });
+
     socketRef.current.on("processed_frame", (data) => {
       if (data.spot_id == spotId && data.frame) {
         setProcessedFrame(data.frame);
@@ -773,11 +785,16 @@ function AICameraSetup() {
         body: JSON.stringify({
           parking_spot_id: spotId,
           grid_config: gridConfig,
+          // Client overlay: server sends slot geometry + statuses and we draw
+          // over the live stream; otherwise the server's default annotated frames
+          ...(clientOverlay && { annotated_frames: "geometry" }),
         }),
       });
 
       const result = await res.json();
       if (result.success) {
+        setProcessedFrame(null);
+        setSlotGeometry(null);
         setIsDetecting(true);
         setIsFrozen(false);
         setFrozenImage(null);
@@ -858,6 +875,60 @@ function AICameraSetup() {
     }
   }, [isFrozen, frozenImage]);
 
+  // Draw slot statuses over the live stream (geometry response mode)
+  useEffect(() => {
+    const canvas = overlayCanvasRef.current;
+    if (!canvas || !slotGeometry) return;
+
+    const [frameW, frameH] = slotGeometry.frame_size;
+    canvas.width = videoRef.current?.naturalWidth || frameW;
+    canvas.height = videoRef.current?.naturalHeight || frameH;
+
+    const ctx = canvas.getContext("2d");
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+    const slots = occupancyStatus?.slots || {};
+    let occupied = 0;
+
+    Object.entries(slotGeometry.slots).forEach(([slotNum, geom]) => {
+      const status = slots[slotNum]?.status;
+      if (status === "occupied") occupied++;
+      const color = status === "occupied" ? "#FF0000" : "#00FF00";
+
+      ctx.strokeStyle = color;
+      ctx.lineWidth = 2;
+      ctx.beginPath();
+      if (geom.corners_normalized) {
+        geom.corners_normalized.forEach((c, i) => {
+          const x = c.x * canvas.width;
+          const y = c.y * canvas.height;
+          if (i === 0) ctx.moveTo(x, y);
+          else ctx.lineTo(x, y);
+        });
+        ctx.closePath();
+      } else {
+        const [x1, y1, x2, y2] = geom.bbox_normalized;
+        ctx.rect(
+          x1 * canvas.width,
+          y1 * canvas.height,
+          (x2 - x1) * canvas.width,
+          (y2 - y1) * canvas.height,
+        );
+      }
+      ctx.stroke();
+
+      const [lx, ly] = geom.bbox_normalized;
+      ctx.fillStyle = color;
+      ctx.font = "bold 16px Arial";
+      ctx.fillText(`#${slotNum}`, lx * canvas.width + 4, ly * canvas.height + 18);
+    });
+
+    const total = Object.keys(slotGeometry.slots).length;
+    ctx.fillStyle = "#FFFFFF";
+    ctx.font = "bold 18px Arial";
+    ctx.fillText(`O:${occupied}/${total}`, 10, 25);
+  }, [slotGeometry, occupancyStatus]);
+
   // Redraw when rectangles or AOI change
   useEffect(() => {
     if (drawingCanvasRef.current) {
@@ -1440,6 +1511,27 @@ function AICameraSetup() {
             <>
               <hr />
               <h4>🚀 Detection</h4>
+              <label
+                style={{
+                  display: "flex",
+                  alignItems: "center",
+                  gap: "8px",
+                  fontSize: "13px",
+                  marginBottom: "8px",
+                  color: isDetecting ? "#9ca3af" : "#374151",
+                }}
+              >
+                <input
+                  type="checkbox"
+                  checked={clientOverlay}
+                  disabled={isDetecting}
+                  onChange={(e) => {
+                    setClientOverlay(e.target.checked);
+                    localStorage.setItem("aiClientOverlay", e.target.checked);
+                  }}
+                />
+                Draw overlay in browser (no annotated frames from server)
+              </label>
               {!isDetecting ? (
                 <button
                   onClick={startDetection}
@@ -1514,6 +1606,22 @@ function AICameraSetup() {
               />
             )}
 
+            {/* Client-side slot overlay (geometry response mode) */}
+            {isDetecting && slotGeometry && !processedFrame && (
+              <canvas
+                ref={overlayCanvasRef}
+                style={{
+                  position: "absolute",
+                  top: "50%",
+                  left: "50%",
+                  transform: "translate(-50%, -50%)",
+                  maxWidth: "100%",
+                  maxHeight: "100%",
+                  pointerEvents: "none",
+                }}
+              />
+            )}
+
             {/* Frozen Frame */}
             {isFrozen && frozenImage && (
               <>
@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import torch
 from PIL import Image
@@ -7,29 +7,60 @@ import numpy as np
 from transformers import AutoProcessor, AutoModelForCausalLM
 import base64
 from io import BytesIO
-from collections import deque
+from collections import Counter, deque
 from typing import Any, cast, Optional, Tuple, List
 import time
 import traceback
 import random
 import os
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Import our new YOLO grid detector
 from yolo_grid_detector import (
     load_yolo_model,
     detect_grid_static_approach,
     decode_base64_image,
-    encode_frame_to_base64,
+    decode_base64_bytes,
+    decode_image_bytes,
+    jpeg_to_data_url,
     calculate_normalized_coordinates
 )
+from frame_decoder import SUPPORTED_SCALES, choose_decode_scale, scale_bbox, reduced_size
+from frame_ingest import read_frame_request, read_batch_frame_request, resolve_spot_id
+from frame_channel import ChannelClosed, FrameChannel
+from mjpeg_capture import MjpegCapture
+from frame_ring import SharedFrameRing, ring_name_for_spot
+from frame_dedup import FrameDeduplicator
+from occupancy_delta import OccupancyDeltaLog
+from frame_policy import AnnotatedFramePolicy, build_slot_geometry
+from overlay_cache import OverlayCache
+from mjpeg_broadcast import FrameBroadcaster, MJPEG_MIMETYPE
+from preview_encoder import PreviewEncoder
+from frame_features import FrameFeatures, RegionFeatures
+from slot_normalizer import SlotNormalizer
+from background_model import BackgroundModel
+from reference_adapter import ReferenceAdapter
+from change_gate import ChangeGate
+from motion_tiles import MotionTiles
+from slot_stats import compute_slot_stats
+
+# Optional WebSocket support for the streaming frame channel
+try:
+    from flask_sock import Sock  # type: ignore
+except ImportError:
+    Sock = None
 
 app = Flask(__name__)
 CORS(app)
+SOCK = Sock(app) if Sock is not None else None
 
 # Thread pool for parallel slot processing
 SLOT_EXECUTOR = ThreadPoolExecutor(max_workers=4)
 
+# Thread pool for processing many spots from one /process-frames batch
+SPOT_EXECUTOR = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 4) * 2))
+
 # ============================================================
 # GLOBAL MODELS - Load ONCE at startup for efficiency
 # ============================================================
@@ -97,7 +128,12 @@ def load_global_model():
 # VEHICLE DETECTION - Multiple Methods
 # ============================================================
 
-def detect_vehicle_color_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+# Gradient-magnitude thresholds the voters compare against (mean / std / max)
+GRADIENT_THRESHOLDS = (12, 15, 25, 30, 35, 100)
+
+
+def detect_vehicle_color_based(slot_region_bgr: np.ndarray,
+                               features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Detect vehicle based on color intensity (works for colored toy cars).
     SHADOW-ROBUST: Focuses on hue and saturation, ignores brightness changes.
@@ -105,19 +141,15 @@ def detect_vehicle_color_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float
     Returns: (is_occupied, confidence)
     """
     try:
-        # Convert to HSV for better color detection
-        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        features = RegionFeatures.of(slot_region_bgr, features)
         
         # Calculate mean saturation and value
-        mean_saturation = float(np.mean(hsv[:, :, 1]))  # type: ignore
-        mean_value = float(np.mean(hsv[:, :, 2]))  # type: ignore
-        std_saturation = float(np.std(hsv[:, :, 1]))  # type: ignore
-        std_value = float(np.std(hsv[:, :, 2]))  # type: ignore
+        mean_saturation, std_saturation = features.mean_std("sat")
+        mean_value, std_value = features.mean_std("val")
         
         # Structural white-object detection using edges
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 80, 200)
-        edge_density = np.sum(edges > 0) / edges.size
+        edges = features.edges(80, 200)
+        edge_density = cv2.countNonZero(edges) / edges.size
         
         # If significant hard edges exist, it's a real object (not shadow)
         if edge_density > 0.04:
@@ -144,30 +176,29 @@ def detect_vehicle_color_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float
         return False, 0.5
 
 
-def detect_vehicle_texture_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+def detect_vehicle_texture_based(slot_region_bgr: np.ndarray,
+                                 features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Detect vehicle based on texture/edge density.
     SHADOW-ROBUST: Filters out soft shadow edges, focuses on hard object edges.
     """
     try:
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        gray_blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        features = RegionFeatures.of(slot_region_bgr, features)
+        gray = features.gray
+        gray_blurred = features.blurred
         
-        edges_strong = cv2.Canny(gray_blurred, 90, 220)
-        edges_weak = cv2.Canny(gray_blurred, 20, 60)
+        edges_strong = features.edges(90, 220, blurred=True)
+        edges_weak = features.edges(20, 60, blurred=True)
         
-        strong_edge_density = np.sum(edges_strong > 0) / edges_strong.size
-        weak_edge_density = np.sum(edges_weak > 0) / edges_weak.size
+        strong_edge_density = cv2.countNonZero(edges_strong) / edges_strong.size
+        weak_edge_density = cv2.countNonZero(edges_weak) / edges_weak.size
         
         edge_ratio = strong_edge_density / (weak_edge_density + 0.001)
         
         laplacian = cv2.Laplacian(gray_blurred, cv2.CV_64F)
         texture_var = float(np.var(laplacian))  # type: ignore
         
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
-        gradient_std = float(np.std(gradient_magnitude))  # type: ignore
+        _, gradient_std, _ = features.gradient_stats(GRADIENT_THRESHOLDS)
         
         # Circular object detection
         circles = cv2.HoughCircles(
@@ -209,7 +240,9 @@ def detect_vehicle_texture_based(slot_region_bgr: np.ndarray) -> Tuple[bool, flo
 
 
 def detect_vehicle_difference_based(slot_region_bgr: np.ndarray, 
-                                    reference_region_bgr: Optional[np.ndarray]) -> Tuple[bool, float]:
+                                    reference_region_bgr: Optional[np.ndarray],
+                                    features: Optional[RegionFeatures] = None,
+                                    reference_features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Detect vehicle by comparing with reference (empty) image.
     SHADOW-ROBUST: Uses normalized color space and hue comparison.
@@ -218,15 +251,19 @@ def detect_vehicle_difference_based(slot_region_bgr: np.ndarray,
         return False, 0.5
     
     try:
+        features = RegionFeatures.of(slot_region_bgr, features)
+        
         if slot_region_bgr.shape != reference_region_bgr.shape:
             reference_region_bgr = cv2.resize(reference_region_bgr, 
                                              (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
         
+        reference = RegionFeatures.of(reference_region_bgr, reference_features)
+        
         diff_bgr = cv2.absdiff(slot_region_bgr, reference_region_bgr)
         gray_diff = cv2.cvtColor(diff_bgr, cv2.COLOR_BGR2GRAY)
         
-        hsv_current = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
-        hsv_reference = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+        hsv_current = features.hsv
+        hsv_reference = reference.hsv
         
         hue_diff = cv2.absdiff(hsv_current[:, :, 0], hsv_reference[:, :, 0])
         hue_diff = np.minimum(hue_diff, 180 - hue_diff)
@@ -244,17 +281,14 @@ def detect_vehicle_difference_based(slot_region_bgr: np.ndarray,
             mean_sat_diff < 40
         )
         
-        gray_current = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        gray_reference = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2GRAY)
-        
-        edges_current = cv2.Canny(gray_current, 30, 100)
-        edges_reference = cv2.Canny(gray_reference, 30, 100)
+        edges_current = features.edges(30, 100)
+        edges_reference = reference.edges(30, 100)
         
         edge_diff = cv2.absdiff(edges_current, edges_reference)
         new_edges_ratio = np.sum(edge_diff > 0) / edge_diff.size
         
-        current_edge_density = np.sum(edges_current > 0) / edges_current.size
-        reference_edge_density = np.sum(edges_reference > 0) / edges_reference.size
+        current_edge_density = cv2.countNonZero(edges_current) / edges_current.size
+        reference_edge_density = cv2.countNonZero(edges_reference) / edges_reference.size
         edge_increase = current_edge_density - reference_edge_density
         
         if new_edges_ratio > 0.03 and edge_increase > 0.02:
@@ -277,10 +311,8 @@ def detect_vehicle_difference_based(slot_region_bgr: np.ndarray,
         elif bgr_change_ratio > 0.35 and hs_change_ratio > 0.1:
             return True, 0.65
         
-        std_current = float(np.std(gray_current))  # type: ignore
-        std_reference = float(np.std(gray_reference))  # type: ignore
-        mean_current = float(np.mean(gray_current))  # type: ignore
-        mean_reference = float(np.mean(gray_reference))  # type: ignore
+        mean_current, std_current = features.mean_std("gray")
+        mean_reference, std_reference = reference.mean_std("gray")
         
         if mean_current > mean_reference + 20 and std_current < std_reference - 10:
             return True, 0.65
@@ -293,28 +325,29 @@ def detect_vehicle_difference_based(slot_region_bgr: np.ndarray,
 
 
 def detect_shadow(slot_region_bgr: np.ndarray, 
-                  reference_region_bgr: Optional[np.ndarray] = None) -> Tuple[bool, float]:
+                  reference_region_bgr: Optional[np.ndarray] = None,
+                  features: Optional[RegionFeatures] = None,
+                  reference_features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Dedicated shadow detection to filter out false positives.
     Returns: (is_shadow, confidence)
     """
     try:
-        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        features = RegionFeatures.of(slot_region_bgr, features)
+        hsv = features.hsv
         
-        mean_sat = float(np.mean(hsv[:, :, 1]))  # type: ignore
-        mean_val = float(np.mean(hsv[:, :, 2]))  # type: ignore
-        std_val = float(np.std(hsv[:, :, 2]))  # type: ignore
+        mean_sat, _ = features.mean_std("sat")
+        mean_val, std_val = features.mean_std("val")
         
         sat_check = mean_sat < 30
         val_check = 40 < mean_val < 170
         uniformity_check = std_val < 35
         
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        edges_strong = cv2.Canny(gray, 90, 220)
-        edges_weak = cv2.Canny(gray, 30, 80)
+        edges_strong = features.edges(90, 220)
+        edges_weak = features.edges(30, 80)
         
-        strong_edge_ratio = np.sum(edges_strong > 0) / edges_strong.size
-        weak_edge_ratio = np.sum(edges_weak > 0) / edges_weak.size
+        strong_edge_ratio = cv2.countNonZero(edges_strong) / edges_strong.size
+        weak_edge_ratio = cv2.countNonZero(edges_weak) / edges_weak.size
         
         soft_edge_check = (weak_edge_ratio > 0.02 and strong_edge_ratio < 0.03)
         
@@ -325,7 +358,7 @@ def detect_shadow(slot_region_bgr: np.ndarray,
                     reference_region_bgr = cv2.resize(reference_region_bgr, 
                                                      (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
                 
-                hsv_ref = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+                hsv_ref = RegionFeatures.of(reference_region_bgr, reference_features).hsv
                 
                 hue_diff = cv2.absdiff(hsv[:, :, 0], hsv_ref[:, :, 0])
                 hue_diff = np.minimum(hue_diff, 180 - hue_diff)
@@ -356,7 +389,8 @@ def detect_shadow(slot_region_bgr: np.ndarray,
 
 
 def detect_rapid_motion(current_region_bgr: np.ndarray, 
-                        previous_region_bgr: Optional[np.ndarray]) -> Tuple[bool, float]:
+                        previous_region_bgr: Optional[np.ndarray],
+                        features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Detect rapid motion that indicates a hand or moving object passing through.
     Returns: (is_rapid_motion, motion_level)
@@ -369,7 +403,7 @@ def detect_rapid_motion(current_region_bgr: np.ndarray,
             return False, 0.0
         
         # Convert to grayscale
-        gray_current = cv2.cvtColor(current_region_bgr, cv2.COLOR_BGR2GRAY)
+        gray_current = RegionFeatures.of(current_region_bgr, features).gray
         gray_previous = cv2.cvtColor(previous_region_bgr, cv2.COLOR_BGR2GRAY)
         
         # Calculate frame difference
@@ -420,18 +454,26 @@ def detect_skin_tone(region_bgr: np.ndarray) -> Tuple[bool, float]:
 def detect_vehicle_ensemble(slot_region_bgr: np.ndarray, 
                            reference_region_bgr: Optional[np.ndarray] = None,
                            previous_region_bgr: Optional[np.ndarray] = None,
-                           use_ai: bool = True) -> Tuple[bool, float, bool]:
+                           use_ai: bool = True,
+                           features: Optional[RegionFeatures] = None,
+                           reference_features: Optional[RegionFeatures] = None,
+                           foreground_ratio: Optional[float] = None) -> Tuple[bool, float, bool]:
     """
     🚀 OPTIMIZED FAST DETECTION - Single pass, minimal conversions
     Target: 30+ FPS by reducing redundant operations
+    features: the slot's view of the frame-level planes (computed here if None)
+    reference_features: the tracker's precomputed reference planes
+    foreground_ratio: the slot's share of background-model foreground, used
+        instead of the reference comparison when given
     Returns: (is_occupied, confidence, is_shadow)
     """
     try:
-        # === SINGLE COLOR CONVERSION (do once, reuse) ===
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        # === SHARED COLOR PLANES (converted once per frame, not per slot) ===
+        features = RegionFeatures.of(slot_region_bgr, features)
+        gray = features.gray
+        hsv = features.hsv
         
-        h, s, v = hsv[:, :, 0], hsv[:, :, 1], hsv[:, :, 2]
+        s, v = hsv[:, :, 1], hsv[:, :, 2]
         
         # === FAST STATISTICS (vectorized) ===
         mean_sat = float(np.mean(s))
@@ -439,10 +481,11 @@ def detect_vehicle_ensemble(slot_region_bgr: np.ndarray,
         std_val = float(np.std(v))
         
         # === SINGLE EDGE DETECTION ===
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+        edges = features.edges(50, 150)
+        edge_density = cv2.countNonZero(edges) / edges.size
         
-        # === RAPID MOTION CHECK (lightweight) ===
+        # === RAPID MOTION (lightweight) ===
+        motion_level = motion_ratio = None
         if previous_region_bgr is not None:
             try:
                 if slot_region_bgr.shape == previous_region_bgr.shape:
@@ -450,90 +493,154 @@ def detect_vehicle_ensemble(slot_region_bgr: np.ndarray,
                     diff = cv2.absdiff(gray, gray_prev)
                     motion_level = float(np.mean(diff))
                     motion_ratio = np.sum(diff > 30) / diff.size
-                    
-                    # Rapid motion = transient object (hand)
-                    if motion_level > 35.0 and motion_ratio > 0.25:
-                        return False, 0.8, False
             except:
                 pass
         
-        # === SHADOW DETECTION (fast check) ===
-        is_shadow = False
-        shadow_conf = 0.0
-        
-        # Shadows: low saturation, uniform, few edges
-        if mean_sat < 30 and std_val < 30 and edge_density < 0.02:
-            is_shadow = True
-            shadow_conf = 0.85
-            return False, shadow_conf, True
-        
-        # === FAST OCCUPANCY DETECTION ===
-        score = 0.0
-        
-        # Edge-based (objects have structure)
-        if edge_density > 0.03:
-            score += 0.25
-        if edge_density > 0.06:
-            score += 0.25
-        
-        # Color saturation (colored objects)
-        if mean_sat > 40:
-            score += 0.2
-        if mean_sat > 70:
-            score += 0.15
-        
-        # Texture variance
-        if std_val > 25:
-            score += 0.15
-        
-        # Reference comparison (if available)
-        if reference_region_bgr is not None:
+        # === REFERENCE COMPARISON (if available) ===
+        diff_ratio = foreground_ratio
+        if diff_ratio is None and reference_region_bgr is not None:
             try:
                 if slot_region_bgr.shape == reference_region_bgr.shape:
-                    ref_gray = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2GRAY)
+                    ref_gray = RegionFeatures.of(reference_region_bgr, reference_features).gray
                     diff = cv2.absdiff(gray, ref_gray)
                     diff_ratio = np.sum(diff > 40) / diff.size
-                    
-                    if diff_ratio > 0.15:
-                        score += 0.3
-                    if diff_ratio > 0.30:
-                        score += 0.2
             except:
                 pass
         
-        # Dark object detection
-        if mean_val < 60 and edge_density > 0.02:
-            score += 0.2
-        
-        # White/bright object detection
-        if mean_val > 200 and edge_density > 0.02:
-            score += 0.2
-        
-        is_occupied = score >= 0.45
-        confidence = min(0.95, 0.5 + score * 0.5)
-        
-        return is_occupied, confidence, is_shadow
+        return ensemble_decision(mean_sat, mean_val, std_val, edge_density,
+                                 diff_ratio, motion_level, motion_ratio)
         
     except Exception as e:
         return False, 0.5, False
 
 
+def ensemble_decision(mean_sat: float, mean_val: float, std_val: float, edge_density: float,
+                      diff_ratio: Optional[float] = None,
+                      motion_level: Optional[float] = None,
+                      motion_ratio: Optional[float] = None) -> Tuple[bool, float, bool]:
+    """
+    Fast ensemble verdict from one slot's statistics, however they were computed
+    (per-crop in detect_vehicle_ensemble, integral images in slot_stats).
+    diff_ratio / motion_*: None without a reference / previous frame.
+    Returns: (is_occupied, confidence, is_shadow)
+    """
+    # Rapid motion = transient object (hand)
+    if motion_level is not None and motion_level > 35.0 and motion_ratio > 0.25:
+        return False, 0.8, False
+    
+    # === SHADOW DETECTION (fast check) ===
+    # Shadows: low saturation, uniform, few edges
+    if mean_sat < 30 and std_val < 30 and edge_density < 0.02:
+        return False, 0.85, True
+    
+    # === FAST OCCUPANCY DETECTION ===
+    score = 0.0
+    
+    # Edge-based (objects have structure)
+    if edge_density > 0.03:
+        score += 0.25
+    if edge_density > 0.06:
+        score += 0.25
+    
+    # Color saturation (colored objects)
+    if mean_sat > 40:
+        score += 0.2
+    if mean_sat > 70:
+        score += 0.15
+    
+    # Texture variance
+    if std_val > 25:
+        score += 0.15
+    
+    # Reference comparison
+    if diff_ratio is not None:
+        if diff_ratio > 0.15:
+            score += 0.3
+        if diff_ratio > 0.30:
+            score += 0.2
+    
+    # Dark object detection
+    if mean_val < 60 and edge_density > 0.02:
+        score += 0.2
+    
+    # White/bright object detection
+    if mean_val > 200 and edge_density > 0.02:
+        score += 0.2
+    
+    is_occupied = score >= 0.45
+    confidence = min(0.95, 0.5 + score * 0.5)
+    
+    return is_occupied, confidence, False
+
+
+def ensemble_decisions(mean_sat: np.ndarray, mean_val: np.ndarray, std_val: np.ndarray,
+                       edge_density: np.ndarray,
+                       diff_ratio: Optional[np.ndarray] = None,
+                       motion_level: Optional[np.ndarray] = None,
+                       motion_ratio: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ensemble_decision for all slots at once: same thresholds, weights and
+    summation order as vector ops, so results are identical per slot.
+    diff_ratio / motion_*: None (or NaN entries) without a reference / previous frame.
+    Returns: (is_occupied, confidence, is_shadow) arrays
+    """
+    mean_sat = np.asarray(mean_sat, dtype=np.float64)
+    mean_val = np.asarray(mean_val, dtype=np.float64)
+    std_val = np.asarray(std_val, dtype=np.float64)
+    edge_density = np.asarray(edge_density, dtype=np.float64)
+    
+    rapid_motion = np.zeros(mean_sat.shape, dtype=bool)
+    if motion_level is not None:
+        rapid_motion = (np.asarray(motion_level, dtype=np.float64) > 35.0) & \
+                       (np.asarray(motion_ratio, dtype=np.float64) > 0.25)
+    
+    shadow = ~rapid_motion & (mean_sat < 30) & (std_val < 30) & (edge_density < 0.02)
+    
+    # Adding 0.0 leaves a float unchanged, so this matches the scalar if-chain exactly
+    score = np.zeros(mean_sat.shape, dtype=np.float64)
+    score += np.where(edge_density > 0.03, 0.25, 0.0)
+    score += np.where(edge_density > 0.06, 0.25, 0.0)
+    score += np.where(mean_sat > 40, 0.2, 0.0)
+    score += np.where(mean_sat > 70, 0.15, 0.0)
+    score += np.where(std_val > 25, 0.15, 0.0)
+    if diff_ratio is not None:
+        diff_ratio = np.asarray(diff_ratio, dtype=np.float64)
+        score += np.where(diff_ratio > 0.15, 0.3, 0.0)
+        score += np.where(diff_ratio > 0.30, 0.2, 0.0)
+    score += np.where((mean_val < 60) & (edge_density > 0.02), 0.2, 0.0)
+    score += np.where((mean_val > 200) & (edge_density > 0.02), 0.2, 0.0)
+    
+    decided = rapid_motion | shadow
+    is_occupied = (score >= 0.45) & ~decided
+    confidence = np.minimum(0.95, 0.5 + score * 0.5)
+    confidence = np.where(shadow, 0.85, confidence)
+    confidence = np.where(rapid_motion, 0.8, confidence)
+    
+    return is_occupied, confidence, shadow
+
+
 def detect_vehicle_ensemble_full(slot_region_bgr: np.ndarray, 
                            reference_region_bgr: Optional[np.ndarray] = None,
                            previous_region_bgr: Optional[np.ndarray] = None,
-                           use_ai: bool = True) -> Tuple[bool, float, bool]:
+                           use_ai: bool = True,
+                           features: Optional[RegionFeatures] = None,
+                           reference_features: Optional[RegionFeatures] = None) -> Tuple[bool, float, bool]:
     """
-    FULL Ensemble detection - used only every Nth frame for accuracy validation.
+    FULL Ensemble detection - the accurate voter set (start-detection "ensemble": "full").
+    All methods share one set of planes, edge maps, gradient and plane stats,
+    each computed once per slot.
     Returns: (is_occupied, confidence, is_shadow)
     """
+    features = RegionFeatures.of(slot_region_bgr, features)
     
     # First check for rapid motion (hand passing through)
-    is_rapid_motion, motion_level = detect_rapid_motion(slot_region_bgr, previous_region_bgr)
+    is_rapid_motion, motion_level = detect_rapid_motion(slot_region_bgr, previous_region_bgr, features)
     if is_rapid_motion:
         return False, 0.8, False
     
     # Check if this is likely a shadow (dark area with no internal structure)
-    is_shadow_region, shadow_confidence = is_likely_shadow(slot_region_bgr, reference_region_bgr)
+    is_shadow_region, shadow_confidence = is_likely_shadow(slot_region_bgr, reference_region_bgr, features,
+                                                              reference_features)
     
     if is_shadow_region and shadow_confidence > 0.75:
         return False, shadow_confidence, True
@@ -543,25 +650,25 @@ def detect_vehicle_ensemble_full(slot_region_bgr: np.ndarray,
     weights = []
     
     # Method 1: Color-based detection
-    is_occ_color, conf_color = detect_vehicle_color_based(slot_region_bgr)
+    is_occ_color, conf_color = detect_vehicle_color_based(slot_region_bgr, features)
     votes.append(is_occ_color)
     confidences.append(conf_color)
     weights.append(1.5)
     
     # Method 2: Texture-based detection
-    is_occ_texture, conf_texture = detect_vehicle_texture_based(slot_region_bgr)
+    is_occ_texture, conf_texture = detect_vehicle_texture_based(slot_region_bgr, features)
     votes.append(is_occ_texture)
     confidences.append(conf_texture)
     weights.append(1.5)
     
     # Method 3: Simple object detection (edges, gradients, structure)
-    is_occ_simple, conf_simple = detect_object_simple(slot_region_bgr)
+    is_occ_simple, conf_simple = detect_object_simple(slot_region_bgr, features)
     votes.append(is_occ_simple)
     confidences.append(conf_simple)
     weights.append(2.0)
     
     # Method 4: Internal structure check (real objects have internal edges)
-    has_structure, structure_conf = has_internal_structure(slot_region_bgr)
+    has_structure, structure_conf = has_internal_structure(slot_region_bgr, features)
     votes.append(has_structure)
     confidences.append(structure_conf)
     weights.append(2.5)  # High weight - this is key for shadow rejection
@@ -586,7 +693,9 @@ def detect_vehicle_ensemble_full(slot_region_bgr: np.ndarray,
 
 
 def is_likely_shadow(slot_region_bgr: np.ndarray, 
-                     reference_region_bgr: Optional[np.ndarray] = None) -> Tuple[bool, float]:
+                     reference_region_bgr: Optional[np.ndarray] = None,
+                     features: Optional[RegionFeatures] = None,
+                     reference_features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Determine if a region is likely a shadow rather than an object.
     
@@ -597,21 +706,20 @@ def is_likely_shadow(slot_region_bgr: np.ndarray,
     - No distinct internal structure
     """
     try:
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
-        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        features = RegionFeatures.of(slot_region_bgr, features)
+        hsv = features.hsv
         
         # Check 1: Internal edge density (shadows have few internal edges)
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+        edges = features.edges(50, 150)
+        edge_density = cv2.countNonZero(edges) / edges.size
         low_edges = edge_density < 0.02  # Shadows have very few internal edges
         
         # Check 2: Color uniformity (shadows are uniformly dark)
-        val_std = float(np.std(hsv[:, :, 2]))
-        sat_std = float(np.std(hsv[:, :, 1]))
+        mean_val, val_std = features.mean_std("val")
+        mean_sat, sat_std = features.mean_std("sat")
         uniform_color = val_std < 30 and sat_std < 25
         
         # Check 3: Low saturation overall (shadows desaturate colors)
-        mean_sat = float(np.mean(hsv[:, :, 1]))
         low_saturation = mean_sat < 50
         
         # Check 4: If we have reference, check if only brightness changed
@@ -622,7 +730,8 @@ def is_likely_shadow(slot_region_bgr: np.ndarray,
                     reference_region_bgr = cv2.resize(reference_region_bgr, 
                                                      (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
                 
-                hsv_ref = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+                reference = RegionFeatures.of(reference_region_bgr, reference_features)
+                hsv_ref = reference.hsv
                 
                 # Hue difference (shadows preserve hue)
                 hue_diff = cv2.absdiff(hsv[:, :, 0], hsv_ref[:, :, 0])
@@ -630,7 +739,7 @@ def is_likely_shadow(slot_region_bgr: np.ndarray,
                 mean_hue_diff = float(np.mean(hue_diff))
                 
                 # Value difference (shadows are darker)
-                val_diff = float(np.mean(hsv_ref[:, :, 2])) - float(np.mean(hsv[:, :, 2]))
+                val_diff = reference.mean_std("val")[0] - mean_val
                 
                 # Shadow: hue similar, but darker
                 hue_preserved = mean_hue_diff < 15 and val_diff > 20
@@ -650,7 +759,8 @@ def is_likely_shadow(slot_region_bgr: np.ndarray,
         return False, 0.5
 
 
-def has_internal_structure(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+def has_internal_structure(slot_region_bgr: np.ndarray,
+                           features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Check if the region has internal structure (edges, texture, patterns).
     Real objects have internal detail, shadows don't.
@@ -663,21 +773,18 @@ def has_internal_structure(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
     - Shadows (uniform darkness, no internal edges)
     """
     try:
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        features = RegionFeatures.of(slot_region_bgr, features)
+        gray = features.gray
         
         # Edge detection at multiple scales
-        edges_fine = cv2.Canny(gray, 30, 100)
-        edges_coarse = cv2.Canny(gray, 50, 150)
+        edges_fine = features.edges(30, 100)
+        edges_coarse = features.edges(50, 150)
         
-        edge_density_fine = np.sum(edges_fine > 0) / edges_fine.size
-        edge_density_coarse = np.sum(edges_coarse > 0) / edges_coarse.size
+        edge_density_fine = cv2.countNonZero(edges_fine) / edges_fine.size
+        edge_density_coarse = cv2.countNonZero(edges_coarse) / edges_coarse.size
         
         # Gradient magnitude (texture indicator)
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_mag = np.sqrt(sobelx**2 + sobely**2)
-        mean_gradient = float(np.mean(gradient_mag))
-        max_gradient = float(np.max(gradient_mag))
+        mean_gradient, _, max_gradient = features.gradient_stats(GRADIENT_THRESHOLDS)
         
         # Local contrast (variance in small windows)
         kernel_size = max(5, min(gray.shape) // 10)
@@ -723,29 +830,26 @@ def has_internal_structure(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
         return False, 0.5
 
 
-def detect_object_simple(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+def detect_object_simple(slot_region_bgr: np.ndarray,
+                         features: Optional[RegionFeatures] = None) -> Tuple[bool, float]:
     """
     Simple object detection based on visual complexity.
     Detects if there's any significant object in the region.
     """
     try:
-        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        features = RegionFeatures.of(slot_region_bgr, features)
         
         # Edge detection
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = np.sum(edges > 0) / edges.size
+        edges = features.edges(50, 150)
+        edge_density = cv2.countNonZero(edges) / edges.size
         
         # Color variance
-        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
-        hue_std = float(np.std(hsv[:, :, 0]))
-        sat_std = float(np.std(hsv[:, :, 1]))
-        val_std = float(np.std(hsv[:, :, 2]))
+        _, hue_std = features.mean_std("hue")
+        _, sat_std = features.mean_std("sat")
+        _, val_std = features.mean_std("val")
         
         # Gradient magnitude
-        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_mag = np.sqrt(sobelx**2 + sobely**2)
-        mean_gradient = float(np.mean(gradient_mag))
+        mean_gradient, _, _ = features.gradient_stats(GRADIENT_THRESHOLDS)
         
         # Score based on multiple factors
         score = 0
@@ -787,6 +891,10 @@ def detect_object_simple(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
         return False, 0.5
 
 
+# Canny thresholds the reference-aware detectors apply to the reference crop
+REFERENCE_EDGE_THRESHOLDS = ((30, 100),)
+
+
 def clamp_bbox(bbox, width, height):
     """Clamp bounding box to image dimensions."""
     x1, y1, x2, y2 = [int(v) for v in bbox]
@@ -836,6 +944,7 @@ class SlotTracker:
         self.last_change_time = time.time()
         self.frames_since_change = 0
         self.reference_region = None
+        self.reference_features = None   # Planes / stats of reference_region, computed once
         self.previous_region = None
         self.shadow_lock_frames = 0
         
@@ -847,8 +956,10 @@ class SlotTracker:
         self.stable_region = None        # Region when object became stable
     
     def set_reference(self, reference_region: np.ndarray):
-        """Set the reference (empty) image for this slot."""
+        """Set the reference (empty) image for this slot and precompute its features."""
         self.reference_region = reference_region.copy()
+        self.reference_features = RegionFeatures(self.reference_region).precompute(
+            REFERENCE_EDGE_THRESHOLDS, ("gray", "val"))
     
     def _calculate_motion(self, current_region: np.ndarray) -> float:
         """
@@ -910,6 +1021,23 @@ class SlotTracker:
         except:
             return True
     
+    def _remember_region(self, current_region: np.ndarray):
+        """Keep current_region as the next frame's motion baseline."""
+        if self.previous_region is not None and self.previous_region.shape == current_region.shape:
+            np.copyto(self.previous_region, current_region)  # Reuse last frame's buffer
+        else:
+            self.previous_region = current_region.copy()
+    
+    def is_settled(self) -> bool:
+        """
+        True when one more detection agreeing with the confirmed status cannot
+        change anything: a full decision history whose raw detections all
+        agree with the status, and nothing waiting on a timed confirmation.
+        """
+        occupied = self.status == "occupied"
+        return (len(self.history) >= 5 and self.pending_status is None
+                and all(detected == occupied for detected in self.history))
+    
     def update(self, is_occupied: bool, confidence: float, current_region: Optional[np.ndarray] = None):
         """
         Update slot state with TEMPORAL PERSISTENCE logic.
@@ -925,7 +1053,7 @@ class SlotTracker:
         if current_region is not None:
             motion_level = self._calculate_motion(current_region)
             self.motion_history.append(motion_level)
-            self.previous_region = current_region.copy()
+            self._remember_region(current_region)
         
         # Add to history
         self.history.append(is_occupied)
@@ -1027,6 +1155,17 @@ class SlotTracker:
             }
         
         return None
+    
+    def advance(self, is_occupied: bool, confidence: float, current_region: Optional[np.ndarray] = None):
+        """
+        Cheap update for a settled slot whose pixels did not change since its
+        last analysis: replays the decision with the last measured motion and
+        keeps current_region as the motion baseline for the next analysis.
+        """
+        self.motion_history.append(self.motion_history[-1] if self.motion_history else 0.0)
+        if current_region is not None:
+            self._remember_region(current_region)
+        return self.update(is_occupied, confidence)
 
 
 # ============================================================
@@ -1036,15 +1175,92 @@ class SlotTracker:
 class DetectionSession:
     """Manages detection for a single parking spot."""
     
-    def __init__(self, spot_id, grid_config: Optional[dict] = None):
+    SETTLE_WINDOW_FRAMES = SlotTracker.HISTORY_SIZE  # Frames processed after a change before skipping again
+    
+    def __init__(self, spot_id, grid_config: Optional[dict] = None, decode_scale=1,
+                 dedup: bool = True, frame_policy: Optional[AnnotatedFramePolicy] = None,
+                 stream_output: bool = False, encoder: Optional[PreviewEncoder] = None,
+                 ensemble: str = "fast", normalizer: Optional[SlotNormalizer] = None,
+                 background: Optional[BackgroundModel] = None,
+                 reference_adapter: Optional[ReferenceAdapter] = None,
+                 change_gate: Optional[ChangeGate] = None, motion_tiles: Optional[MotionTiles] = None):
         self.spot_id = spot_id
         self.slots = {}
         self.frame_count = 0
         self.started_at = time.time()
         self.reference_frame = None
+        self.reference_gray = None       # Gray reference plane for the slot stats engine
+        self.reference_version = 0       # Bumped whenever the reference frame changes
+        self.previous_gray = None        # Union gray plane of the last detection frame
+        self.previous_union = None
         self.grid_locked = False
         self.grid_config = grid_config
         self.reference_frame_size = None
+        self.lock = threading.Lock()  # Serializes frames from HTTP and WebSocket ingest
+        
+        # Optional Python-side camera pull (see start_capture)
+        self.capture = None
+        self.capture_thread = None
+        self.last_response = None
+        
+        # Optional shared-memory frame ring fed by a separate decoder process
+        self.frame_ring_name = None
+        self.frame_ring = None
+        self.last_ring_seq = 0
+        # Held while a ring view is in use; closing / re-attaching waits for it
+        self.ring_lock = threading.RLock()
+        
+        # Duplicate / near-duplicate frame suppression (see is_settled)
+        self.dedup = FrameDeduplicator() if dedup else None
+        self.changed_at_frame = 0  # frame_count of the last frame the deduplicator saw change
+        
+        # Sequence-numbered slot changes for delta responses
+        self.delta_log = OccupancyDeltaLog()
+        
+        # When to draw and send the annotated preview frame
+        self.frame_policy = frame_policy or AnnotatedFramePolicy()
+        self.frame_size = None           # (width, height) of the analysed frames
+        self.geometry_sent_key = None    # Geometry already sent in geometry mode
+        self.overlay_cache = OverlayCache()
+        
+        # Annotated frames for /stream/<spot_id> viewers (encoded once per frame).
+        # stream_output sends them only there, keeping JSON responses small.
+        self.broadcaster = FrameBroadcaster()
+        self.stream_output = stream_output
+        self.encoder = encoder or PreviewEncoder()
+        
+        # "fast": cheap ensemble (integral-image stats when possible), "full": all voters
+        self.ensemble = ensemble
+        
+        # Optional fixed analysis size: fast-ensemble slots resampled into
+        # preallocated per-session tiles (see slot_normalizer)
+        self.normalizer = normalizer
+        
+        # Optional frame-level background model: its foreground replaces the
+        # fast ensemble's static-reference comparison (see background_model)
+        self.background = background
+        
+        # Optional EMA of vacant, motion-free slots into the reference (see reference_adapter)
+        self.reference_adapter = reference_adapter
+        
+        # Optional dirty-slot gating: unchanged slots reuse their last raw
+        # decision instead of running the ensemble (see change_gate)
+        self.change_gate = change_gate
+        self.slot_decisions = {}         # Slot -> (is_occupied, confidence, is_shadow) of its last analysis
+        
+        # Optional coarse motion pre-pass: only slots on active tiles are
+        # compared by the change gate (a default gate schedules them)
+        self.motion_tiles = motion_tiles
+        if motion_tiles is not None and self.change_gate is None:
+            self.change_gate = ChangeGate()
+        
+        # Reduced-resolution decode: 1/2/4/8, or "auto" to pick from slot geometry.
+        # The first frame is always full size; the requested scale is applied
+        # after it and later frames arrive pre-scaled by the decoder.
+        if decode_scale != "auto" and decode_scale not in SUPPORTED_SCALES:
+            decode_scale = 1
+        self.decode_scale_mode = decode_scale if decode_scale != 1 else None
+        self.decode_scale = 1
         
         # Initialize slot trackers from config
         if grid_config and "cells" in grid_config:
@@ -1088,6 +1304,14 @@ class DetectionSession:
     def set_reference_frame(self, frame_bgr: np.ndarray):
         """Set reference frame (empty parking lot)."""
         self.reference_frame = frame_bgr.copy()
+        self.reference_gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        self.reference_version += 1
+        if self.background is not None:
+            self.background.seed(frame_bgr)
+        if self.reference_adapter is not None:
+            self.reference_adapter.reset()
+        if self.change_gate is not None:
+            self.change_gate.invalidate()
         
         height, width = frame_bgr.shape[:2]
         for slot_num, tracker in self.slots.items():
@@ -1097,6 +1321,268 @@ class DetectionSession:
         
         print(f"✅ Reference frame set for {len(self.slots)} slots")
     
+    def apply_decode_scale(self, full_frame_bgr: np.ndarray):
+        """
+        Switch the session to reduced-resolution frames once slot geometry is known.
+        
+        Slot bboxes are rescaled once (all later crops and annotation use the
+        reduced frame directly) and the reference frame is downsampled so
+        reference crops keep matching slot crops.
+        """
+        height, width = full_frame_bgr.shape[:2]
+        
+        if self.decode_scale_mode == "auto":
+            bboxes = [clamp_bbox(t.bbox, width, height) for t in self.slots.values()]
+            self.decode_scale = choose_decode_scale(bboxes)
+        elif self.decode_scale_mode is not None:
+            self.decode_scale = int(self.decode_scale_mode)
+        self.decode_scale_mode = None
+        
+        if len(self.slots) == 0:
+            self.decode_scale = 1
+        
+        if self.decode_scale == 1:
+            return
+        
+        for tracker in self.slots.values():
+            tracker.bbox = scale_bbox(tracker.bbox, self.decode_scale)
+        
+        if self.reference_frame is not None:
+            reduced = cv2.resize(self.reference_frame, reduced_size(width, height, self.decode_scale),
+                                 interpolation=cv2.INTER_AREA)
+            self.set_reference_frame(reduced)
+        
+        print(f"📉 Decoding frames at 1/{self.decode_scale} resolution for spot {self.spot_id}")
+    
+    def start_capture(self, camera_url: str, frame_handler):
+        """
+        Own the camera connection: pull the MJPEG stream here instead of
+        receiving frames from the Node camera worker.
+        
+        A capture thread keeps only the newest JPEG; the detection loop takes it,
+        runs frame_handler(session, frame_item), whose result lands in last_response.
+        """
+        self.stop_capture()
+        self.capture = MjpegCapture(camera_url)
+        self.capture.start()
+        self.capture_thread = threading.Thread(target=self._capture_loop,
+                                               args=(self.capture, frame_handler), daemon=True)
+        self.capture_thread.start()
+    
+    def stop_capture(self):
+        """Stop the Python-side camera pull if running."""
+        if self.capture is None:
+            return
+        capture, self.capture = self.capture, None
+        capture.stop()
+        if self.capture_thread is not None:
+            self.capture_thread.join(timeout=5)
+            self.capture_thread = None
+    
+    def _capture_loop(self, capture: MjpegCapture, frame_handler):
+        """Detection loop for pull mode: always process the newest captured frame."""
+        while capture.running:
+            item = capture.slot.get(timeout=1.0)
+            if item is None:
+                continue
+            
+            jpeg_bytes, captured_at = item
+            try:
+                frame_handler(self, {
+                    "frame_bytes": jpeg_bytes,
+                    "frame_b64": None,
+                    "timestamp": captured_at,
+                    "use_ai": True,
+                    "defer_preview": True  # Encode overlaps the next frame's detection
+                })
+            except Exception as e:
+                print(f"❌ Capture loop error [spot {self.spot_id}]: {e}")
+                traceback.print_exc()
+    
+    def read_ring_frame(self, seq: Optional[int] = None):
+        """
+        Zero-copy read from the session's shared frame ring.
+        Attaches lazily, since the decoder process may start after the session,
+        and re-attaches when the decoder has recreated the ring (new resolution).
+        Hold ring_lock for as long as the returned view is used.
+        Returns:
+            (seq, timestamp, frame_view) or None if no (new) frame is available
+        """
+        if self.frame_ring_name is None:
+            return None
+        
+        with self.ring_lock:
+            if self.frame_ring is not None and self.frame_ring.retired:
+                print(f"🔁 Frame ring '{self.frame_ring_name}' was recreated, re-attaching [spot {self.spot_id}]")
+                self.close_frame_ring()
+                self.last_ring_seq = 0  # Sequence numbers restart in the new ring
+            
+            if self.frame_ring is None:
+                try:
+                    self.frame_ring = SharedFrameRing.attach(self.frame_ring_name)
+                    print(f"🧠 Attached frame ring '{self.frame_ring_name}' for spot {self.spot_id}")
+                except (FileNotFoundError, ValueError):
+                    return None  # Not written yet, or still being created
+            
+            return self.frame_ring.read(seq)
+    
+    def close_frame_ring(self):
+        """Detach from the shared frame ring (the decoder process owns it)."""
+        with self.ring_lock:
+            if self.frame_ring is not None:
+                self.frame_ring.close()
+                self.frame_ring = None
+    
+    def get_metrics(self) -> dict:
+        """Per-session frame counters for /metrics."""
+        metrics = {
+            "frames_processed": self.frame_count,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "num_slots": len(self.slots),
+            "decode_scale": self.decode_scale,
+            "frames_skipped": 0,
+            "annotated_frames_sent": self.frame_policy.frames_sent,
+            "stream_viewers": self.broadcaster.viewers,
+            "stream_frames_published": self.broadcaster.frames_published,
+            **self.encoder.stats()
+        }
+        if self.normalizer is not None:
+            metrics["analysis_size"] = self.normalizer.describe()
+            metrics["analysis_buffer_allocations"] = self.normalizer.allocations
+        if self.background is not None:
+            metrics["background_frames"] = self.background.frames_applied
+        if self.reference_adapter is not None:
+            metrics["reference_slots_adapted"] = self.reference_adapter.slots_adapted
+        if self.change_gate is not None:
+            metrics.update(self.change_gate.stats())
+        if self.motion_tiles is not None:
+            metrics.update(self.motion_tiles.stats())
+        if self.dedup is not None:
+            metrics.update(self.dedup.stats())
+        return metrics
+    
+    def annotate_frame(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """
+        🚀 OPTIMIZED: Composite the cached overlay onto the frame.
+        The overlay is only redrawn when a slot's status, pending status or
+        bbox changes. The result lives in the cache's reused buffer.
+        """
+        state_key = tuple((slot_num, tracker.status, tracker.pending_status, tuple(tracker.bbox))
+                          for slot_num, tracker in self.slots.items())
+        return self.overlay_cache.compose(frame_bgr, state_key, self._draw_overlay)
+    
+    def _draw_overlay(self, annotated: np.ndarray):
+        """Lightweight annotation (only draw boxes, minimal text)."""
+        height, width = annotated.shape[:2]
+        
+        for slot_num, tracker in self.slots.items():
+            x1, y1, x2, y2 = clamp_bbox(tracker.bbox, width, height)
+            
+            # Simple color based on status
+            if tracker.status == "occupied":
+                color = (0, 0, 255)  # Red
+            elif tracker.pending_status == "occupied":
+                color = (0, 165, 255)  # Orange
+            else:
+                color = (0, 255, 0)  # Green
+            
+            # Draw rectangle (fast)
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
+            
+            # Simple label (minimal text rendering)
+            label = f"#{slot_num}"
+            cv2.putText(annotated, label, (x1 + 3, y1 + 18),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        
+        # Summary (draw once)
+        total = len(self.slots)
+        occupied = sum(1 for s in self.slots.values() if s.status == "occupied")
+        summary = f"O:{occupied}/{total}"
+        cv2.putText(annotated, summary, (10, 25),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    
+    def slot_statistics(self, features: FrameFeatures, boxes: dict) -> dict:
+        """
+        Ensemble statistics of the given slots from integral images over the slot union.
+        Motion is measured against previous_gray, which process_frame refreshes
+        on every detection frame (not only when some slot is scored).
+        Returns: compute_slot_stats arrays, in boxes order
+        """
+        ux1, uy1, ux2, uy2 = features.union
+        planes = features.planes
+        frame_height, frame_width = features.frame.shape[:2]
+        
+        reference_gray = None
+        if self.background is None and self.reference_gray is not None and \
+                self.reference_gray.shape == (frame_height, frame_width):
+            reference_gray = self.reference_gray[uy1:uy2, ux1:ux2]
+        
+        previous_gray = self.previous_gray if self.previous_union == features.union else None
+        
+        rects = np.array([[x1 - ux1, y1 - uy1, x2 - ux1, y2 - uy1]
+                          for x1, y1, x2, y2 in boxes.values()])
+        return compute_slot_stats(planes.hsv, planes.edges(50, 150), planes.gray, rects,
+                                  reference_gray, previous_gray)
+    
+    def adapt_reference(self, frame_bgr: np.ndarray, boxes: dict):
+        """
+        Blend vacant, motion-free slots of frame_bgr into the reference and
+        refresh only those slots' reference gray plane and cached features.
+        """
+        if self.reference_frame is None or self.reference_frame.shape != frame_bgr.shape:
+            return
+        
+        self.reference_adapter.blend(frame_bgr, self.reference_frame, boxes.values())
+        for slot_num, (x1, y1, x2, y2) in boxes.items():
+            reference_region = self.reference_frame[y1:y2, x1:x2]
+            cv2.cvtColor(reference_region, cv2.COLOR_BGR2GRAY, dst=self.reference_gray[y1:y2, x1:x2])
+            self.slots[slot_num].set_reference(reference_region)
+        self.reference_version += 1
+        if self.change_gate is not None:
+            self.change_gate.invalidate(boxes.keys())
+    
+    def wants_annotated_frame(self, active: bool) -> bool:
+        """Frame policy, skipped entirely when stream-only output has no viewers."""
+        if self.stream_output and not self.broadcaster.has_viewers:
+            return False
+        return self.frame_policy.wants_frame(self.frame_count, active)
+    
+    def slot_geometry(self) -> Optional[dict]:
+        """Slot geometry in analysed-frame pixels and normalized coordinates."""
+        if self.frame_size is None:
+            return None
+        return build_slot_geometry(self.slots, *self.frame_size)
+    
+    def geometry_update(self) -> Optional[dict]:
+        """
+        Geometry for the next response in geometry mode: sent once, then again
+        only if slots or the analysed frame size change.
+        """
+        if not self.frame_policy.sends_geometry or self.frame_size is None or not self.slots:
+            return None
+        
+        key = (self.frame_size, tuple(tuple(t.bbox) for t in self.slots.values()))
+        if key == self.geometry_sent_key:
+            return None
+        
+        self.geometry_sent_key = key
+        return self.slot_geometry()
+    
+    def is_settled(self) -> bool:
+        """
+        True when repeating the last result is safe: every tracker has a full
+        decision history, every raw detection in it agrees with the confirmed
+        status and nothing is waiting on a timed confirmation. After any
+        changed frame, SETTLE_WINDOW_FRAMES frames are processed regardless,
+        since an arriving car's first detections are still "vacant" (rapid
+        motion) and would otherwise let the scene count as settled.
+        """
+        if self.last_response is None:
+            return False
+        if self.frame_count - self.changed_at_frame < self.SETTLE_WINDOW_FRAMES:
+            return False
+        return all(t.is_settled() for t in self.slots.values())
+    
     def process_frame(self, frame_bgr: np.ndarray, use_ai: bool = True):
         """
         🚀 OPTIMIZED: Process a frame and detect occupancy for all slots.
@@ -1105,7 +1591,7 @@ class DetectionSession:
         self.frame_count += 1
         
         if frame_bgr is None:
-            return None, {}, None
+            return None, {}, []
         
         height, width = frame_bgr.shape[:2]
         
@@ -1135,20 +1621,105 @@ class DetectionSession:
             print("📸 Capturing first frame as reference")
             self.set_reference_frame(frame_bgr)
         
+        # First frame is always decoded at full size; later frames use decode_scale
+        if self.frame_count == 1 and self.decode_scale_mode is not None:
+            self.apply_decode_scale(frame_bgr)
+            if self.decode_scale > 1:
+                frame_bgr = cv2.resize(frame_bgr, reduced_size(width, height, self.decode_scale),
+                                       interpolation=cv2.INTER_AREA)
+                height, width = frame_bgr.shape[:2]
+        
+        self.frame_size = (width, height)
+        
         # 🚀 OPTIMIZATION: Skip detection on some frames, just use cached results
         # Process detection every 2nd frame for speed
         run_detection = (self.frame_count % 2 == 0) or self.frame_count <= 5
         
         occupancy = {}
-        state_change = None
+        state_changes = []  # Every slot that flips this frame
         
         # If no slots, return early with simple message
         if len(self.slots) == 0:
+            if not self.wants_annotated_frame(active=True):
+                return None, {}, []
             annotated = frame_bgr.copy()
             message = "⚠️ NO GRID CONFIGURED"
             cv2.putText(annotated, message, (20, 40),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            return annotated, {}, None
+            return annotated, {}, []
+        
+        # 🚀 OPTIMIZATION: Gray / HSV / edge planes once per frame over the
+        # union of all slots; each slot reads views into them. When the union
+        # is converted, all slot statistics come from its integral images and
+        # every slot is scored in one vectorized pass.
+        # With a fixed analysis size, slots are resampled into the session's
+        # preallocated tiles instead and scored from those.
+        features = None
+        slot_results = {}
+        slot_tiles = {}
+        foreground = {}
+        detected_occupied = set()
+        adaptable = {}
+        dirty = set()
+        if run_detection:
+            boxes = {}
+            for slot_num, tracker in self.slots.items():
+                box = clamp_bbox(tracker.bbox, width, height)
+                if box[2] - box[0] >= 20 and box[3] - box[1] >= 20:
+                    boxes[slot_num] = box
+            features = FrameFeatures(frame_bgr, boxes.values())
+            dirty = set(boxes)
+            
+            # Coarse pre-pass: slots away from any frame-to-frame motion are not even compared
+            candidates = None
+            if self.motion_tiles is not None and boxes:
+                self.motion_tiles.update(frame_bgr)
+                candidates = self.motion_tiles.active_slots(boxes)
+            
+            # Only slots whose thumbnail moved since their last analysis get the ensemble;
+            # a slot whose tracker is not settled (pending, or flickering raw decisions)
+            # is analysed every time, so a replayed decision can never change its status
+            if self.change_gate is not None and boxes:
+                gray, origin = None, (0, 0)
+                if features.shared and candidates is None:
+                    gray, origin = features.planes.gray, features.union[:2]
+                force = {slot_num for slot_num in boxes
+                         if slot_num not in self.slot_decisions or not self.slots[slot_num].is_settled()}
+                dirty = self.change_gate.dirty(frame_bgr, boxes, gray, origin, candidates, force)
+            
+            # One frame-level foreground mask instead of N reference diffs
+            if self.background is not None and self.ensemble == "fast" and boxes:
+                self.background.apply(frame_bgr)
+                foreground = dict(zip(boxes.keys(), self.background.foreground_ratios(boxes.values())))
+            
+            if self.normalizer is not None and self.ensemble == "fast" and boxes:
+                # Every tile is resampled (trackers keep it, and it is the next
+                # motion baseline); only dirty slots get edges, stats and a decision
+                reference_frame = None if self.background is not None else self.reference_frame
+                self.normalizer.load(frame_bgr, boxes, reference_frame, self.reference_version)
+                slot_tiles = {slot_num: self.normalizer.tile(self.normalizer.bgr, index)
+                              for index, slot_num in enumerate(boxes.keys())}
+                scored = [(index, slot_num) for index, slot_num in enumerate(boxes.keys()) if slot_num in dirty]
+                if scored:
+                    stats = self.normalizer.slot_stats([index for index, _ in scored])
+                    if foreground:
+                        stats["diff_ratio"] = np.array([foreground[slot_num] for _, slot_num in scored])
+                    occupied, confidence, shadow = ensemble_decisions(**stats)
+                    slot_results = dict(zip([slot_num for _, slot_num in scored],
+                                            zip(occupied.tolist(), confidence.tolist(), shadow.tolist())))
+            elif features.shared and self.ensemble == "fast" and dirty:
+                scored = {slot_num: box for slot_num, box in boxes.items() if slot_num in dirty}
+                stats = self.slot_statistics(features, scored)
+                if foreground:
+                    stats["diff_ratio"] = np.array([foreground[slot_num] for slot_num in scored])
+                occupied, confidence, shadow = ensemble_decisions(**stats)
+                slot_results = dict(zip(scored.keys(),
+                                        zip(occupied.tolist(), confidence.tolist(), shadow.tolist())))
+            
+            # Next frame's motion baseline is this detection frame, scored or not
+            if features.shared and self.ensemble == "fast" and self.normalizer is None:
+                self.previous_gray = features.planes.gray
+                self.previous_union = features.union
         
         # 🚀 OPTIMIZATION: Process all slots with minimal overhead
         for slot_num, tracker in self.slots.items():
@@ -1172,13 +1743,30 @@ class DetectionSession:
             
             # 🚀 Only run detection on specific frames
             if run_detection:
-                result = detect_vehicle_ensemble(
-                    slot_region, 
-                    tracker.reference_region,
-                    tracker.previous_region,
-                    use_ai=False  # Disabled AI for speed
-                )
+                if slot_num not in dirty:
+                    result = self.slot_decisions[slot_num]  # Unchanged since its last analysis
+                elif slot_num in slot_results:
+                    result = slot_results[slot_num]
+                elif self.ensemble == "full":
+                    result = detect_vehicle_ensemble_full(
+                        slot_region,
+                        tracker.reference_region,
+                        tracker.previous_region,
+                        features=features.slot((x1, y1, x2, y2)),
+                        reference_features=tracker.reference_features
+                    )
+                else:
+                    result = detect_vehicle_ensemble(
+                        slot_region, 
+                        tracker.reference_region,
+                        tracker.previous_region,
+                        use_ai=False,  # Disabled AI for speed
+                        features=features.slot((x1, y1, x2, y2)),
+                        reference_features=tracker.reference_features,
+                        foreground_ratio=foreground.get(slot_num)
+                    )
                 
+                self.slot_decisions[slot_num] = result
                 is_occupied, confidence, is_shadow = result
                 
                 # Shadow handling
@@ -1190,46 +1778,41 @@ class DetectionSession:
                     is_occupied = False
                     confidence = max(confidence, 0.85)
                 
-                # Update tracker
-                change = tracker.update(is_occupied, confidence, slot_region)
+                # Update tracker (clean slots only advance its clock)
+                if slot_num in dirty:
+                    change = tracker.update(is_occupied, confidence, slot_tiles.get(slot_num, slot_region))
+                else:
+                    change = tracker.advance(is_occupied, confidence, slot_tiles.get(slot_num, slot_region))
                 if change:
-                    state_change = change
+                    state_changes.append(change)
+                if is_occupied or tracker.status == "occupied" or tracker.pending_status == "occupied":
+                    detected_occupied.add((x1, y1, x2, y2))
+                elif (self.reference_adapter is not None and tracker.status == "vacant"
+                      and tracker.pending_status is None and tracker.motion_history
+                      and tracker.motion_history[-1] <= self.reference_adapter.max_motion):
+                    adaptable[slot_num] = (x1, y1, x2, y2)
             
             occupancy[str(slot_num)] = {
                 "status": tracker.status,
                 "confidence": round(tracker.confidence, 2)
             }
         
-        # 🚀 OPTIMIZATION: Lightweight annotation (only draw boxes, minimal text)
-        annotated = frame_bgr.copy()
+        # Background learns only from the lot around occupied slots
+        if foreground:
+            self.background.update(detected_occupied)
         
-        for slot_num, tracker in self.slots.items():
-            x1, y1, x2, y2 = clamp_bbox(tracker.bbox, width, height)
-            
-            # Simple color based on status
-            if tracker.status == "occupied":
-                color = (0, 0, 255)  # Red
-            elif tracker.pending_status == "occupied":
-                color = (0, 165, 255)  # Orange
-            else:
-                color = (0, 255, 0)  # Green
-            
-            # Draw rectangle (fast)
-            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-            
-            # Simple label (minimal text rendering)
-            label = f"#{slot_num}"
-            cv2.putText(annotated, label, (x1 + 3, y1 + 18),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        # Reference follows the light in confirmed-vacant, still slots
+        if run_detection and self.reference_adapter is not None and self.reference_adapter.due() and adaptable:
+            self.adapt_reference(frame_bgr, adaptable)
         
-        # Summary (draw once)
-        total = len(self.slots)
-        occupied = sum(1 for s in self.slots.values() if s.status == "occupied")
-        summary = f"O:{occupied}/{total}"
-        cv2.putText(annotated, summary, (10, 25),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        # Skip the copy and all drawing when nobody wants this frame
+        active = bool(state_changes) or any(t.pending_status for t in self.slots.values())
+        if not self.wants_annotated_frame(active):
+            return None, occupancy, state_changes
+        
+        annotated = self.annotate_frame(frame_bgr)
         
-        return annotated, occupancy, state_change
+        return annotated, occupancy, state_changes
 
 
 # ============================================================
@@ -1239,6 +1822,214 @@ class DetectionSession:
 active_sessions = {}
 
 
+def run_session_frame(session: DetectionSession, frame_item: dict) -> Optional[dict]:
+    """
+    Decode and process one frame for a session and build the /process-frame response.
+    Shared by the HTTP route and the WebSocket frame channel.
+    
+    Args:
+        session: Target detection session
+        frame_item: Dict with frame_bytes or frame_b64, timestamp and use_ai
+    Returns:
+        Response dictionary, or None if the frame could not be decoded
+    """
+    frame_bytes = frame_item["frame_bytes"]
+    if not frame_bytes:
+        frame_bytes = decode_base64_bytes(frame_item["frame_b64"])
+        if frame_bytes is None:
+            return None
+    
+    # Skip repeated frames before decoding them. Under the session lock, so the
+    # settled check, the dedup reference and the change bookkeeping agree with
+    # frames processed concurrently by other ingest paths.
+    changed = False
+    if session.dedup is not None:
+        with session.lock:
+            changes = session.dedup.changes
+            duplicate = session.dedup.check(frame_bytes, allow_skip=session.is_settled())
+            changed = session.dedup.changes != changes
+            if changed:
+                session.changed_at_frame = session.frame_count + 1  # Not settled until processed
+            if duplicate is not None:
+                response = cached_frame_response(session, frame_item["timestamp"], duplicate)
+        if duplicate is not None:
+            if frame_item.get("delta"):
+                return delta_frame_response(session, response, frame_item.get("ack_seq"))
+            return response
+    
+    frame_bgr = decode_image_bytes(frame_bytes, session.decode_scale)
+    if frame_bgr is None:
+        return None
+    
+    response = build_frame_response(session, frame_bgr, frame_item["timestamp"], frame_item["use_ai"],
+                                    frame_item.get("defer_preview", False), changed)
+    if frame_item.get("delta"):
+        return delta_frame_response(session, response, frame_item.get("ack_seq"))
+    return response
+
+
+def cached_frame_response(session: DetectionSession, timestamp: Any, duplicate: str) -> dict:
+    """Repeat the session's last result for a skipped duplicate frame."""
+    response = dict(session.last_response)
+    response["state_change"] = None  # Already reported with the original frame
+    response["state_changes"] = []
+    response.pop("processed_frame", None)  # The client already has this picture
+    response.pop("geometry", None)
+    response["timestamp"] = timestamp
+    response["skipped"] = duplicate
+    return response
+
+
+def build_frame_response(session: DetectionSession, frame_bgr: np.ndarray,
+                         timestamp: Any, use_ai: bool = True, defer_preview: bool = False,
+                         changed: bool = False) -> dict:
+    """
+    Process an already decoded frame and build the /process-frame response.
+    
+    The annotated frame is encoded on the preview pool outside the session lock,
+    so its encode overlaps detection of the next frame. With defer_preview the
+    response is returned (and stored) at once and last_response gains
+    processed_frame when the encode finishes. changed marks a frame the
+    deduplicator saw differ; the settle window starts at its frame number.
+    """
+    with session.lock:
+        if changed:
+            session.changed_at_frame = session.frame_count + 1
+        annotated_frame, occupancy, state_changes = session.process_frame(frame_bgr, use_ai)
+        seq = session.delta_log.record(occupancy, state_changes)
+        geometry = session.geometry_update()
+        
+        # Hand off while the session's reused overlay buffer is still ours
+        preview = None
+        if annotated_frame is not None:
+            preview = session.encoder.submit(annotated_frame)
+    
+    # Build response (state_change keeps the last flip for older clients)
+    response = {
+        "seq": seq,
+        "occupancy": {"slots": occupancy},
+        "state_change": state_changes[-1] if state_changes else None,
+        "state_changes": state_changes,
+        "timestamp": timestamp,
+        "frame_count": session.frame_count,
+        "num_slots": len(session.slots)
+    }
+    
+    # Geometry mode: the client draws the overlay itself
+    if geometry is not None:
+        response["geometry"] = geometry
+    
+    # Motion tile map for tuning the pre-pass
+    if session.motion_tiles is not None and session.motion_tiles.debug:
+        response["motion_tiles"] = session.motion_tiles.tile_map()
+    
+    if preview is None:
+        session.last_response = response
+    elif defer_preview:
+        session.last_response = response
+        preview.add_done_callback(lambda done: finish_deferred_preview(session, response, done))
+    else:
+        response = attach_preview(session, response, preview)
+        session.last_response = response
+    
+    return response
+
+
+def attach_preview(session: DetectionSession, response: dict, preview: Future) -> dict:
+    """
+    Wait for an encoded preview, publish it to stream viewers and add it to the
+    response as processed_frame (unless the session streams only).
+    The same JPEG bytes serve every consumer.
+    """
+    try:
+        jpeg_bytes = preview.result()
+    except Exception as e:
+        print(f"⚠️ Preview encode failed [spot {session.spot_id}]: {e}")
+        return response
+    
+    if not jpeg_bytes:
+        return response
+    
+    if session.broadcaster.has_viewers:
+        session.broadcaster.publish(jpeg_bytes, response["seq"])
+    
+    if not session.stream_output:
+        response = dict(response, processed_frame=jpeg_to_data_url(jpeg_bytes))
+    
+    return response
+
+
+def finish_deferred_preview(session: DetectionSession, response: dict, preview: Future):
+    """Encode finished for a deferred response: swap in the version with the preview."""
+    with_preview = attach_preview(session, response, preview)
+    if session.last_response is response:
+        session.last_response = with_preview
+
+
+def delta_frame_response(session: DetectionSession, response: dict, ack_seq: Optional[int]) -> dict:
+    """
+    Shrink a full response to the slots and state changes after the client's
+    acknowledged seq. "full": true means occupancy.slots holds every slot.
+    """
+    delta = session.delta_log.delta_since(ack_seq)
+    
+    delta_response = {
+        "delta": True,
+        "seq": delta["seq"],
+        "base_seq": delta["base_seq"],
+        "full": delta["full"],
+        "occupancy": {"slots": delta["slots"]},
+        "state_changes": delta["state_changes"],
+        "timestamp": response["timestamp"],
+        "frame_count": response["frame_count"]
+    }
+    if delta["full"]:
+        delta_response["num_slots"] = response["num_slots"]
+    for key in ("skipped", "processed_frame", "geometry", "ring_seq", "ring_overwritten"):
+        if key in response:
+            delta_response[key] = response[key]
+    
+    return delta_response
+
+
+def run_session_ring_frame(session: DetectionSession, seq: Optional[int] = None,
+                           use_ai: bool = True) -> Optional[dict]:
+    """
+    Process the newest (or a given) frame from the session's shared frame ring.
+    The frame is analysed in place as a NumPy view of shared memory; only a
+    reduced decode scale forces a resize. ring_lock is held throughout, so a
+    concurrent stop or re-attach cannot unmap the view mid-analysis.
+    
+    Returns:
+        Response dictionary, or None if no new frame is available
+    """
+    with session.ring_lock:
+        ring_frame = session.read_ring_frame(seq)
+        ring = session.frame_ring
+        if ring_frame is None or ring is None:
+            return None
+        
+        seq, timestamp, frame_bgr = ring_frame
+        if seq == session.last_ring_seq:
+            return session.last_response
+        
+        if session.decode_scale != 1:
+            height, width = frame_bgr.shape[:2]
+            frame_bgr = cv2.resize(frame_bgr, reduced_size(width, height, session.decode_scale),
+                                   interpolation=cv2.INTER_AREA)
+        
+        response = build_frame_response(session, frame_bgr, timestamp, use_ai)
+        response["ring_seq"] = seq
+        
+        # The writer may have lapped the ring while this frame was being analysed
+        if not ring.is_current(seq):
+            print(f"⚠️ Ring frame {seq} overwritten during processing [spot {session.spot_id}]")
+            response["ring_overwritten"] = True
+        
+        session.last_ring_seq = seq
+        return response
+
+
 # ============================================================
 # FLASK ROUTES
 # ============================================================
@@ -1255,6 +2046,15 @@ def health_check():
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-session processing metrics."""
+    return jsonify({
+        "active_sessions": len(active_sessions),
+        "sessions": {str(spot_id): session.get_metrics() for spot_id, session in active_sessions.items()}
+    })
+
+
 @app.route('/detect-grid', methods=['POST'])
 def detect_grid():
     """
@@ -1368,6 +2168,27 @@ def start_detection():
         data = request.json or {}
         spot_id = data.get('parking_spot_id')
         grid_config = data.get('grid_config')
+        decode_scale = data.get('decode_scale', 1)  # 1/2/4/8 or "auto"
+        frame_ring = data.get('frame_ring')  # True (default name) or shared memory name
+        dedup = data.get('dedup', True)  # Skip duplicate / near-duplicate frames
+        stream_output = bool(data.get('stream_output', False))  # Annotated frames via /stream only
+        ensemble = data.get('ensemble', 'fast')  # "fast" or "full" (all voters)
+        analysis_size = data.get('analysis_size')  # Fixed slot tile size, e.g. 64 or [96, 64]
+        background = data.get('background')  # Frame-level background model: true or {scale, ...}
+        adaptive_reference = data.get('adaptive_reference')  # EMA reference for vacant slots
+        change_gate = data.get('change_gate')  # Skip the ensemble for unchanged slots
+        motion_tiles = data.get('motion_tiles')  # Coarse motion pre-pass: true or {tile_size, ...}
+        
+        try:
+            frame_policy = AnnotatedFramePolicy.from_config(data.get('annotated_frames'))
+            encoder = PreviewEncoder.from_config(data.get('preview'))  # Preview width / byte budget
+            normalizer = SlotNormalizer.from_config(analysis_size)
+            background_model = BackgroundModel.from_config(background)
+            reference_adapter = ReferenceAdapter.from_config(adaptive_reference)
+            gate = ChangeGate.from_config(change_gate)
+            tiles = MotionTiles.from_config(motion_tiles)
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
         
         if not spot_id:
             return jsonify({
@@ -1375,16 +2196,50 @@ def start_detection():
                 "message": "Missing parking_spot_id"
             }), 400
         
+        if ensemble not in ("fast", "full"):
+            return jsonify({"success": False, "message": f"Unknown ensemble: {ensemble}"}), 400
+        
+        # Replace (and stop) any previous session for this spot
+        previous = active_sessions.get(spot_id)
+        if previous is not None:
+            previous.stop_capture()
+            previous.close_frame_ring()
+            previous.broadcaster.close()
+        
         # Create session
-        session = DetectionSession(spot_id, grid_config)
+        session = DetectionSession(spot_id, grid_config, decode_scale, bool(dedup), frame_policy,
+                                   stream_output, encoder, ensemble, normalizer, background_model,
+                                   reference_adapter, gate, tiles)
         active_sessions[spot_id] = session
         
+        # Optional: frames come from a decoder process via shared memory
+        if frame_ring:
+            session.frame_ring_name = frame_ring if isinstance(frame_ring, str) else ring_name_for_spot(spot_id)
+        
+        # Optional: Python pulls the MJPEG stream itself (no Node hop / base64)
+        camera_url = data.get('camera_url') or (grid_config or {}).get('camera_url')
+        pull_camera = bool(data.get('pull_camera')) and bool(camera_url)
+        if pull_camera:
+            session.start_capture(camera_url, run_session_frame)
+        
         print(f"✅ Detection started for spot {spot_id}")
         return jsonify({
             "success": True,
             "message": "Detection started",
             "spot_id": spot_id,
-            "num_slots": len(session.slots)
+            "num_slots": len(session.slots),
+            "decode_scale": decode_scale,
+            "pull_camera": pull_camera,
+            "frame_ring": session.frame_ring_name,
+            "annotated_frames": frame_policy.describe(),
+            "stream_output": stream_output,
+            "preview": encoder.describe(),
+            "ensemble": ensemble,
+            "analysis_size": normalizer.describe() if normalizer else None,
+            "background": background_model.describe() if background_model else None,
+            "adaptive_reference": reference_adapter.describe() if reference_adapter else None,
+            "change_gate": session.change_gate.describe() if session.change_gate else None,
+            "motion_tiles": tiles.describe() if tiles else None
         })
     
     except Exception as e:
@@ -1404,7 +2259,10 @@ def stop_detection():
         spot_id = data.get('parking_spot_id')
         
         if spot_id in active_sessions:
-            del active_sessions[spot_id]
+            session = active_sessions.pop(spot_id)
+            session.stop_capture()
+            session.close_frame_ring()
+            session.broadcaster.close()
             print(f"⏹️ Detection stopped for spot {spot_id}")
             return jsonify({
                 "success": True,
@@ -1426,13 +2284,21 @@ def stop_detection():
 
 @app.route('/process-frame', methods=['POST'])
 def process_frame():
-    """Process a video frame for parking detection."""
+    """
+    Process a video frame for parking detection.
+    
+    Accepts the original JSON body ({"spot_id", "frame": base64, "timestamp"})
+    or a binary upload: raw image/jpeg body, or multipart/form-data with a
+    "frame" file part. Binary uploads pass spot_id/timestamp in the query
+    string (?spot_id=5&timestamp=...), form fields or X-Spot-Id/X-Timestamp headers.
+    
+    Delta mode (opt-in): pass delta=1 and ack_seq=<last seq applied>. The
+    response then carries only slots whose status or confidence bucket
+    changed after ack_seq, plus every state change since then.
+    """
     try:
-        data = request.json or {}
-        spot_id = data.get('spot_id')
-        frame_b64 = data.get('frame')
-        timestamp = data.get('timestamp', time.time())
-        use_ai = data.get('use_ai', True)
+        frame_request = read_frame_request(request)
+        spot_id = resolve_spot_id(frame_request["spot_id"], active_sessions)
         
         if not spot_id:
             return jsonify({"error": "Missing spot_id"}), 400
@@ -1440,42 +2306,161 @@ def process_frame():
         if spot_id not in active_sessions:
             return jsonify({"error": "No active session for this spot"}), 400
         
-        if not frame_b64:
+        if not frame_request["frame_bytes"] and not frame_request["frame_b64"]:
             return jsonify({"error": "Missing frame data"}), 400
         
-        # Decode frame
-        frame_bgr = decode_base64_image(frame_b64)
+        session = active_sessions[spot_id]
+        response = run_session_frame(session, frame_request)
         
-        if frame_bgr is None:
+        if response is None:
             return jsonify({
                 "error": "Failed to decode image",
                 "occupancy": {"slots": {}},
                 "state_change": None
             }), 400
         
-        # Process frame
+        return jsonify(response)
+    
+    except Exception as e:
+        print(f"❌ Process frame error: {e}")
+        traceback.print_exc()
+        return jsonify({
+            "error": str(e),
+            "occupancy": {"slots": {}},
+            "state_change": None
+        }), 500
+
+
+def run_batch_item(frame_item: dict) -> dict:
+    """Process one spot's frame from a /process-frames batch; errors stay per spot."""
+    spot_id = resolve_spot_id(frame_item["spot_id"], active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        return {"error": "No active session for this spot"}
+    
+    if not frame_item["frame_bytes"] and not frame_item["frame_b64"]:
+        return {"error": "Missing frame data"}
+    
+    try:
+        response = run_session_frame(session, frame_item)
+    except Exception as e:
+        print(f"❌ Batch frame error [spot {spot_id}]: {e}")
+        traceback.print_exc()
+        return {"error": str(e), "occupancy": {"slots": {}}, "state_change": None}
+    
+    if response is None:
+        return {"error": "Failed to decode image", "occupancy": {"slots": {}}, "state_change": None}
+    
+    return response
+
+
+@app.route('/frame-policy', methods=['POST'])
+def set_frame_policy():
+    """
+    Change when a running session draws and sends annotated frames.
+    Body: {"spot_id", "annotated_frames": "always" | "never" | "on_change" | "every:N" | "fps:X" | "geometry"}
+    """
+    try:
+        data = request.json or {}
+        spot_id = resolve_spot_id(data.get('spot_id'), active_sessions)
+        
+        if spot_id not in active_sessions:
+            return jsonify({"error": "No active session"}), 400
+        
+        session = active_sessions[spot_id]
+        session.frame_policy = AnnotatedFramePolicy.from_config(data.get('annotated_frames'))
+        session.geometry_sent_key = None  # Resend geometry after a mode switch
+        
+        return jsonify({
+            "success": True,
+            "annotated_frames": session.frame_policy.describe()
+        })
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Frame policy error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/process-frames', methods=['POST'])
+def process_frames():
+    """
+    Process frames for many spots in one request.
+    
+    Accepts multipart/form-data with one JPEG file part per spot (field name
+    = spot_id or frame_<spot_id>), or JSON {"frames": [{"spot_id", "frame", ...}]}.
+    Spots are processed concurrently; results are keyed by spot_id and a
+    failing spot only sets "error" in its own entry. A spot may appear only
+    once per batch (400 otherwise), since each frame advances its trackers.
+    """
+    try:
+        start = time.time()
+        frame_items = read_batch_frame_request(request)
+        
+        if not frame_items:
+            return jsonify({"error": "No frames in request"}), 400
+        
+        spot_counts = Counter(str(item["spot_id"]) for item in frame_items)
+        duplicates = sorted(spot_id for spot_id, count in spot_counts.items() if count > 1)
+        if duplicates:
+            return jsonify({
+                "error": "Each spot_id may appear only once per batch",
+                "duplicates": duplicates
+            }), 400
+        
+        responses = list(SPOT_EXECUTOR.map(run_batch_item, frame_items))
+        results = {str(item["spot_id"]): response for item, response in zip(frame_items, responses)}
+        
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "elapsed_ms": round((time.time() - start) * 1000, 1)
+        })
+    
+    except Exception as e:
+        print(f"❌ Process frames error: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e), "results": {}}), 500
+
+
+@app.route('/process-shared-frame', methods=['POST'])
+def process_shared_frame():
+    """
+    Process a frame published to the spot's shared-memory frame ring.
+    
+    Body: {"spot_id", "seq" (optional, default newest), "use_ai", "delta", "ack_seq"}.
+    The session must have been started with "frame_ring" and a decoder process
+    (python frame_ring.py <spot_id> <camera_url>) must be writing frames.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        spot_id = resolve_spot_id(data.get('spot_id'), active_sessions)
+        
+        if spot_id not in active_sessions:
+            return jsonify({"error": "No active session for this spot"}), 400
+        
         session = active_sessions[spot_id]
-        annotated_frame, occupancy, state_change = session.process_frame(frame_bgr, use_ai)
+        if session.frame_ring_name is None:
+            return jsonify({"error": "Session has no frame ring"}), 400
         
-        # Build response
-        response = {
-            "occupancy": {"slots": occupancy},
-            "state_change": state_change,
-            "timestamp": timestamp,
-            "frame_count": session.frame_count,
-            "num_slots": len(session.slots)
-        }
+        response = run_session_ring_frame(session, data.get('seq'), data.get('use_ai', True))
         
-        # Include annotated frame
-        if annotated_frame is not None:
-            encoded = encode_frame_to_base64(annotated_frame, quality=75)
-            if encoded:
-                response["processed_frame"] = encoded
+        if response is None:
+            return jsonify({
+                "error": "No frame available in ring",
+                "occupancy": {"slots": {}},
+                "state_change": None
+            }), 404
+        
+        if data.get('delta'):
+            response = delta_frame_response(session, response, data.get('ack_seq'))
         
         return jsonify(response)
     
     except Exception as e:
-        print(f"❌ Process frame error: {e}")
+        print(f"❌ Process shared frame error: {e}")
         traceback.print_exc()
         return jsonify({
             "error": str(e),
@@ -1484,6 +2469,85 @@ def process_frame():
         }), 500
 
 
+@app.route('/latest-result/<spot_id>', methods=['GET'])
+def latest_result(spot_id):
+    """Latest detection result for a spot running in pull_camera mode."""
+    spot_id = resolve_spot_id(spot_id, active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        return jsonify({"error": "No active session for this spot"}), 404
+    
+    if session.last_response is None:
+        return jsonify({
+            "occupancy": {"slots": {}},
+            "state_change": None,
+            "frame_count": session.frame_count,
+            "num_slots": len(session.slots)
+        })
+    
+    return jsonify(session.last_response)
+
+
+@app.route('/stream/<spot_id>', methods=['GET'])
+def stream(spot_id):
+    """
+    Annotated frames as a multipart MJPEG stream (usable directly in an <img>).
+    Each frame is encoded once and shared by all viewers; a slow viewer skips
+    to the newest frame. Sessions whose frame policy never draws ("never",
+    "geometry") get 409, and open streams end when the policy switches to one.
+    """
+    spot_id = resolve_spot_id(spot_id, active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        return jsonify({"error": "No active session for this spot"}), 404
+    
+    if not session.frame_policy.draws_frames:
+        return jsonify({
+            "error": "Session does not draw annotated frames",
+            "annotated_frames": session.frame_policy.describe()
+        }), 409
+    
+    return Response(session.broadcaster.stream(active=lambda: session.frame_policy.draws_frames),
+                    mimetype=MJPEG_MIMETYPE, headers={"Cache-Control": "no-cache, no-store"})
+
+
+@app.route('/slot-geometry/<spot_id>', methods=['GET'])
+def slot_geometry(spot_id):
+    """Current slot geometry for client-side overlays (geometry response mode)."""
+    spot_id = resolve_spot_id(spot_id, active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        return jsonify({"error": "No active session for this spot"}), 404
+    
+    geometry = session.slot_geometry()
+    if geometry is None:
+        return jsonify({"error": "No frame processed yet"}), 404
+    
+    return jsonify(geometry)
+
+
+@app.route('/motion-tiles/<spot_id>', methods=['GET'])
+def motion_tile_map(spot_id):
+    """Current motion tile map of a session (for tuning the motion_tiles pre-pass)."""
+    spot_id = resolve_spot_id(spot_id, active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        return jsonify({"error": "No active session for this spot"}), 404
+    
+    if session.motion_tiles is None:
+        return jsonify({"error": "Motion tiles not enabled for this session"}), 404
+    
+    tile_map = session.motion_tiles.tile_map()
+    if tile_map is None:
+        return jsonify({"error": "No frame processed yet"}), 404
+    
+    return jsonify({**tile_map, **session.motion_tiles.describe()})
+
+
 @app.route('/set-reference', methods=['POST'])
 def set_reference():
     """Set reference frame (empty parking lot) for a session."""
@@ -1498,11 +2562,12 @@ def set_reference():
         if not frame_b64:
             return jsonify({"error": "Missing frame"}), 400
         
-        frame_bgr = decode_base64_image(frame_b64)
+        session = active_sessions[spot_id]
+        
+        frame_bgr = decode_base64_image(frame_b64, session.decode_scale)
         if frame_bgr is None:
             return jsonify({"error": "Invalid image"}), 400
         
-        session = active_sessions[spot_id]
         session.set_reference_frame(frame_bgr)
         
         return jsonify({
@@ -1515,6 +2580,61 @@ def set_reference():
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================================
+# WEBSOCKET FRAME CHANNEL
+# ============================================================
+
+def frame_channel(ws, spot_id):
+    """
+    Long-lived frame stream for one spot: ws://host:5001/ws/frames/<spot_id>
+    
+    Send binary JPEG frames (optionally preceded by a JSON {"timestamp", "use_ai"}
+    text message). The server answers each processed frame with an "occupancy"
+    message and an extra "state_change" message per slot that flips. Frames that
+    arrive while another is being processed replace each other, so only the
+    newest one waits. The socket is closed once the session is stopped or
+    replaced by a new /start-detection.
+    """
+    spot_id = resolve_spot_id(spot_id, active_sessions)
+    session = active_sessions.get(spot_id)
+    
+    if session is None:
+        ws.send('{"type": "error", "error": "No active session for this spot"}')
+        return
+    
+    def process(frame_item):
+        current = active_sessions.get(spot_id)
+        if current is None:
+            raise ChannelClosed("Detection session stopped")
+        if current is not session:
+            raise ChannelClosed("Detection session was restarted; reconnect")
+        
+        response = run_session_frame(session, frame_item)
+        if response is None:
+            return [{"type": "error", "error": "Failed to decode image"}]
+        
+        messages = [{"type": "occupancy", "spot_id": spot_id, **response}]
+        for change in response["state_changes"]:
+            messages.append({
+                "type": "state_change",
+                "spot_id": spot_id,
+                "change": change
+            })
+        return messages
+    
+    print(f"🔌 Frame channel opened for spot {spot_id}")
+    channel = FrameChannel(ws, process)
+    channel.run()
+    print(f"🔌 Frame channel closed for spot {spot_id} "
+          f"({channel.frames_processed} processed, {channel.slot.dropped} dropped)")
+
+
+if SOCK is not None:
+    SOCK.route('/ws/frames/<spot_id>')(frame_channel)
+else:
+    print("⚠️ flask-sock not installed - WebSocket frame channel disabled")
+
+
 # ============================================================
 # MAIN
 # ============================================================
@@ -0,0 +1,148 @@
+"""
+Background Model - Frame-level running-average background for change detection
+Reference comparison used to be a per-slot absdiff against one static
+empty-lot crop captured on frame 1 (or /set-reference), so any lighting drift
+made every slot look "changed". The session's BackgroundModel keeps a running
+average of the whole frame at reduced resolution instead:
+
+    foreground = |gray - background| > threshold   (one absdiff per frame)
+    per-slot foreground ratio = integral-image lookup over the slot rectangle
+
+After each detection frame the background absorbs the new frame with a small
+learning rate, but only outside slots that are occupied (or just detected as
+occupied), so parked cars never fade into the background while the empty lot
+follows the light. A running average is used rather than MOG2 / KNN because
+cv2.accumulateWeighted takes an update mask; the OpenCV subtractors can only
+learn from the whole frame.
+
+Config (start-detection "background"):
+    true, or {"scale": 4, "learning_rate": 0.01, "threshold": 40}
+"""
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from slot_stats import REFERENCE_DIFF_THRESHOLD, mask_integral, rect_sums, workspace_buffer
+
+DEFAULT_SCALE = 4             # Model runs at 1/4 width and height
+DEFAULT_LEARNING_RATE = 0.01  # Per detection frame; ~100 frames to follow a lighting change
+
+
+class BackgroundModel:
+    """Per-session reduced-resolution background and per-frame foreground mask."""
+
+    def __init__(self, scale: int = DEFAULT_SCALE, learning_rate: float = DEFAULT_LEARNING_RATE,
+                 threshold: int = REFERENCE_DIFF_THRESHOLD):
+        self.scale = max(1, int(scale))
+        self.learning_rate = float(learning_rate)
+        self.threshold = int(threshold)
+        self.background: Optional[np.ndarray] = None  # float32 running average
+        self.gray = None                  # Last applied frame, reduced
+        self.update_mask = None
+        self.foreground_integral = None
+        self.workspace: Dict[str, np.ndarray] = {}
+        self.frames_applied = 0
+
+    @classmethod
+    def from_config(cls, value: Any) -> Optional["BackgroundModel"]:
+        """Build a model from a start-detection "background" value (None = off)."""
+        if not value:
+            return None
+        if value is True:
+            return cls()
+        if not isinstance(value, dict):
+            raise ValueError("background must be true or an object with scale / learning_rate / threshold")
+        try:
+            model = cls(value.get("scale", DEFAULT_SCALE),
+                        value.get("learning_rate", DEFAULT_LEARNING_RATE),
+                        value.get("threshold", REFERENCE_DIFF_THRESHOLD))
+        except (TypeError, ValueError):
+            raise ValueError("background scale / learning_rate / threshold must be numbers")
+        if not 0.0 < model.learning_rate <= 1.0:
+            raise ValueError("background learning_rate must be in (0, 1]")
+        return model
+
+    def describe(self) -> dict:
+        return {"scale": self.scale, "learning_rate": self.learning_rate, "threshold": self.threshold}
+
+    def _reduce(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Gray frame at model resolution, in the model's reused buffer."""
+        height, width = frame_bgr.shape[:2]
+        size = (max(1, width // self.scale), max(1, height // self.scale))
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY,
+                            dst=workspace_buffer(self.workspace, "gray", (height, width), np.uint8))
+        if size == (width, height):
+            return gray
+        return cv2.resize(gray, size, dst=workspace_buffer(self.workspace, "reduced", size[::-1], np.uint8),
+                          interpolation=cv2.INTER_AREA)
+
+    def seed(self, frame_bgr: np.ndarray):
+        """Restart the background from frame_bgr (e.g. a new empty-lot reference)."""
+        self.background = self._reduce(frame_bgr).astype(np.float32)
+
+    def apply(self, frame_bgr: np.ndarray):
+        """Foreground mask of frame_bgr against the current background (no update yet)."""
+        self.gray = self._reduce(frame_bgr)
+        if self.background is None:
+            self.background = self.gray.astype(np.float32)
+        elif self.background.shape != self.gray.shape:
+            # Decode scale changed: keep what was learned, at the new size
+            self.background = cv2.resize(self.background, self.gray.shape[::-1],
+                                         interpolation=cv2.INTER_AREA)
+
+        background = cv2.convertScaleAbs(
+            self.background, dst=workspace_buffer(self.workspace, "background", self.gray.shape, np.uint8))
+        diff = cv2.absdiff(self.gray, background,
+                           dst=workspace_buffer(self.workspace, "diff", self.gray.shape, np.uint8))
+        self.foreground_integral = mask_integral(diff, self.threshold, self.workspace, "foreground")
+        self.frames_applied += 1
+
+    def _rects(self, boxes: Iterable[Tuple[int, int, int, int]]) -> np.ndarray:
+        """Full-frame boxes in model coordinates, at least one model pixel each."""
+        height, width = self.gray.shape
+        rects = []
+        for x1, y1, x2, y2 in boxes:
+            rx1 = min(width - 1, x1 // self.scale)
+            ry1 = min(height - 1, y1 // self.scale)
+            rx2 = min(width, max(rx1 + 1, math.ceil(x2 / self.scale)))
+            ry2 = min(height, max(ry1 + 1, math.ceil(y2 / self.scale)))
+            rects.append((rx1, ry1, rx2, ry2))
+        return np.array(rects, dtype=np.intp).reshape(-1, 4)
+
+    def foreground_ratios(self, boxes: Iterable[Tuple[int, int, int, int]]) -> np.ndarray:
+        """Fraction of foreground pixels in each full-frame box (after apply)."""
+        rects = self._rects(boxes)
+        area = ((rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])).astype(np.float64)
+        return rect_sums(self.foreground_integral, rects) / area
+
+    def update(self, occupied_boxes: Iterable[Tuple[int, int, int, int]]):
+        """Blend the applied frame into the background everywhere except occupied_boxes."""
+        if self.gray is None or self.background is None:
+            return
+        self.update_mask = workspace_buffer(self.workspace, "update_mask", self.gray.shape, np.uint8)
+        self.update_mask.fill(255)
+        for x1, y1, x2, y2 in self._rects(occupied_boxes):
+            self.update_mask[y1:y2, x1:x2] = 0
+        cv2.accumulateWeighted(self.gray, self.background, self.learning_rate, mask=self.update_mask)
+
+
+# Drift check: a slow global brightening is absorbed, a parked car is not
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    lot = cv2.GaussianBlur(rng.integers(60, 120, (720, 1280, 3), dtype=np.uint8), (0, 0), 3)
+    car_box = (400, 300, 560, 420)
+
+    model = BackgroundModel()
+    model.seed(lot)
+    for step in range(300):
+        frame = cv2.add(lot, np.full_like(lot, step // 5))  # +60 brightness over the run
+        x1, y1, x2, y2 = car_box
+        frame[y1:y2, x1:x2] = (235, 235, 235)  # White car
+        model.apply(frame)
+        car, empty = model.foreground_ratios([car_box, (800, 300, 960, 420)])
+        model.update([car_box])
+        if step % 100 == 99:
+            print(f"🌗 frame {step + 1}: brightness +{step // 5}, "
+                  f"car foreground {car:.2f}, empty slot foreground {empty:.2f}")
@@ -6,7 +6,6 @@ import cv2
 import numpy as np
 from transformers import AutoProcessor, AutoModelForCausalLM
 import base64
-from io import BytesIO
 from collections import deque
 from typing import Any, cast, Optional, Tuple, List
 import time
@@ -14,6 +13,12 @@ import traceback
 import random
 import os
 
+from frame_decoder import decode_jpeg_bytes
+from frame_ingest import read_frame_request, resolve_spot_id
+from frame_objects import FrameObjectDetector
+from occupancy_delta import OccupancyDeltaLog
+from frame_policy import AnnotatedFramePolicy, build_slot_geometry
+
 app = Flask(__name__)
 CORS(app)
 
@@ -810,61 +815,81 @@ def detect_vehicle_difference_based(slot_region_bgr: np.ndarray,
         return False, 0.5
 
 
-def detect_vehicle_yolo_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+# Slot crops per batched YOLO call (bounds the letterboxed batch tensor)
+YOLO_SLOT_BATCH_SIZE = 32
+
+
+def _yolo_vote(max_conf: Optional[float]) -> Tuple[bool, float]:
+    """Turn the highest detection confidence of a crop (None = no detections) into a vote."""
+    if max_conf is None:
+        return False, 0.5
+    if max_conf > 0.25:
+        return True, min(0.95, max_conf)
+    return False, max_conf
+
+
+def _yolo_max_confidences(results, count: int) -> List[Optional[float]]:
+    """Highest confidence per input image of one YOLO call (ultralytics or YOLOv5 results)."""
+    # YOLOv5 hub: one Detections object, pred[i] = (n, 6) tensor per image
+    if hasattr(results, 'pred'):
+        per_image = [pred[:, 4] for pred in results.pred]
+    else:
+        per_image = [result.boxes.conf if hasattr(result, 'boxes') else None for result in results]
+    
+    max_confs: List[Optional[float]] = []
+    for confidences in per_image[:count]:
+        if confidences is None or len(confidences) == 0:
+            max_confs.append(None)
+        else:
+            max_confs.append(float(np.max(confidences.cpu().numpy())))
+    return max_confs + [None] * (count - len(max_confs))
+
+
+def detect_vehicles_yolo_batch(slot_regions_bgr: List[np.ndarray]) -> List[Tuple[bool, float]]:
     """
-    Detect vehicle using custom trained YOLO model (best.pt).
-    Your 2-day trained model for shape detection.
-    Returns: (is_occupied, confidence)
+    Detect vehicles in many slot crops with batched YOLO calls (best.pt).
+    One model invocation per YOLO_SLOT_BATCH_SIZE crops instead of one per
+    slot: preprocessing, the forward pass and NMS run once for the batch, and
+    each crop's highest confidence is scattered back to its slot's vote.
+    Returns: (is_occupied, confidence) per crop, in input order
     """
     global YOLO_MODEL, YOLO_LOADED
     
-    if not YOLO_LOADED or YOLO_MODEL is None:
-        return False, 0.5
+    votes = [(False, 0.5)] * len(slot_regions_bgr)
+    if not YOLO_LOADED or YOLO_MODEL is None or not slot_regions_bgr:
+        return votes
     
-    try:
-        # Convert BGR to RGB for YOLO
-        slot_rgb = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2RGB)
-        
-        # Run YOLO inference - use smaller imgsz for slot regions (faster)
-        # Slot regions are typically 100x100, no need for 640
-        results = YOLO_MODEL(
-            slot_rgb, 
-            imgsz=160,      # Smaller size for speed - slot regions are small
-            conf=0.25,      # Reasonable confidence threshold
-            verbose=False
-        )  # type: ignore
-        
-        # Check if any objects detected
-        if len(results) > 0:
-            result = results[0]
+    for start in range(0, len(slot_regions_bgr), YOLO_SLOT_BATCH_SIZE):
+        batch = slot_regions_bgr[start:start + YOLO_SLOT_BATCH_SIZE]
+        try:
+            # Convert BGR to RGB for YOLO
+            batch_rgb = [cv2.cvtColor(region, cv2.COLOR_BGR2RGB) for region in batch]
             
-            # Check for detections
-            if hasattr(result, 'boxes') and len(result.boxes) > 0:
-                # Get highest confidence detection
-                confidences = result.boxes.conf.cpu().numpy()
-                max_conf = float(np.max(confidences))
-                
-                # If confidence > threshold, consider occupied
-                if max_conf > 0.25:
-                    return True, min(0.95, max_conf)
-                else:
-                    return False, max_conf
+            # Every crop is letterboxed to imgsz, so the batch stacks into one tensor
+            results = YOLO_MODEL(
+                batch_rgb,
+                imgsz=160,      # Smaller size for speed - slot regions are small
+                conf=0.25,      # Reasonable confidence threshold
+                verbose=False
+            )  # type: ignore
             
-            # YOLOv5 format
-            elif hasattr(result, 'pred') and len(result.pred[0]) > 0:
-                confidences = result.pred[0][:, 4].cpu().numpy()
-                max_conf = float(np.max(confidences))
-                
-                if max_conf > 0.25:
-                    return True, min(0.95, max_conf)
-                else:
-                    return False, max_conf
-        
-        return False, 0.5
+            for offset, max_conf in enumerate(_yolo_max_confidences(results, len(batch))):
+                votes[start + offset] = _yolo_vote(max_conf)
+        except Exception:
+            # Silently fail to avoid spam - this batch keeps the neutral vote
+            pass
     
-    except Exception:
-        # Silently fail to avoid spam
-        return False, 0.5
+    return votes
+
+
+def detect_vehicle_yolo_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+    """
+    Detect vehicle using custom trained YOLO model (best.pt).
+    Your 2-day trained model for shape detection.
+    Single-crop form of detect_vehicles_yolo_batch.
+    Returns: (is_occupied, confidence)
+    """
+    return detect_vehicles_yolo_batch([slot_region_bgr])[0]
 
 
 def detect_vehicle_motion_based(slot_region_bgr: np.ndarray,
@@ -1057,23 +1082,36 @@ def detect_shadow(slot_region_bgr: np.ndarray,
         return False, 0.5
 
 
+def is_hard_shadow(shadow: Tuple[bool, float]) -> bool:
+    """True when a detect_shadow() result short-circuits the ensemble to vacant."""
+    is_shadow, shadow_conf = shadow
+    return is_shadow and shadow_conf > 0.7
+
+
 def detect_vehicle_ensemble(slot_region_bgr: np.ndarray, 
                            reference_region_bgr: Optional[np.ndarray] = None,
                            previous_region_bgr: Optional[np.ndarray] = None,
-                           use_ai: bool = True) -> Tuple[bool, float, bool]:
+                           use_ai: bool = True,
+                           yolo_vote: Optional[Tuple[bool, float]] = None,
+                           shadow: Optional[Tuple[bool, float]] = None) -> Tuple[bool, float, bool]:
     """
     Ensemble detection combining multiple methods for best accuracy.
     SHADOW-ROBUST: Includes dedicated shadow detection to filter false positives.
     Includes: Shadow check, Color, Texture, Difference, YOLO (custom trained), and Motion.
+    yolo_vote: This slot's result from a frame-wide detect_vehicles_yolo_batch
+        call; YOLO runs on the crop here only when it is None
+    shadow: Precomputed detect_shadow() result for this crop, if any
     Returns: (is_occupied, confidence, is_shadow)
     Returns: (is_occupied, confidence)
     """
     
     # FIRST: Check if this is likely a shadow (early exit to avoid false positives)
-    is_shadow, shadow_conf = detect_shadow(slot_region_bgr, reference_region_bgr)
+    if shadow is None:
+        shadow = detect_shadow(slot_region_bgr, reference_region_bgr)
+    is_shadow, shadow_conf = shadow
     
     # PATCH 1: HARD SHADOW GATE - return immediately with high confidence vacant
-    if is_shadow and shadow_conf > 0.7:
+    if is_hard_shadow(shadow):
         return False, 0.85, True  # Added is_shadow flag for caller
     
     votes = []
@@ -1108,7 +1146,9 @@ def detect_vehicle_ensemble(slot_region_bgr: np.ndarray,
     # Method 4: YOLO custom model (weight: 3.0 - YOLO is good at ignoring shadows)
     # YOLO trained on actual objects, not shadows
     if use_ai and YOLO_LOADED:
-        is_occ_yolo, conf_yolo = detect_vehicle_yolo_based(slot_region_bgr)
+        if yolo_vote is None:
+            yolo_vote = detect_vehicle_yolo_based(slot_region_bgr)
+        is_occ_yolo, conf_yolo = yolo_vote
         votes.append(is_occ_yolo)
         confidences.append(conf_yolo)
         weights.append(3.0)  # Increased - YOLO is shadow-robust by nature
@@ -1153,22 +1193,21 @@ def decode_base64_image(frame_b64: str):
         
         img_bytes = base64.b64decode(frame_b64)
         
-        if len(img_bytes) < 100:
-            print(f"⚠️ Image data too small: {len(img_bytes)} bytes")
-            return None
-        
-        pil_image = Image.open(BytesIO(img_bytes))
-        
-        if pil_image.mode != "RGB":
-            pil_image = pil_image.convert("RGB")
-        
-        rgb_array = np.array(pil_image)
-        
-        if rgb_array is None or rgb_array.size == 0:
+        return decode_image_bytes(img_bytes)
+    
+    except Exception as e:
+        print(f"⚠️ Image decode error: {e}")
+        return None
+
+
+def decode_image_bytes(img_bytes: bytes):
+    """Decode raw encoded image bytes (binary uploads) straight to BGR in one pass."""
+    try:
+        if img_bytes is None or len(img_bytes) < 100:
+            print(f"⚠️ Image data too small: {len(img_bytes) if img_bytes else 0} bytes")
             return None
         
-        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGB2BGR)
-        return bgr_array
+        return decode_jpeg_bytes(img_bytes)
     
     except Exception as e:
         print(f"⚠️ Image decode error: {e}")
@@ -1361,7 +1400,9 @@ class DetectionSession:
     """Manages detection for a single parking spot."""
     
     def __init__(self, spot_id, grid_config: Optional[dict] = None, 
-                 slot_mapping: Optional[dict] = None, auto_detect_grid: bool = True):
+                 slot_mapping: Optional[dict] = None, auto_detect_grid: bool = True,
+                 frame_policy: Optional[AnnotatedFramePolicy] = None,
+                 frame_detector: Optional[FrameObjectDetector] = None):
         self.spot_id = spot_id
         self.slot_mapping = slot_mapping or {}
         self.slots = {}
@@ -1373,6 +1414,11 @@ class DetectionSession:
         self.grid_config = grid_config  # Store for frame-size scaling
         self.reference_frame_size = None  # Will be set on first frame
         self.aoi = None  # Area of Interest for constraining detection
+        self.frame_policy = frame_policy or AnnotatedFramePolicy()  # When to draw/send previews
+        self.frame_size = None  # (width, height) of processed frames
+        self.geometry_sent_key = None  # Geometry already sent in geometry mode
+        self.frame_detector = frame_detector  # Whole-frame YOLO pass instead of per-slot crops
+        self.delta_log = OccupancyDeltaLog()  # Sequence-numbered slot changes for delta responses
         
         # Extract AOI from grid_config if present
         if grid_config and "aoi" in grid_config:
@@ -1494,9 +1540,10 @@ class DetectionSession:
         self.frame_count += 1
         
         if frame_bgr is None:
-            return None, {}, None
+            return None, {}, []
         
         height, width = frame_bgr.shape[:2]
+        self.frame_size = (width, height)
         
         # On first frame, scale normalized AOI to actual frame size
         if self.frame_count == 1 and hasattr(self, 'aoi_normalized') and self.aoi_normalized:
@@ -1574,18 +1621,22 @@ class DetectionSession:
             print("📸 Capturing first frame as reference")
             self.set_reference_frame(frame_bgr)
         
-        annotated = frame_bgr.copy()
         occupancy = {}
-        state_change = None
+        state_changes = []  # Every slot that flips this frame
         
         # If no slots detected yet, show message
         if len(self.slots) == 0:
+            if not self.frame_policy.wants_frame(self.frame_count, active=True):
+                return None, {}, []
+            annotated = frame_bgr.copy()
             message = "⚠️ NO GRID DETECTED - Draw slots manually or use Auto-Detect"
             cv2.rectangle(annotated, (10, 10), (width - 10, 60), (0, 0, 0), -1)
             cv2.putText(annotated, message, (20, 40),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            return annotated, {}, None
+            return annotated, {}, []
         
+        # Gather every analysable slot's crop first, so YOLO can see them all at once
+        regions = []
         for slot_num, tracker in self.slots.items():
             x1, y1, x2, y2 = clamp_bbox(tracker.bbox, width, height)
             
@@ -1613,12 +1664,31 @@ class DetectionSession:
                 }
                 continue
             
-            # Run ensemble detection - use AI less frequently for speed
+            shadow = detect_shadow(slot_region, tracker.reference_region)
+            regions.append((slot_num, tracker, slot_region, shadow, (x1, y1, x2, y2)))
+        
+        # Use AI less frequently for speed: every 5th frame, either one whole-frame
+        # YOLO pass or one batched pass over the slots that get past the hard shadow gate
+        ai_frame = use_ai and (self.frame_count % 5 == 0)
+        yolo_votes = {}
+        if ai_frame and YOLO_LOADED and self.frame_detector is not None:
+            frame_votes = self.detect_frame_objects(frame_bgr, [box for *_, box in regions])
+            yolo_votes = {region[0]: vote for region, vote in zip(regions, frame_votes)}
+        elif ai_frame and YOLO_LOADED:
+            voting = [(slot_num, slot_region) for slot_num, _, slot_region, shadow, _ in regions
+                      if not is_hard_shadow(shadow)]
+            batch_votes = detect_vehicles_yolo_batch([slot_region for _, slot_region in voting])
+            yolo_votes = {slot_num: vote for (slot_num, _), vote in zip(voting, batch_votes)}
+        
+        for slot_num, tracker, slot_region, shadow, _ in regions:
+            # Run ensemble detection
             result = detect_vehicle_ensemble(
                 slot_region, 
                 tracker.reference_region,
                 tracker.previous_region,
-                use_ai=use_ai and (self.frame_count % 5 == 0)  # Use AI every 5th frame for speed
+                use_ai=ai_frame,
+                yolo_vote=yolo_votes.get(slot_num),
+                shadow=shadow
             )
             
             # Unpack result (is_occupied, confidence, is_shadow)
@@ -1636,7 +1706,53 @@ class DetectionSession:
             # Update tracker with current region for next frame's motion detection
             change = tracker.update(is_occupied, confidence, slot_region)
             if change:
-                state_change = change
+                state_changes.append(change)
+            
+            occupancy[str(slot_num)] = {
+                "status": tracker.status,
+                "confidence": round(tracker.confidence, 2)
+            }
+        
+        # Skip the copy and all drawing when nobody wants this frame
+        active = bool(state_changes) or self.should_send_frame()
+        if not self.frame_policy.wants_frame(self.frame_count, active):
+            return None, occupancy, state_changes
+        
+        annotated = self.annotate_frame(frame_bgr)
+        
+        return annotated, occupancy, state_changes
+    
+    def detect_frame_objects(self, frame_bgr: np.ndarray,
+                             boxes: List[Tuple[int, int, int, int]]) -> List[Tuple[bool, float]]:
+        """
+        One YOLO pass over the whole frame (or the AOI), assigned to slots by overlap.
+        Args:
+            boxes: Clamped (x1, y1, x2, y2) of the slots to vote on
+        Returns: (is_occupied, confidence) per box, in input order
+        """
+        height, width = frame_bgr.shape[:2]
+        x1, y1, x2, y2 = clamp_bbox(self.aoi, width, height) if self.aoi else (0, 0, width, height)
+        
+        try:
+            # Convert BGR to RGB for YOLO (AOI only)
+            image_rgb = cv2.cvtColor(frame_bgr[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+            detections, confidences = self.frame_detector.detect(YOLO_MODEL, image_rgb, (x1, y1))  # type: ignore
+            self.frame_detector.set_slots(boxes)  # type: ignore
+            return [_yolo_vote(max_conf) for max_conf in self.frame_detector.assign(detections, confidences)]  # type: ignore
+        except Exception as e:
+            print(f"⚠️ Frame detection error: {e}")
+            return [(False, 0.5)] * len(boxes)
+    
+    def annotate_frame(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Draw slot outlines, labels and the summary on a copy of the frame."""
+        annotated = frame_bgr.copy()
+        height, width = frame_bgr.shape[:2]
+        
+        for slot_num, tracker in self.slots.items():
+            x1, y1, x2, y2 = clamp_bbox(tracker.bbox, width, height)
+            
+            if x2 - x1 < 20 or y2 - y1 < 20:
+                continue  # Too small to analyse, not drawn either
             
             # Draw annotation - use quadrilateral if corners available
             color = (0, 0, 255) if tracker.status == "occupied" else (0, 255, 0)
@@ -1666,11 +1782,6 @@ class DetectionSession:
                 # Draw confidence below
                 cv2.putText(annotated, conf_label, (x1 + 5, y2 + 20),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-            
-            occupancy[str(slot_num)] = {
-                "status": tracker.status,
-                "confidence": round(tracker.confidence, 2)
-            }
         
         # Add summary stats
         total_slots = len(self.slots)
@@ -1682,7 +1793,28 @@ class DetectionSession:
         cv2.putText(annotated, summary, (10, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         
-        return annotated, occupancy, state_change
+        return annotated
+    
+    def slot_geometry(self) -> Optional[dict]:
+        """Slot bboxes/corners in pixels and normalized coordinates for client overlays."""
+        if self.frame_size is None:
+            return None
+        return build_slot_geometry(self.slots, *self.frame_size)
+    
+    def geometry_update(self) -> Optional[dict]:
+        """Geometry to attach in geometry mode: once, then only when slots change."""
+        if not self.frame_policy.sends_geometry or self.frame_size is None or not self.slots:
+            return None
+        
+        key = (self.frame_size, tuple(
+            (tuple(t.bbox), tuple((c["x"], c["y"]) for c in t.corners or []))
+            for t in self.slots.values()
+        ))
+        if key == self.geometry_sent_key:
+            return None
+        
+        self.geometry_sent_key = key
+        return self.slot_geometry()
     
     def should_send_frame(self):
         """Check if we should send annotated frame."""
@@ -1722,6 +1854,12 @@ def start_detection():
         slot_mapping = data.get('slot_mapping')
         auto_detect = data.get('auto_detect_grid', True)
         
+        try:
+            frame_policy = AnnotatedFramePolicy.from_config(data.get('annotated_frames'))
+            frame_detector = FrameObjectDetector.from_config(data.get('frame_detection'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        
         if not spot_id:
             return jsonify({
                 "success": False,
@@ -1729,7 +1867,7 @@ def start_detection():
             }), 400
         
         # Create session (auto-detect if no config provided)
-        session = DetectionSession(spot_id, grid_config, slot_mapping, auto_detect)
+        session = DetectionSession(spot_id, grid_config, slot_mapping, auto_detect, frame_policy, frame_detector)
         active_sessions[spot_id] = session
         
         print(f"✅ Detection started for spot {spot_id}")
@@ -1738,7 +1876,9 @@ def start_detection():
             "message": "Detection started",
             "spot_id": spot_id,
             "num_slots": len(session.slots),
-            "auto_detect": auto_detect and not grid_config
+            "auto_detect": auto_detect and not grid_config,
+            "annotated_frames": frame_policy.describe(),
+            "frame_detection": frame_detector.describe() if frame_detector else None
         })
     
     except Exception as e:
@@ -1811,13 +1951,23 @@ def stop_detection():
 
 @app.route('/process-frame', methods=['POST'])
 def process_frame():
-    """Process a video frame for parking detection."""
+    """
+    Process a video frame for parking detection.
+    
+    Accepts the original JSON body ({"spot_id", "frame": base64, "timestamp"})
+    or a binary upload: raw image/jpeg body, or multipart/form-data with a
+    "frame" file part. Binary uploads pass spot_id/timestamp in the query
+    string (?spot_id=5&timestamp=...), form fields or X-Spot-Id/X-Timestamp headers.
+    
+    Delta mode (opt-in): pass delta=1 and ack_seq=<last seq applied>. The
+    response then carries only slots whose status or confidence bucket
+    changed after ack_seq, plus every state change since then.
+    """
     try:
-        data = request.json or {}
-        spot_id = data.get('spot_id')
-        frame_b64 = data.get('frame')
-        timestamp = data.get('timestamp', time.time())
-        use_ai = data.get('use_ai', True)
+        frame_request = read_frame_request(request)
+        spot_id = resolve_spot_id(frame_request["spot_id"], active_sessions)
+        timestamp = frame_request["timestamp"]
+        use_ai = frame_request["use_ai"]
         
         if not spot_id:
             return jsonify({"error": "Missing spot_id"}), 400
@@ -1825,11 +1975,14 @@ def process_frame():
         if spot_id not in active_sessions:
             return jsonify({"error": "No active session for this spot"}), 400
         
-        if not frame_b64:
+        if not frame_request["frame_bytes"] and not frame_request["frame_b64"]:
             return jsonify({"error": "Missing frame data"}), 400
         
-        # Decode frame
-        frame_bgr = decode_base64_image(frame_b64)
+        # Decode frame (binary uploads skip the base64 step)
+        if frame_request["frame_bytes"]:
+            frame_bgr = decode_image_bytes(frame_request["frame_bytes"])
+        else:
+            frame_bgr = decode_base64_image(frame_request["frame_b64"])
         
         if frame_bgr is None:
             return jsonify({
@@ -1840,23 +1993,34 @@ def process_frame():
         
         # Process frame
         session = active_sessions[spot_id]
-        annotated_frame, occupancy, state_change = session.process_frame(frame_bgr, use_ai)
+        annotated_frame, occupancy, state_changes = session.process_frame(frame_bgr, use_ai)
+        seq = session.delta_log.record(occupancy, state_changes)
         
-        # Build response
+        # Build response (state_change keeps the last flip for older clients)
         response = {
+            "seq": seq,
             "occupancy": {"slots": occupancy},
-            "state_change": state_change,
+            "state_change": state_changes[-1] if state_changes else None,
+            "state_changes": state_changes,
             "timestamp": timestamp,
             "frame_count": session.frame_count,
             "num_slots": len(session.slots)
         }
         
-        # Always include annotated frame so user can see live detection
+        # Geometry mode: the client draws the overlay itself
+        geometry = session.geometry_update()
+        if geometry is not None:
+            response["geometry"] = geometry
+        
+        # Include annotated frame when the session's frame policy produced one
         if annotated_frame is not None:
             encoded = encode_frame_to_base64(annotated_frame, quality=75)  # Lower quality for speed
             if encoded:
                 response["processed_frame"] = encoded
         
+        if frame_request.get("delta"):
+            response = delta_frame_response(session, response, frame_request.get("ack_seq"))
+        
         return jsonify(response)
     
     except Exception as e:
@@ -1869,6 +2033,32 @@ def process_frame():
         }), 500
 
 
+def delta_frame_response(session: DetectionSession, response: dict, ack_seq: Optional[int]) -> dict:
+    """
+    Shrink a full response to the slots and state changes after the client's
+    acknowledged seq. "full": true means occupancy.slots holds every slot.
+    """
+    delta = session.delta_log.delta_since(ack_seq)
+    
+    delta_response = {
+        "delta": True,
+        "seq": delta["seq"],
+        "base_seq": delta["base_seq"],
+        "full": delta["full"],
+        "occupancy": {"slots": delta["slots"]},
+        "state_changes": delta["state_changes"],
+        "timestamp": response["timestamp"],
+        "frame_count": response["frame_count"]
+    }
+    if delta["full"]:
+        delta_response["num_slots"] = response["num_slots"]
+    for key in ("processed_frame", "geometry"):
+        if key in response:
+            delta_response[key] = response[key]
+    
+    return delta_response
+
+
 @app.route('/detect-grid', methods=['POST'])
 def detect_grid():
     """Manual endpoint to detect grid from a frame."""
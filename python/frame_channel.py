@@ -0,0 +1,217 @@
+"""
+Frame Channel - Long-lived streaming frame socket for one parking spot
+The camera worker pushes binary JPEG frames over a WebSocket and gets
+occupancy / state-change messages back asynchronously. One frame is processed
+while the next one uploads; if several arrive in the meantime only the newest
+is kept, so a slow detector never builds a backlog.
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ChannelClosed(Exception):
+    """Raised by process_fn to send a final error message and close the socket."""
+
+
+class LatestFrameSlot:
+    """
+    Single-slot frame buffer.
+    put() overwrites whatever is waiting (counting it as dropped),
+    get() blocks until a frame is available or the slot is closed.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: Any):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Take the newest item, or None on close/timeout."""
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item = self._item
+            self._item = None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+class FrameChannel:
+    """
+    Drives one WebSocket connection.
+
+    Client -> server messages:
+    - binary: a JPEG frame
+    - text JSON {"timestamp", "use_ai", "delta", "ack_seq"}: metadata for the next binary frame
+    - text JSON {"frame": base64, ...}: a base64 frame (same fields as /process-frame)
+
+    Server -> client messages are JSON text built by process_fn; every message
+    is sent from the worker thread, never from the receive loop. process_fn
+    raises ChannelClosed to end the connection (e.g. the session is gone).
+    """
+
+    def __init__(self, ws, process_fn: Callable[[Dict[str, Any]], List[Dict[str, Any]]]):
+        self.ws = ws
+        self.process_fn = process_fn
+        self.slot = LatestFrameSlot()
+        self.frames_received = 0
+        self.frames_processed = 0
+        self._pending_meta: Dict[str, Any] = {}
+        self._send_lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]):
+        with self._send_lock:
+            self.ws.send(json.dumps(message))
+
+    def close(self, error: Optional[str] = None):
+        """Stop processing and close the socket, sending error first when given."""
+        self.slot.close()
+        try:
+            if error:
+                self.send({"type": "error", "error": error})
+            self.ws.close()
+        except Exception:
+            pass
+
+    def run(self):
+        """Receive frames until the socket closes. Blocks the calling thread."""
+        worker = threading.Thread(target=self._worker_loop, daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                message = self.ws.receive()
+                if message is None:
+                    break
+                self._handle_message(message)
+        except Exception:
+            # Socket closed by the client or the connection dropped
+            pass
+        finally:
+            self.slot.close()
+            worker.join(timeout=5)
+
+    def _handle_message(self, message):
+        if isinstance(message, (bytes, bytearray)):
+            frame_item = {
+                "frame_bytes": bytes(message),
+                "frame_b64": None,
+                "timestamp": self._pending_meta.get("timestamp", time.time()),
+                "use_ai": self._pending_meta.get("use_ai", True),
+                "delta": self._pending_meta.get("delta", False),
+                "ack_seq": self._pending_meta.get("ack_seq"),
+            }
+            self._pending_meta = {}
+        else:
+            try:
+                data = json.loads(message)
+            except ValueError:
+                self.send({"type": "error", "error": "Invalid JSON message"})
+                return
+
+            if not data.get("frame"):
+                self._pending_meta = data
+                return
+
+            frame_item = {
+                "frame_bytes": None,
+                "frame_b64": data["frame"],
+                "timestamp": data.get("timestamp", time.time()),
+                "use_ai": data.get("use_ai", True),
+                "delta": data.get("delta", False),
+                "ack_seq": data.get("ack_seq"),
+            }
+
+        self.frames_received += 1
+        self.slot.put(frame_item)
+
+    def _worker_loop(self):
+        while not self.slot.closed:
+            frame_item = self.slot.get(timeout=1.0)
+            if frame_item is None:
+                continue
+
+            try:
+                messages = self.process_fn(frame_item)
+                self.frames_processed += 1
+                for message in messages:
+                    message["frames_dropped"] = self.slot.dropped
+                    self.send(message)
+            except ChannelClosed as e:
+                self.close(str(e))
+                return
+            except Exception as e:
+                print(f"⚠️ Frame channel error: {e}")
+                try:
+                    self.send({"type": "error", "error": str(e)})
+                except Exception:
+                    return
+
+
+# Local client stand-in for the camera worker
+if __name__ == "__main__":
+    import sys
+    import simple_websocket  # type: ignore
+
+    if len(sys.argv) < 3:
+        print("Usage: python frame_channel.py ws://localhost:5001/ws/frames/<spot_id> frame.jpg [count]")
+        sys.exit(1)
+
+    url, image_path = sys.argv[1], sys.argv[2]
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    with open(image_path, "rb") as f:
+        jpeg_bytes = f.read()
+
+    client = simple_websocket.Client.connect(url)
+    received = []
+
+    def reader():
+        try:
+            while True:
+                received.append(json.loads(client.receive()))
+        except Exception:
+            pass
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    start = time.time()
+    try:
+        for i in range(count):
+            client.send(json.dumps({"timestamp": time.time()}))
+            client.send(jpeg_bytes)
+            time.sleep(1 / 30)
+
+        time.sleep(1.0)
+        client.close()
+    except simple_websocket.ConnectionClosed:
+        count = i
+        print("⚠️ Connection closed by server")
+
+    elapsed = time.time() - start
+    occupancy = [m for m in received if m.get("type") == "occupancy"]
+    print(f"📤 Sent {count} frames in {elapsed:.2f}s")
+    print(f"📥 Received {len(occupancy)} occupancy messages")
+    for error in (m for m in received if m.get("type") == "error"):
+        print(f"   Error: {error.get('error')}")
+    if occupancy:
+        print(f"   Last: frame_count={occupancy[-1].get('frame_count')}, "
+              f"dropped={occupancy[-1].get('frames_dropped')}")
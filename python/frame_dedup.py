@@ -0,0 +1,128 @@
+"""
+Frame Dedup - Skips frames that cannot change the detection result
+The camera worker posts faster than many IP cameras produce new images, and
+static scenes repeat the same picture for minutes. Exact repeats are caught
+from a hash of the encoded bytes (no decode); near-repeats from a tiny
+grayscale thumbnail decoded at 1/8 scale, compared against the last frame that
+was actually processed so slow drift still accumulates into a change.
+"""
+import hashlib
+import threading
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+THUMBNAIL_SIZE = (40, 30)          # (width, height) of the comparison thumbnail
+NEAR_DUPLICATE_MAX_DIFF = 10       # Max per-pixel gray difference still treated as "same"
+MAX_SKIP_SECONDS = 2.0             # Always process at least one frame this often
+
+
+def frame_digest(frame_bytes: bytes) -> bytes:
+    """Hash of the encoded frame bytes."""
+    return hashlib.blake2b(frame_bytes, digest_size=16).digest()
+
+
+def frame_thumbnail(frame_bytes: bytes) -> Optional[np.ndarray]:
+    """Tiny grayscale thumbnail, decoded in the DCT domain at 1/8 scale."""
+    buffer = np.frombuffer(frame_bytes, dtype=np.uint8)
+    gray = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_8 | cv2.IMREAD_IGNORE_ORIENTATION)
+    if gray is None or gray.size == 0:
+        return None
+    return cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+
+class FrameDeduplicator:
+    """
+    Per-session duplicate detector.
+    check() returns "exact" or "near" for a frame that can be skipped, or None
+    after recording the frame as the new comparison reference.
+    """
+
+    def __init__(self, near_max_diff: int = NEAR_DUPLICATE_MAX_DIFF,
+                 max_skip_seconds: float = MAX_SKIP_SECONDS):
+        self.near_max_diff = near_max_diff
+        self.max_skip_seconds = max_skip_seconds
+        self.last_digest = None
+        self.last_thumbnail = None
+        self.last_processed_at = 0.0
+        self.exact_skipped = 0
+        self.near_skipped = 0
+        self.changes = 0  # Processed frames that differed from the reference
+        self._lock = threading.Lock()
+
+    def check(self, frame_bytes: bytes, allow_skip: bool = True) -> Optional[str]:
+        """
+        Args:
+            frame_bytes: Encoded frame
+            allow_skip: False forces the frame through (it still becomes the reference)
+        Returns:
+            "exact", "near", or None if the frame must be processed
+        """
+        digest = frame_digest(frame_bytes)
+        now = time.time()
+
+        with self._lock:
+            stale = now - self.last_processed_at >= self.max_skip_seconds
+            can_skip = allow_skip and not stale
+
+            exact = digest == self.last_digest
+            if can_skip and exact:
+                self.exact_skipped += 1
+                return "exact"
+
+            thumbnail = frame_thumbnail(frame_bytes)
+
+            near = (thumbnail is not None and self.last_thumbnail is not None
+                    and thumbnail.shape == self.last_thumbnail.shape
+                    and int(cv2.absdiff(thumbnail, self.last_thumbnail).max()) <= self.near_max_diff)
+            if can_skip and near:
+                self.near_skipped += 1
+                return "near"
+
+            if not (exact or near):
+                self.changes += 1
+            self.last_digest = digest
+            self.last_thumbnail = thumbnail
+            self.last_processed_at = now
+            return None
+
+    @property
+    def frames_skipped(self) -> int:
+        return self.exact_skipped + self.near_skipped
+
+    def stats(self) -> dict:
+        return {
+            "frames_skipped": self.frames_skipped,
+            "exact_duplicates": self.exact_skipped,
+            "near_duplicates": self.near_skipped
+        }
+
+
+# Quick check against a JPEG on disk: exact repeat, recompressed copy, changed copy
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python frame_dedup.py frame.jpg")
+        sys.exit(1)
+
+    with open(sys.argv[1], "rb") as f:
+        original = f.read()
+
+    image = cv2.imdecode(np.frombuffer(original, dtype=np.uint8), cv2.IMREAD_COLOR)
+    recompressed = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+    changed_image = image.copy()
+    h, w = image.shape[:2]
+    cv2.rectangle(changed_image, (w // 3, h // 3), (w // 2, h // 2), (30, 30, 200), -1)
+    changed = cv2.imencode(".jpg", changed_image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+    dedup = FrameDeduplicator()
+    for label, frame_bytes in (("original", original), ("repeat", original),
+                               ("recompressed", recompressed), ("changed", changed)):
+        start = time.perf_counter()
+        result = dedup.check(frame_bytes)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:>12}: {result or 'process'} ({elapsed:.2f} ms)")
+    print(f"📊 {dedup.stats()}")
@@ -0,0 +1,190 @@
+"""
+Frame Features - Shared gray / HSV / edge planes for all slot detectors
+Every slot detector used to run its own cvtColor to gray and HSV and its own
+Canny on its crop, several times per slot in the full ensemble. FrameFeatures
+converts gray and HSV once per frame over the union of all slot bboxes, and
+each slot's RegionFeatures hands out NumPy views into those planes and
+computes its edge maps once for all of its detectors.
+
+Planes are computed on first use, so a frame only pays for what the detectors
+actually read. The union is only converted when the slots cover it at least
+once over (overlapping perspective bboxes, tiled grids); for sparse layouts
+each slot converts just its own pixels, still once for all detectors.
+
+Only per-pixel planes (gray, HSV) are shared as views of the union. Blur,
+Canny and Sobel read neighbouring pixels, so a slot always runs them on its
+own crop of the shared gray plane: every plane a detector sees is identical
+to the per-crop result. Edges of the union itself are for union-wide
+consumers (slot_stats), not for slot voters.
+
+Reference (empty slot) crops never change, so SlotTracker precomputes their
+RegionFeatures once, including the scalar stats the detectors compare against.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class RegionFeatures:
+    """Lazily computed planes of one image region (a slot or a whole union)."""
+
+    def __init__(self, region_bgr: np.ndarray, parent: Optional["RegionFeatures"] = None,
+                 offset: Tuple[int, int] = (0, 0)):
+        self.bgr = region_bgr
+        self.parent = parent
+        self.offset = offset  # (x, y) of this region inside parent
+        self._gray = None
+        self._hsv = None
+        self._blurred = None
+        self._edges: Dict[tuple, np.ndarray] = {}
+        self._stats: Dict[str, Tuple[float, float]] = {}
+        self._gradient = None
+        self._gradient_stats = None
+
+    @classmethod
+    def of(cls, region_bgr: np.ndarray, features: Optional["RegionFeatures"] = None) -> "RegionFeatures":
+        """Detector helper: the caller's features if they match region_bgr, else local ones."""
+        if features is not None and features.bgr.shape == region_bgr.shape:
+            return features
+        return cls(region_bgr)
+
+    def _view(self, plane: np.ndarray) -> np.ndarray:
+        x, y = self.offset
+        height, width = self.bgr.shape[:2]
+        return plane[y:y + height, x:x + width]
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            if self.parent is not None:
+                self._gray = self._view(self.parent.gray)
+            else:
+                self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def hsv(self) -> np.ndarray:
+        if self._hsv is None:
+            if self.parent is not None:
+                self._hsv = self._view(self.parent.hsv)
+            else:
+                self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def blurred(self) -> np.ndarray:
+        """3x3 Gaussian-blurred gray plane."""
+        if self._blurred is None:
+            # On this region's own gray crop: borders reflect as in a per-crop blur
+            self._blurred = cv2.GaussianBlur(self.gray, (3, 3), 0)
+        return self._blurred
+
+    def edges(self, low: int, high: int, blurred: bool = False) -> np.ndarray:
+        """
+        Canny edges of this region's gray (or blurred gray) crop at the given
+        thresholds. Never a view of the parent's edges, which would differ
+        from a per-crop Canny next to the region border.
+        """
+        key = (low, high, blurred)
+        plane = self._edges.get(key)
+        if plane is None:
+            plane = cv2.Canny(self.blurred if blurred else self.gray, low, high)
+            self._edges[key] = plane
+        return plane
+
+    @property
+    def gradient(self) -> np.ndarray:
+        """
+        Sobel (3x3) gradient magnitude of this region's own gray crop, float32.
+        Sobel of uint8 gives exact integers in float32; only the sqrt rounds.
+        """
+        if self._gradient is None:
+            gx = cv2.Sobel(self.gray, cv2.CV_32F, 1, 0, ksize=3)
+            gy = cv2.Sobel(self.gray, cv2.CV_32F, 0, 1, ksize=3)
+            self._gradient = cv2.magnitude(gx, gy)
+        return self._gradient
+
+    def gradient_stats(self, thresholds: Iterable[float] = (),
+                       tolerance: float = 1e-3) -> Tuple[float, float, float]:
+        """
+        (mean, std, max) of the gradient magnitude, from the float32 plane.
+
+        The float32 magnitude is within 2^-24 (relative) of the float64 one, so
+        its stats differ by far less than tolerance. Only when a stat lies
+        within tolerance of one of thresholds is everything recomputed from a
+        float64 magnitude, so comparisons against those thresholds always come
+        out as they would in float64.
+        """
+        if self._gradient_stats is None:
+            mean, std = cv2.meanStdDev(self.gradient)
+            _, max_value, _, _ = cv2.minMaxLoc(self.gradient)
+            stats = (float(mean[0, 0]), float(std[0, 0]), float(max_value))
+
+            if any(abs(value - t) <= tolerance for value in stats for t in thresholds):
+                gx = cv2.Sobel(self.gray, cv2.CV_64F, 1, 0, ksize=3)
+                gy = cv2.Sobel(self.gray, cv2.CV_64F, 0, 1, ksize=3)
+                magnitude = np.sqrt(gx ** 2 + gy ** 2)
+                stats = (float(np.mean(magnitude)), float(np.std(magnitude)), float(np.max(magnitude)))
+
+            self._gradient_stats = stats
+        return self._gradient_stats
+
+    def mean_std(self, plane: str) -> Tuple[float, float]:
+        """(mean, std) of the "gray", "hue", "sat" or "val" plane."""
+        stats = self._stats.get(plane)
+        if stats is None:
+            if plane == "gray":
+                values = self.gray
+            else:
+                values = self.hsv[:, :, ("hue", "sat", "val").index(plane)]
+            stats = (float(np.mean(values)), float(np.std(values)))
+            self._stats[plane] = stats
+        return stats
+
+    def precompute(self, edge_thresholds: Iterable[Tuple[int, int]] = (),
+                   stat_planes: Iterable[str] = ()) -> "RegionFeatures":
+        """Compute planes, edge maps and stats up front (for regions reused every frame)."""
+        self.gray
+        self.hsv
+        for low, high in edge_thresholds:
+            self.edges(low, high)
+        for plane in stat_planes:
+            self.mean_std(plane)
+        return self
+
+
+class FrameFeatures:
+    """Planes computed once over the union bbox of a frame's slots."""
+
+    def __init__(self, frame_bgr: np.ndarray, bboxes: Iterable[Tuple[int, int, int, int]]):
+        bboxes = list(bboxes)
+        self.frame = frame_bgr
+        self.union = None
+        self.planes = None
+
+        if not bboxes:
+            return
+
+        x1 = min(b[0] for b in bboxes)
+        y1 = min(b[1] for b in bboxes)
+        x2 = max(b[2] for b in bboxes)
+        y2 = max(b[3] for b in bboxes)
+        slot_area = sum((b[2] - b[0]) * (b[3] - b[1]) for b in bboxes)
+
+        # Converting the union costs its area; per-slot conversion costs the slot total
+        if slot_area >= (x2 - x1) * (y2 - y1):
+            self.union = (x1, y1, x2, y2)
+            self.planes = RegionFeatures(frame_bgr[y1:y2, x1:x2])
+
+    @property
+    def shared(self) -> bool:
+        return self.planes is not None
+
+    def slot(self, bbox: Tuple[int, int, int, int]) -> RegionFeatures:
+        """Features for a clamped slot bbox (one of those given to the constructor)."""
+        x1, y1, x2, y2 = bbox
+        region = self.frame[y1:y2, x1:x2]
+        if self.planes is None:
+            return RegionFeatures(region)
+        return RegionFeatures(region, self.planes, (x1 - self.union[0], y1 - self.union[1]))
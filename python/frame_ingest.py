@@ -0,0 +1,190 @@
+"""
+Frame Ingest Helper - Parses /process-frame uploads
+Supports the original base64-in-JSON body as well as binary JPEG uploads
+(raw image/jpeg body or multipart/form-data) so frames skip the base64 round-trip
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+# Content types that carry the JPEG bytes directly in the request body
+BINARY_FRAME_MIMETYPES = ("image/jpeg", "image/jpg", "application/octet-stream")
+MULTIPART_MIMETYPE = "multipart/form-data"
+
+# Header fallbacks for binary uploads (query string and form fields win)
+PARAM_HEADERS = {
+    "spot_id": "X-Spot-Id",
+    "timestamp": "X-Timestamp",
+    "use_ai": "X-Use-AI",
+    "delta": "X-Delta",
+    "ack_seq": "X-Ack-Seq",
+}
+
+
+def is_binary_frame_request(req) -> bool:
+    """Check if a request carries the frame as binary instead of base64 JSON."""
+    return req.mimetype in BINARY_FRAME_MIMETYPES or req.mimetype == MULTIPART_MIMETYPE
+
+
+def parse_bool(value: Any, default: bool = True) -> bool:
+    """Parse a boolean sent as JSON bool, query string or header value."""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ("0", "false", "no", "off", "")
+
+
+def parse_timestamp(value: Any) -> Any:
+    """Parse a timestamp from query/header text, falling back to server time."""
+    if value is None or value == "":
+        return time.time()
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def parse_seq(value: Any) -> Optional[int]:
+    """Parse an acknowledged sequence number; None when absent or invalid."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _binary_param(req, name: str) -> Optional[str]:
+    """Look up a parameter for a binary upload: query string, form field, then header."""
+    value = req.args.get(name)
+    if value is None and req.mimetype == MULTIPART_MIMETYPE:
+        value = req.form.get(name)
+    if value is None:
+        value = req.headers.get(PARAM_HEADERS[name])
+    return value
+
+
+def read_frame_request(req) -> Dict[str, Any]:
+    """
+    Read spot_id, timestamp, use_ai and the frame payload from a request.
+
+    Accepted encodings:
+    - application/json: {"spot_id", "frame" (base64), "timestamp", "use_ai", "delta", "ack_seq"}
+    - image/jpeg body: spot_id/timestamp/use_ai/delta/ack_seq in query string or X-* headers
+    - multipart/form-data: "frame" file part, params as form fields, query or headers
+
+    Returns:
+        Dictionary with spot_id, timestamp, use_ai, delta, ack_seq and exactly
+        one of frame_bytes (binary uploads) or frame_b64 (JSON uploads) set
+    """
+    if is_binary_frame_request(req):
+        if req.mimetype == MULTIPART_MIMETYPE:
+            frame_file = req.files.get("frame")
+            frame_bytes = frame_file.read() if frame_file else None
+        else:
+            frame_bytes = req.get_data(cache=False)
+
+        return {
+            "spot_id": _binary_param(req, "spot_id"),
+            "timestamp": parse_timestamp(_binary_param(req, "timestamp")),
+            "use_ai": parse_bool(_binary_param(req, "use_ai")),
+            "delta": parse_bool(_binary_param(req, "delta"), default=False),
+            "ack_seq": parse_seq(_binary_param(req, "ack_seq")),
+            "frame_bytes": frame_bytes or None,
+            "frame_b64": None
+        }
+
+    data = req.get_json(silent=True) or {}
+    return {
+        "spot_id": data.get("spot_id"),
+        "timestamp": data.get("timestamp", time.time()),
+        "use_ai": data.get("use_ai", True),
+        "delta": parse_bool(data.get("delta"), default=False),
+        "ack_seq": parse_seq(data.get("ack_seq")),
+        "frame_bytes": None,
+        "frame_b64": data.get("frame")
+    }
+
+
+def _batch_spot_id(field_name: str) -> str:
+    """Multipart field name -> spot_id ("frame_5", "frame:5" and "5" all mean spot 5)."""
+    for prefix in ("frame_", "frame:", "frame-"):
+        if field_name.startswith(prefix):
+            return field_name[len(prefix):]
+    return field_name
+
+
+def read_batch_frame_request(req) -> List[Dict[str, Any]]:
+    """
+    Read frames for several spots from one /process-frames request.
+
+    Accepted encodings:
+    - multipart/form-data: one file part per spot, named by spot_id ("5" or
+      "frame_5"); optional "timestamp" / "use_ai" form fields apply to all
+      frames, "timestamp_5" / "use_ai_5" override them per spot; "delta" plus
+      "ack_seq_5" request delta responses
+    - application/json: {"frames": [{"spot_id", "frame" (base64), "timestamp", "use_ai", "ack_seq"}], "delta"}
+
+    Returns:
+        List of frame dicts shaped like read_frame_request() results
+    """
+    frames = []
+
+    if req.mimetype == MULTIPART_MIMETYPE:
+        default_timestamp = parse_timestamp(req.form.get("timestamp"))
+        default_use_ai = parse_bool(req.form.get("use_ai"))
+        delta = parse_bool(req.form.get("delta"), default=False)
+
+        for field_name, frame_file in req.files.items(multi=True):
+            spot_id = _batch_spot_id(field_name)
+            timestamp = req.form.get(f"timestamp_{spot_id}")
+            use_ai = req.form.get(f"use_ai_{spot_id}")
+            frames.append({
+                "spot_id": spot_id,
+                "timestamp": parse_timestamp(timestamp) if timestamp is not None else default_timestamp,
+                "use_ai": parse_bool(use_ai) if use_ai is not None else default_use_ai,
+                "delta": delta,
+                "ack_seq": parse_seq(req.form.get(f"ack_seq_{spot_id}")),
+                "frame_bytes": frame_file.read() or None,
+                "frame_b64": None
+            })
+        return frames
+
+    data = req.get_json(silent=True) or {}
+    delta = parse_bool(data.get("delta"), default=False)
+    for item in data.get("frames") or []:
+        frames.append({
+            "spot_id": item.get("spot_id"),
+            "timestamp": item.get("timestamp", time.time()),
+            "use_ai": item.get("use_ai", True),
+            "delta": parse_bool(item.get("delta"), default=delta),
+            "ack_seq": parse_seq(item.get("ack_seq")),
+            "frame_bytes": None,
+            "frame_b64": item.get("frame")
+        })
+    return frames
+
+
+def resolve_spot_id(spot_id: Any, sessions: Dict[Any, Any]) -> Any:
+    """
+    Map a spot_id onto the key used in the active sessions dict.
+
+    Binary uploads carry spot_id as text (query/header), while sessions are
+    keyed by whatever /start-detection received (usually an int).
+    """
+    if spot_id is None or spot_id in sessions:
+        return spot_id
+
+    candidates = [str(spot_id)]
+    try:
+        candidates.append(int(spot_id))
+    except (TypeError, ValueError):
+        pass
+
+    for candidate in candidates:
+        if candidate in sessions:
+            return candidate
+
+    return spot_id
@@ -0,0 +1,119 @@
+"""
+Annotated Frame Policy - Decides per session when to draw and send a preview
+Drawing the overlay and JPEG-encoding it costs more than detection on most
+frames, and most frames are never looked at. A session asks the policy after
+detection and skips the frame copy, drawing and encode when it says no.
+
+Config values (start-detection "annotated_frames"):
+    "always" (default), "never", "on_change",
+    "every:N" / {"mode": "every", "n": N},
+    "fps:X"   / {"mode": "fps", "fps": X},
+    "geometry": never draw; responses carry slot geometry (when it changes)
+                so the client overlays statuses on its own camera stream
+"""
+import time
+from typing import Any, Dict, Optional
+
+FRAME_POLICY_MODES = ("always", "never", "every", "on_change", "fps", "geometry")
+
+
+class AnnotatedFramePolicy:
+    """Per-session annotated frame output policy."""
+
+    def __init__(self, mode: str = "always", every_n: int = 1, max_fps: float = 0.0):
+        if mode not in FRAME_POLICY_MODES:
+            raise ValueError(f"Unknown annotated frame mode: {mode}")
+        self.mode = mode
+        self.every_n = max(1, int(every_n))
+        self.max_fps = float(max_fps)
+        self.last_sent_at = 0.0
+        self.frames_sent = 0
+
+    @classmethod
+    def from_config(cls, value: Any) -> "AnnotatedFramePolicy":
+        """Build a policy from a start-detection value (string or dict)."""
+        if value is None or value is True:
+            return cls("always")
+        if value is False:
+            return cls("never")
+
+        if isinstance(value, dict):
+            mode = str(value.get("mode", "always"))
+            return cls(mode, every_n=value.get("n", 1), max_fps=value.get("fps", 0.0))
+
+        mode, _, arg = str(value).strip().lower().partition(":")
+        if mode == "every":
+            return cls(mode, every_n=int(arg or 1))
+        if mode == "fps":
+            return cls(mode, max_fps=float(arg or 1.0))
+        return cls(mode)
+
+    def wants_frame(self, frame_count: int, active: bool, now: Optional[float] = None) -> bool:
+        """
+        Decide whether this frame gets an annotated copy.
+        Args:
+            frame_count: Session frame counter (1-based)
+            active: A slot changed status this frame or is waiting to change
+        """
+        if self.mode == "always":
+            wanted = True
+        elif self.mode in ("never", "geometry"):
+            wanted = False
+        elif self.mode == "every":
+            wanted = frame_count % self.every_n == 0
+        elif self.mode == "on_change":
+            wanted = active
+        else:
+            now = time.time() if now is None else now
+            wanted = self.max_fps > 0 and now - self.last_sent_at >= 1.0 / self.max_fps
+            if wanted:
+                self.last_sent_at = now
+
+        if wanted:
+            self.frames_sent += 1
+        return wanted
+
+    @property
+    def sends_geometry(self) -> bool:
+        return self.mode == "geometry"
+
+    @property
+    def draws_frames(self) -> bool:
+        """False when no annotated frame will ever be drawn (nothing to stream)."""
+        return self.mode not in ("never", "geometry")
+
+    def describe(self) -> dict:
+        config = {"mode": self.mode}
+        if self.mode == "every":
+            config["n"] = self.every_n
+        elif self.mode == "fps":
+            config["fps"] = self.max_fps
+        return config
+
+
+def build_slot_geometry(slots: Dict[Any, Any], frame_width: int, frame_height: int) -> dict:
+    """
+    Slot geometry for client-side overlays.
+    Args:
+        slots: slot_number -> tracker with .bbox and optionally .corners
+        frame_width, frame_height: Size of the analysed frame the bboxes refer to
+    Returns:
+        {"frame_size": [w, h], "slots": {slot: {"bbox", "bbox_normalized", "corners_normalized"?}}}
+    """
+    geometry = {}
+    for slot_num, tracker in slots.items():
+        x1, y1, x2, y2 = tracker.bbox
+        slot = {
+            "bbox": [int(x1), int(y1), int(x2), int(y2)],
+            "bbox_normalized": [round(x1 / frame_width, 4), round(y1 / frame_height, 4),
+                                round(x2 / frame_width, 4), round(y2 / frame_height, 4)]
+        }
+        corners = getattr(tracker, "corners", None)
+        if corners:
+            slot["corners_normalized"] = [
+                {"x": round(c["x"] / frame_width, 4), "y": round(c["y"] / frame_height, 4)}
+                for c in corners
+            ]
+        geometry[str(slot_num)] = slot
+
+    return {"frame_size": [frame_width, frame_height], "slots": geometry}
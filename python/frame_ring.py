@@ -0,0 +1,236 @@
+"""
+Shared Frame Ring - Decoded BGR frames in shared memory for one parking spot
+One decoder process writes frames; detection workers in any process attach by
+name and read them as zero-copy NumPy views, so a frame is decoded once no
+matter how many workers look at it.
+
+Layout (one multiprocessing.shared_memory block):
+    ring header:  magic, slots, height, width, channels, write_seq
+    slot i:       seq, timestamp, then height * width * channels frame bytes
+
+A slot's seq is zeroed while it is being written and set to the frame's
+sequence number afterwards, so readers can detect torn or overwritten frames.
+
+Before a writer unlinks a ring (close, or create() replacing it after a
+resolution change) it zeroes the magic. Readers still mapping the old block
+see retired == True and re-attach by name instead of re-reading a frozen ring.
+"""
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+RING_MAGIC = 0x50524E47  # "PRNG"
+RING_RETIRED = 0         # Magic of a block that has been (or is about to be) unlinked
+DEFAULT_RING_SLOTS = 4
+
+RING_HEADER = np.dtype([
+    ("magic", np.uint32),
+    ("slots", np.uint32),
+    ("height", np.uint32),
+    ("width", np.uint32),
+    ("channels", np.uint32),
+    ("reserved", np.uint32),
+    ("write_seq", np.uint64),
+])
+
+SLOT_HEADER = np.dtype([
+    ("seq", np.uint64),
+    ("timestamp", np.float64),
+])
+
+
+def ring_name_for_spot(spot_id) -> str:
+    """Shared memory block name used for a spot's frame ring."""
+    return f"parking_frames_{spot_id}"
+
+
+class SharedFrameRing:
+    """Fixed-size ring of BGR frames in shared memory."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+
+        header = np.ndarray((1,), dtype=RING_HEADER, buffer=shm.buf, offset=0)[0]
+        if int(header["magic"]) != RING_MAGIC:
+            del header  # Release the buffer so the caller can close shm
+            raise ValueError(f"Shared memory block {shm.name} is not a frame ring")
+        self.header = header
+
+        self.slots = int(self.header["slots"])
+        self.frame_shape = (int(self.header["height"]), int(self.header["width"]),
+                            int(self.header["channels"]))
+        self.frame_size = int(np.prod(self.frame_shape))
+        self.slot_stride = SLOT_HEADER.itemsize + self.frame_size
+
+        self._slot_headers = []
+        self._frames = []
+        for i in range(self.slots):
+            offset = RING_HEADER.itemsize + i * self.slot_stride
+            self._slot_headers.append(
+                np.ndarray((1,), dtype=SLOT_HEADER, buffer=shm.buf, offset=offset)
+            )
+            self._frames.append(
+                np.ndarray(self.frame_shape, dtype=np.uint8, buffer=shm.buf,
+                           offset=offset + SLOT_HEADER.itemsize)
+            )
+
+    @classmethod
+    def create(cls, name: str, height: int, width: int,
+               slots: int = DEFAULT_RING_SLOTS, channels: int = 3) -> "SharedFrameRing":
+        """Create a new ring (writer side). Replaces a stale block with the same name."""
+        size = RING_HEADER.itemsize + slots * (SLOT_HEADER.itemsize + height * width * channels)
+
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            if stale.size >= RING_HEADER.itemsize:
+                stale_header = np.ndarray((1,), dtype=RING_HEADER, buffer=stale.buf, offset=0)
+                if int(stale_header[0]["magic"]) == RING_MAGIC:
+                    stale_header[0]["magic"] = RING_RETIRED  # Tell readers still attached to it
+                del stale_header
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((1,), dtype=RING_HEADER, buffer=shm.buf, offset=0)
+        header[0] = (RING_MAGIC, slots, height, width, channels, 0, 0)
+        np.ndarray((size - RING_HEADER.itemsize,), dtype=np.uint8, buffer=shm.buf,
+                   offset=RING_HEADER.itemsize).fill(0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        """Attach to an existing ring (reader side)."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the block when they exit (Python < 3.13 tracks
+        # attached blocks too and would remove the writer's ring)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+        except Exception:
+            pass
+        try:
+            return cls(shm, owner=False)
+        except ValueError:
+            shm.close()  # Not a ring, or the writer has not finished create() yet
+            raise
+
+    @property
+    def retired(self) -> bool:
+        """True once the writer has unlinked (or replaced) this block; re-attach by name."""
+        return int(self.header["magic"]) != RING_MAGIC
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.header["write_seq"])
+
+    def write(self, frame_bgr: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """Copy a frame into the next slot. Returns its sequence number."""
+        if frame_bgr.shape != self.frame_shape:
+            raise ValueError(f"Frame shape {frame_bgr.shape} does not match ring {self.frame_shape}")
+
+        seq = self.write_seq + 1
+        index = (seq - 1) % self.slots
+        slot_header = self._slot_headers[index]
+
+        slot_header["seq"] = 0  # Mark slot as being written
+        np.copyto(self._frames[index], frame_bgr)
+        slot_header["timestamp"] = timestamp if timestamp is not None else time.time()
+        slot_header["seq"] = seq
+        self.header["write_seq"] = seq
+        return seq
+
+    def read(self, seq: Optional[int] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Zero-copy read of a frame.
+        Args:
+            seq: Sequence number to read (default: newest)
+        Returns:
+            (seq, timestamp, frame_view) or None if the frame is not (or no longer) available.
+            The view stays valid until the writer wraps around to its slot; use
+            is_current(seq) after processing to check it was not overwritten.
+        """
+        if seq is None:
+            seq = self.write_seq
+        if seq <= 0 or seq > self.write_seq or self.write_seq - seq >= self.slots:
+            return None
+
+        index = (seq - 1) % self.slots
+        slot_header = self._slot_headers[index][0]
+        if int(slot_header["seq"]) != seq:
+            return None
+
+        return seq, float(slot_header["timestamp"]), self._frames[index]
+
+    def is_current(self, seq: int) -> bool:
+        """Check a previously read frame has not been overwritten since."""
+        index = (seq - 1) % self.slots
+        return int(self._slot_headers[index][0]["seq"]) == seq
+
+    def close(self):
+        if self.owner:
+            self.header["magic"] = RING_RETIRED
+        # Drop array views before releasing the mapping
+        self.header = None
+        self._slot_headers = []
+        self._frames = []
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Decoder process: pull a camera, decode once, publish frames to the ring
+if __name__ == "__main__":
+    import sys
+    from frame_decoder import decode_jpeg_bytes
+    from mjpeg_capture import MjpegCapture
+
+    if len(sys.argv) < 3:
+        print("Usage: python frame_ring.py <spot_id> <camera_url> [slots]")
+        sys.exit(1)
+
+    spot_id, camera_url = sys.argv[1], sys.argv[2]
+    slots = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_RING_SLOTS
+    name = ring_name_for_spot(spot_id)
+
+    capture = MjpegCapture(camera_url)
+    capture.start()
+    ring = None
+    written = 0
+    last_report = time.time()
+
+    try:
+        while True:
+            item = capture.slot.get(timeout=1.0)
+            if item is None:
+                continue
+
+            jpeg_bytes, captured_at = item
+            frame_bgr = decode_jpeg_bytes(jpeg_bytes)
+            if frame_bgr is None:
+                continue
+
+            if ring is None or ring.frame_shape != frame_bgr.shape:
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing.create(name, frame_bgr.shape[0], frame_bgr.shape[1], slots)
+                print(f"🧠 Frame ring '{name}' created: {frame_bgr.shape[1]}x{frame_bgr.shape[0]}, {slots} slots")
+
+            ring.write(frame_bgr, captured_at)
+            written += 1
+
+            if time.time() - last_report >= 5:
+                print(f"📊 Ring '{name}': {written} frames written, seq={ring.write_seq}")
+                last_report = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.stop()
+        if ring is not None:
+            ring.close()
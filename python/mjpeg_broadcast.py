@@ -0,0 +1,116 @@
+"""
+MJPEG Broadcast - Encode-once annotated frame fan-out for /stream/<spot_id>
+The session publishes each annotated frame's JPEG bytes once; every viewer
+connection streams the same bytes object as multipart/x-mixed-replace. A
+viewer only ever waits for the newest frame, so a slow client skips frames
+instead of queueing them, and encode cost does not grow with viewer count.
+"""
+import threading
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+MJPEG_BOUNDARY = "frame"
+MJPEG_MIMETYPE = f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}"
+
+
+class FrameBroadcaster:
+    """Latest-frame JPEG holder shared by all viewers of one spot."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._seq = 0
+        self._frame_seq = 0  # Caller's frame order, when given
+        self._closed = False
+        self.viewers = 0
+        self.frames_published = 0
+
+    @property
+    def has_viewers(self) -> bool:
+        return self.viewers > 0
+
+    def publish(self, jpeg_bytes: bytes, frame_seq: Optional[int] = None):
+        """Make jpeg_bytes the newest frame; with frame_seq, older frames are dropped."""
+        with self._cond:
+            if frame_seq is not None:
+                if frame_seq <= self._frame_seq:
+                    return
+                self._frame_seq = frame_seq
+            self._jpeg = jpeg_bytes
+            self._seq += 1
+            self.frames_published += 1
+            self._cond.notify_all()
+
+    def wait_newer(self, seq: int, timeout: float = 5.0) -> Optional[Tuple[int, bytes]]:
+        """Newest frame after seq, or None on timeout / close."""
+        with self._cond:
+            if self._seq <= seq and not self._closed:
+                self._cond.wait(timeout)
+            if self._closed or self._seq <= seq or self._jpeg is None:
+                return None
+            return self._seq, self._jpeg
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stream(self, keepalive: float = 5.0,
+               active: Optional[Callable[[], bool]] = None) -> Iterator[bytes]:
+        """
+        Multipart MJPEG body for one viewer (use as a streaming response).
+        Args:
+            keepalive: Seconds between checks while no new frame arrives
+            active: Checked on each such timeout; the stream ends once it
+                    returns False (e.g. the session stopped drawing frames)
+        """
+        with self._cond:
+            self.viewers += 1
+        seq = 0
+        try:
+            while not self._closed:
+                frame = self.wait_newer(seq, timeout=keepalive)
+                if frame is None:
+                    if active is not None and not active():
+                        break
+                    continue
+                seq, jpeg = frame
+                yield (f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                       f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
+        finally:
+            with self._cond:
+                self.viewers -= 1
+
+
+# Fan-out check: one publisher, several viewers of different speeds
+if __name__ == "__main__":
+    broadcaster = FrameBroadcaster()
+    received = {}
+
+    def viewer(name: str, delay: float):
+        received[name] = 0
+        for _ in broadcaster.stream(keepalive=0.5):
+            received[name] += 1
+            time.sleep(delay)
+
+    threads = [threading.Thread(target=viewer, args=(f"viewer_{d}", d), daemon=True)
+               for d in (0.0, 0.05, 0.2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+
+    payload = b"\xff\xd8" + bytes(50_000) + b"\xff\xd9"
+    for _ in range(60):
+        broadcaster.publish(payload)
+        time.sleep(1 / 30)
+
+    print(f"📤 Published {broadcaster.frames_published} frames to {broadcaster.viewers} viewers")
+    broadcaster.close()
+    for t in threads:
+        t.join(timeout=1)
+    for name, count in received.items():
+        print(f"   {name}: {count} frames")
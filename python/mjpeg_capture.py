@@ -0,0 +1,241 @@
+"""
+MJPEG Capture - Pulls an IP camera MJPEG stream directly into Python
+A capture thread reads the multipart stream, finds frame boundaries from the
+JPEG marker structure alone (no decoding, no multipart header parsing) and
+keeps just the newest complete JPEG in a single-slot buffer. The detection
+loop decodes only the frames it actually takes.
+
+Marker segments are skipped by their length, so an EXIF thumbnail inside
+APP1 (with its own SOI/EOI) cannot end a frame early; EOI is only looked for
+in entropy-coded data after SOS. The walk resumes where the previous chunk
+stopped, so every stream byte is examined once.
+"""
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from frame_channel import LatestFrameSlot
+
+JPEG_SOI = b"\xff\xd8"
+MARKER_EOI = 0xD9
+MARKER_SOI = 0xD8
+MARKER_SOS = 0xDA
+STANDALONE_MARKERS = frozenset([0x01] + list(range(0xD0, 0xD8)))  # TEM, RST0-7: no length
+SCAN_END = re.compile(rb"\xff[^\x00\xd0-\xd7\xff]")  # First marker that is not RSTn, stuffing or fill
+
+CHUNK_SIZE = 64 * 1024
+MAX_BUFFER_SIZE = 8 * 1024 * 1024  # Drop a runaway partial frame past this size
+
+
+class MjpegCapture:
+    """
+    Background MJPEG reader for one camera.
+    slot.get() returns (jpeg_bytes, capture_timestamp) for the newest frame.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self.slot = LatestFrameSlot()
+        self.running = False
+        self.frames_captured = 0
+        self.consecutive_errors = 0
+        self._reset_parser()
+        self._thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        print(f"🎥 MJPEG capture started: {self.url}")
+
+    def stop(self):
+        self.running = False
+        self.slot.close()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+        print(f"⏹️ MJPEG capture stopped: {self.url}")
+
+    def _read_loop(self):
+        while self.running:
+            try:
+                with urllib.request.urlopen(self.url, timeout=self.timeout) as stream:
+                    print(f"✅ Connected to camera stream: {self.url}")
+                    self.consecutive_errors = 0
+                    self._read_stream(stream)
+            except Exception as e:
+                if not self.running:
+                    break
+                self.consecutive_errors += 1
+                delay = min(5.0, 0.1 * self.consecutive_errors)
+                print(f"❌ Camera stream error ({e}), reconnecting in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _read_stream(self, stream):
+        buffer = bytearray()
+        self._reset_parser()
+        read = getattr(stream, "read1", stream.read)
+
+        while self.running:
+            chunk = read(CHUNK_SIZE)
+            if not chunk:
+                return  # Stream ended, reconnect
+
+            buffer += chunk
+            jpeg = self.extract_latest_jpeg(buffer)
+            if jpeg is not None:
+                self.slot.put((jpeg, time.time()))
+
+            if len(buffer) > MAX_BUFFER_SIZE:
+                buffer.clear()
+                self._reset_parser()
+
+    def _reset_parser(self):
+        self._frame_start: Optional[int] = None  # Buffer offset of the current frame's SOI
+        self._parse_pos = 0                      # Next buffer offset to examine
+        self._in_entropy = False                 # Inside scan data after SOS
+
+    def extract_latest_jpeg(self, buffer: bytearray) -> Optional[bytes]:
+        """
+        Consume every complete JPEG in buffer (in place) and return the newest.
+        Older complete frames are skipped without being copied; a trailing
+        partial frame stays in the buffer and its walk resumes on the next call.
+        """
+        latest: Optional[Tuple[int, int]] = None
+        start, pos, entropy = self._frame_start, self._parse_pos, self._in_entropy
+        size = len(buffer)
+
+        while True:
+            if start is None:
+                found = buffer.find(JPEG_SOI, pos)
+                if found < 0:
+                    pos = max(pos, size - 1)  # A trailing 0xFF may start the next SOI
+                    break
+                start, pos, entropy = found, found + 2, False
+                continue
+
+            if pos + 1 >= size:
+                break
+
+            if entropy:
+                # Scan data: 0xFF00 is a stuffed byte and RSTn / fill bytes stay in the scan
+                found = SCAN_END.search(buffer, pos)
+                if found is None:
+                    pos = size - 1  # A trailing 0xFF may start the next marker
+                    break
+                entropy, pos = False, found.start()
+                continue
+
+            if buffer[pos] != 0xFF:
+                start = None  # Corrupt frame: resynchronise on the next SOI
+                continue
+            marker = buffer[pos + 1]
+            if marker == 0xFF:
+                pos += 1  # Fill byte before a marker
+            elif marker == MARKER_EOI:
+                latest = (start, pos + 2)
+                self.frames_captured += 1
+                start, pos = None, pos + 2
+            elif marker == MARKER_SOI:
+                start, pos = pos, pos + 2  # Previous frame was cut off; a new one starts here
+            elif marker in STANDALONE_MARKERS:
+                pos += 2
+            else:
+                if pos + 3 >= size:
+                    break
+                length = (buffer[pos + 2] << 8) | buffer[pos + 3]
+                if length < 2:
+                    start = None
+                    continue
+                entropy = marker == MARKER_SOS
+                pos += 2 + length  # Skip the whole segment (APPn thumbnails included)
+
+        jpeg = bytes(buffer[latest[0]:latest[1]]) if latest else None
+
+        keep_from = start if start is not None else min(pos, size)
+        del buffer[:keep_from]
+        self._frame_start = None if start is None else start - keep_from
+        self._parse_pos = pos - keep_from
+        self._in_entropy = entropy
+        return jpeg
+
+
+def make_mjpeg_server(frames: List[bytes], host: str = "127.0.0.1", port: int = 8081,
+                      fps: float = 15.0) -> ThreadingHTTPServer:
+    """
+    Local MJPEG stand-in for a camera: every GET streams frames in a loop.
+    Call serve_forever() on the result (port 0 picks a free port).
+    """
+    class MjpegHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+            self.end_headers()
+            i = 0
+            try:
+                while True:
+                    jpeg = frames[i % len(frames)]
+                    self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg + b"\r\n")
+                    i += 1
+                    time.sleep(1 / fps)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MjpegHandler)
+    server.daemon_threads = True
+    return server
+
+
+# Local MJPEG stand-in server (serves JPEG files from disk) and pull test
+if __name__ == "__main__":
+    import os
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] not in ("serve", "pull"):
+        print("Usage:")
+        print("  python mjpeg_capture.py serve <jpeg_file_or_dir> [port] [fps]")
+        print("  python mjpeg_capture.py pull <url> [seconds]")
+        sys.exit(1)
+
+    if sys.argv[1] == "serve":
+        source = sys.argv[2]
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else 8081
+        fps = float(sys.argv[4]) if len(sys.argv) > 4 else 15.0
+
+        if os.path.isdir(source):
+            paths = sorted(os.path.join(source, n) for n in os.listdir(source)
+                           if n.lower().endswith((".jpg", ".jpeg")))
+        else:
+            paths = [source]
+        frames = []
+        for path in paths:
+            with open(path, "rb") as f:
+                frames.append(f.read())
+
+        print(f"📹 Serving {len(frames)} frame(s) as MJPEG on http://0.0.0.0:{port}/ at {fps} fps")
+        make_mjpeg_server(frames, "0.0.0.0", port, fps).serve_forever()
+
+    else:
+        seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+        capture = MjpegCapture(sys.argv[2])
+        capture.start()
+        taken = 0
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            item = capture.slot.get(timeout=1.0)
+            if item is not None:
+                taken += 1
+                time.sleep(0.2)  # Simulate a slow detector
+        capture.stop()
+        print(f"📥 Captured {capture.frames_captured} frames, consumed {taken}, "
+              f"dropped {capture.slot.dropped}")
@@ -0,0 +1,173 @@
+"""
+Motion Tiles - Coarse frame-diff pre-pass that finds the active parts of a frame
+Before any per-slot work, each detection frame is shrunk heavily (1/8 by
+default), diffed against the previous detection frame and thresholded; the
+changed pixels are counted per tile of a coarse grid. A precomputed
+slot -> tile index then names the slots that touch an active tile, and only
+those are candidates for re-analysis (see ChangeGate.dirty). A car pulling in
+lights up the 2-3 slots it crosses; the rest of the lot is not re-examined.
+
+    tile map: rows x cols of tile_size px; active = changed ratio > min_ratio
+
+The current tile map is exposed for tuning through GET /motion-tiles/<spot_id>
+and, with "debug": true, in every /process-frame response.
+
+Config (start-detection "motion_tiles"):
+    true, or {"scale": 8, "tile_size": 64, "threshold": 15, "min_ratio": 0.02, "debug": false}
+"""
+import math
+from typing import Any, Dict, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from slot_stats import workspace_buffer
+
+DEFAULT_SCALE = 8         # Diff runs at 1/8 width and height
+DEFAULT_TILE_SIZE = 64    # Tile edge in full-frame pixels
+DEFAULT_THRESHOLD = 15    # Gray change of a shrunken pixel that counts as motion
+DEFAULT_MIN_RATIO = 0.02  # Share of changed pixels that makes a tile active
+
+
+class MotionTiles:
+    """Per-session coarse motion grid and slot -> tile index."""
+
+    def __init__(self, scale: int = DEFAULT_SCALE, tile_size: int = DEFAULT_TILE_SIZE,
+                 threshold: int = DEFAULT_THRESHOLD, min_ratio: float = DEFAULT_MIN_RATIO,
+                 debug: bool = False):
+        self.scale = max(1, int(scale))
+        self.tile = max(1, int(tile_size) // self.scale)  # Tile edge in shrunken pixels
+        self.tile_size = self.tile * self.scale
+        self.threshold = int(threshold)
+        self.min_ratio = float(min_ratio)
+        self.debug = bool(debug)
+        self.previous: Optional[np.ndarray] = None
+        self.active: Optional[np.ndarray] = None  # (rows, cols) bool
+        self.tile_area = None
+        self.index_key = None
+        self.index = None                          # (slots, rows * cols) bool
+        self.workspace: Dict[str, np.ndarray] = {}
+        self.frames = 0
+        self.active_tiles_total = 0
+
+    @classmethod
+    def from_config(cls, value: Any) -> Optional["MotionTiles"]:
+        """Build tiles from a start-detection "motion_tiles" value (None = off)."""
+        if not value:
+            return None
+        if value is True:
+            return cls()
+        if not isinstance(value, dict):
+            raise ValueError("motion_tiles must be true or an object with scale / tile_size / threshold / "
+                             "min_ratio / debug")
+        try:
+            return cls(value.get("scale", DEFAULT_SCALE), value.get("tile_size", DEFAULT_TILE_SIZE),
+                       value.get("threshold", DEFAULT_THRESHOLD), value.get("min_ratio", DEFAULT_MIN_RATIO),
+                       value.get("debug", False))
+        except (TypeError, ValueError):
+            raise ValueError("motion_tiles scale / tile_size / threshold / min_ratio must be numbers")
+
+    def describe(self) -> dict:
+        return {"scale": self.scale, "tile_size": self.tile_size, "threshold": self.threshold,
+                "min_ratio": self.min_ratio, "debug": self.debug}
+
+    def update(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """Shrink, diff against the previous call's frame and mark active tiles."""
+        height, width = frame_bgr.shape[:2]
+        size = (max(1, width // self.scale), max(1, height // self.scale))
+        small = cv2.resize(frame_bgr, size, interpolation=cv2.INTER_AREA,
+                           dst=workspace_buffer(self.workspace, "small", (size[1], size[0], 3), np.uint8))
+
+        # Two gray buffers, swapped every frame: current and previous
+        gray_name = "gray_a" if self.frames % 2 == 0 else "gray_b"
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY,
+                            dst=workspace_buffer(self.workspace, gray_name, small.shape[:2], np.uint8))
+
+        rows, cols = math.ceil(size[1] / self.tile), math.ceil(size[0] / self.tile)
+        if self.previous is None or self.previous.shape != gray.shape:
+            # Nothing to compare with: every tile counts as active
+            self.active = np.ones((rows, cols), dtype=bool)
+            padded = np.zeros((rows * self.tile, cols * self.tile), dtype=np.float64)
+            padded[:size[1], :size[0]] = 1.0
+            self.tile_area = padded.reshape(rows, self.tile, cols, self.tile).sum(axis=(1, 3))
+        else:
+            diff = cv2.absdiff(gray, self.previous,
+                               dst=workspace_buffer(self.workspace, "diff", gray.shape, np.uint8))
+            padded = workspace_buffer(self.workspace, "padded", (rows * self.tile, cols * self.tile), np.uint8)
+            padded.fill(0)
+            cv2.threshold(diff, self.threshold, 1, cv2.THRESH_BINARY, dst=padded[:size[1], :size[0]])
+            changed = padded.reshape(rows, self.tile, cols, self.tile).sum(axis=(1, 3))
+            self.active = changed > self.min_ratio * self.tile_area
+
+        self.previous = gray
+        self.frames += 1
+        self.active_tiles_total += int(self.active.sum())
+        return self.active
+
+    def _slot_index(self, boxes: Dict[int, Tuple[int, int, int, int]]) -> np.ndarray:
+        """(slots, tiles) bool matrix of the tiles each slot touches, rebuilt on layout change."""
+        rows, cols = self.active.shape
+        key = (tuple(boxes.items()), rows, cols)
+        if key != self.index_key:
+            index = np.zeros((len(boxes), rows, cols), dtype=bool)
+            for position, (x1, y1, x2, y2) in enumerate(boxes.values()):
+                r1 = min(rows - 1, y1 // self.tile_size)
+                c1 = min(cols - 1, x1 // self.tile_size)
+                r2 = min(rows, max(r1 + 1, math.ceil(y2 / self.tile_size)))
+                c2 = min(cols, max(c1 + 1, math.ceil(x2 / self.tile_size)))
+                index[position, r1:r2, c1:c2] = True
+            self.index = index.reshape(len(boxes), -1)
+            self.index_key = key
+        return self.index
+
+    def active_slots(self, boxes: Dict[int, Tuple[int, int, int, int]]) -> Set[int]:
+        """Slots of boxes that touch at least one active tile (after update)."""
+        if not boxes:
+            return set()
+        hits = (self._slot_index(boxes) & self.active.reshape(1, -1)).any(axis=1)
+        return {slot for slot, hit in zip(boxes.keys(), hits) if hit}
+
+    def tile_map(self) -> Optional[dict]:
+        """Current grid for debugging: one string per row, "#" = active tile."""
+        if self.active is None:
+            return None
+        rows, cols = self.active.shape
+        return {
+            "tile_size": self.tile_size,
+            "rows": rows,
+            "cols": cols,
+            "active_tiles": int(self.active.sum()),
+            "map": ["".join("#" if cell else "." for cell in row) for row in self.active]
+        }
+
+    def stats(self) -> dict:
+        tiles = self.active.size if self.active is not None else 0
+        return {
+            "motion_tiles_active_ratio": round(self.active_tiles_total / (self.frames * tiles), 3)
+            if self.frames and tiles else 0.0
+        }
+
+
+# Tile check: a car drives into one slot of a still lot
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    lot = cv2.GaussianBlur(rng.integers(60, 160, (720, 1280, 3), dtype=np.uint8), (0, 0), 2)
+    boxes = {i + 1: (20 + (i % 10) * 125, 80 + (i // 10) * 150, 130 + (i % 10) * 125, 210 + (i // 10) * 150)
+             for i in range(40)}
+
+    tiles = MotionTiles()
+    tiles.update(lot)
+    frame = lot.copy()
+    x1, y1, x2, y2 = boxes[14]
+    frame[y1 + 20:y2 - 20, x1 + 10:x2 - 10] = (30, 30, 30)  # A car pulls in
+
+    start = time.perf_counter()
+    tiles.update(frame)
+    active = tiles.active_slots(boxes)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"🧭 Active slots {sorted(active)} of {len(boxes)} in {elapsed:.2f} ms")
+    for row in tiles.tile_map()["map"]:
+        print(f"   {row}")
@@ -0,0 +1,86 @@
+"""
+Occupancy Delta Log - Sequence-numbered occupancy changes for one session
+Every processed frame gets a sequence number. Only slots whose status or
+confidence bucket moved are logged, together with every state change of that
+frame, so a client that acknowledges seq N can be sent just what changed
+after N instead of the whole lot on every frame.
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+CONFIDENCE_BUCKET = 0.1   # Confidence changes smaller than one bucket are not sent
+MAX_LOGGED_CHANGES = 512  # Frames-with-changes kept; older acks get a full snapshot
+
+
+def confidence_bucket(confidence: float) -> int:
+    return int(round(confidence / CONFIDENCE_BUCKET))
+
+
+class OccupancyDeltaLog:
+    """Tracks published slot values and answers "what changed since seq N"."""
+
+    def __init__(self, max_entries: int = MAX_LOGGED_CHANGES):
+        self.seq = 0
+        self.slots: Dict[str, Dict[str, Any]] = {}  # Latest published value per slot
+        self._keys: Dict[str, tuple] = {}            # (status, bucket) per slot
+        self._log = deque()                          # (seq, changed slot ids, state changes)
+        self._max_entries = max_entries
+        self._floor = 0  # Changes after this seq are all still in the log
+        self._lock = threading.Lock()
+
+    def record(self, occupancy: Dict[str, Dict[str, Any]], state_changes: List[dict]) -> int:
+        """Log one processed frame's occupancy. Returns its sequence number."""
+        with self._lock:
+            self.seq += 1
+
+            changed = []
+            for slot_id, value in occupancy.items():
+                key = (value["status"], confidence_bucket(value["confidence"]))
+                if self._keys.get(slot_id) != key:
+                    self._keys[slot_id] = key
+                    self.slots[slot_id] = dict(value)
+                    changed.append(slot_id)
+
+            if changed or state_changes:
+                self._log.append((self.seq, changed, list(state_changes)))
+                if len(self._log) > self._max_entries:
+                    self._floor = self._log.popleft()[0]
+
+            return self.seq
+
+    def delta_since(self, ack_seq: Optional[int]) -> Dict[str, Any]:
+        """
+        Changes after ack_seq.
+        Returns:
+            {"seq", "base_seq", "full", "slots", "state_changes"}; "full" means
+            slots holds every slot (first request, unknown or too old ack).
+            State changes already dropped from the log are lost to a too old ack.
+        """
+        with self._lock:
+            known_ack = ack_seq is not None and 0 < ack_seq <= self.seq
+            full = not known_ack or ack_seq < self._floor
+
+            # Without a usable ack, only the newest frame's state changes are new
+            since = ack_seq if known_ack else self.seq - 1
+
+            changed_ids = set()
+            state_changes = []
+            for seq, slot_ids, changes in self._log:
+                if seq <= since:
+                    continue
+                changed_ids.update(slot_ids)
+                state_changes.extend(changes)
+
+            if full:
+                slots = {slot_id: dict(value) for slot_id, value in self.slots.items()}
+            else:
+                slots = {slot_id: dict(self.slots[slot_id]) for slot_id in changed_ids}
+
+            return {
+                "seq": self.seq,
+                "base_seq": None if full else ack_seq,
+                "full": full,
+                "slots": slots,
+                "state_changes": state_changes
+            }
@@ -0,0 +1,89 @@
+"""
+Overlay Cache - Pre-rendered annotation layer for annotated frames
+Slot outlines, labels and the summary only change when a slot's status does,
+so they are drawn once and kept as a colour layer plus alpha mask. Each
+annotated frame is then one frame copy and one masked copy into a reused
+output buffer (plus a blend of the few anti-aliased text edge pixels),
+independent of how many slots / labels there are.
+"""
+from typing import Any, Callable, Hashable, Optional
+
+import cv2
+import numpy as np
+
+
+class OverlayCache:
+    """Caches one rendered overlay per (frame size, overlay state) key."""
+
+    def __init__(self):
+        self.key = None
+        self.overlay: Optional[np.ndarray] = None       # Overlay colour, premultiplied by alpha
+        self.opaque_mask: Optional[np.ndarray] = None   # Fully covered pixels
+        self.edge_index: Optional[np.ndarray] = None    # Flat byte indices of partly covered pixels
+        self.edge_inverse: Optional[np.ndarray] = None  # (1 - alpha) * 256 per edge byte
+        self.edge_color: Optional[np.ndarray] = None    # Premultiplied colour * 256 (+ rounding)
+        self.output: Optional[np.ndarray] = None
+        self.renders = 0
+
+    def _render(self, shape: tuple, draw_fn: Callable[[np.ndarray], Any]):
+        # Drawing on black and on white recovers colour and coverage exactly:
+        # black = a * c, white = a * c + (1 - a) * 255
+        on_black = np.zeros(shape, dtype=np.uint8)
+        on_white = np.full(shape, 255, dtype=np.uint8)
+        draw_fn(on_black)
+        draw_fn(on_white)
+
+        # gap = (1 - a) * 255 per byte; per-channel passes avoid slow reductions over axis 2
+        gap = cv2.subtract(on_white, on_black)
+        channels = shape[2]
+        gap_min = gap[..., 0].copy()
+        gap_max = gap[..., 0].copy()
+        for channel in range(1, channels):
+            np.minimum(gap_min, gap[..., channel], out=gap_min)
+            np.maximum(gap_max, gap[..., channel], out=gap_max)
+
+        self.overlay = on_black
+        self.opaque_mask = (gap_max == 0).astype(np.uint8)
+
+        # Anti-aliased edges (text) are blended in 8.8 fixed point on just those bytes
+        edge_pixels = np.flatnonzero((gap_min < 255) & (gap_max > 0))
+        self.edge_index = (edge_pixels[:, None] * channels + np.arange(channels)).ravel()
+        self.edge_inverse = np.round(gap.reshape(-1)[self.edge_index] * (256 / 255)).astype(np.uint32)
+        self.edge_color = (on_black.reshape(-1)[self.edge_index].astype(np.uint32) << 8) + 128
+        self.renders += 1
+
+    def compose(self, frame_bgr: np.ndarray, state_key: Hashable,
+                draw_fn: Callable[[np.ndarray], Any]) -> np.ndarray:
+        """
+        Composite the overlay for state_key onto frame_bgr.
+        Args:
+            frame_bgr: Frame to annotate (not modified)
+            state_key: Everything the overlay depends on; a new key re-renders
+            draw_fn: Draws the overlay onto the image it is given
+        Returns:
+            Annotated frame in the cache's reused output buffer; it is overwritten
+            by the next compose() call, so encode or copy it first
+        """
+        key = (frame_bgr.shape, state_key)
+        if key != self.key:
+            self._render(frame_bgr.shape, draw_fn)
+            self.key = key
+
+        if self.output is None or self.output.shape != frame_bgr.shape:
+            self.output = np.empty_like(frame_bgr)
+
+        np.copyto(self.output, frame_bgr)
+        cv2.copyTo(self.overlay, self.opaque_mask, self.output)
+
+        if self.edge_index.size:
+            flat = self.output.reshape(-1)
+            blended = flat[self.edge_index].astype(np.uint32)
+            blended *= self.edge_inverse
+            blended += self.edge_color
+            blended >>= 8
+            flat[self.edge_index] = blended
+
+        return self.output
+
+    def invalidate(self):
+        self.key = None
@@ -0,0 +1,131 @@
+"""
+Preview Encoder - Pooled, size-adaptive JPEG encoding for annotated frames
+Encoding a full 1080p preview at a fixed quality costs more CPU and bandwidth
+than the preview is worth. Each session's encoder downscales previews to a
+target width and steers JPEG quality towards a per-frame byte budget, and the
+encode itself runs on a small shared pool (cv2.imencode releases the GIL) so
+it overlaps the detection of the next frame.
+
+Config (start-detection "preview"):
+    {"width": 640, "max_bytes": 40000, "quality": 75}  - all optional;
+    without max_bytes the quality stays fixed
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_QUALITY = 75
+MIN_QUALITY = 30
+MAX_QUALITY = 90
+BUDGET_SLACK = 0.8  # Quality only rises again once frames are below 80% of the budget
+
+# Shared by all sessions; two workers keep encodes off the request threads
+ENCODE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preview-encode")
+
+
+def clamp_quality(quality: int) -> int:
+    return max(MIN_QUALITY, min(MAX_QUALITY, int(quality)))
+
+
+class PreviewEncoder:
+    """Per-session preview encoder: downscale, encode on the pool, adapt quality."""
+
+    def __init__(self, max_width: Optional[int] = None, max_bytes: Optional[int] = None,
+                 quality: int = DEFAULT_QUALITY):
+        self.max_width = int(max_width) if max_width else None
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.quality = clamp_quality(quality) if self.max_bytes else int(quality)
+        self.frames_encoded = 0
+        self.bytes_encoded = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, value: Any) -> "PreviewEncoder":
+        """Build an encoder from a start-detection "preview" value."""
+        if not value:
+            return cls()
+        if not isinstance(value, dict):
+            raise ValueError("preview must be an object with width / max_bytes / quality")
+        return cls(value.get("width"), value.get("max_bytes"),
+                   value.get("quality", DEFAULT_QUALITY))
+
+    def prepare(self, frame_bgr: np.ndarray) -> np.ndarray:
+        """
+        Frame the encoder can keep: downscaled to max_width, else a copy.
+        Call before the source buffer is reused (annotated frames live in the
+        overlay cache's output buffer).
+        """
+        height, width = frame_bgr.shape[:2]
+        if self.max_width and width > self.max_width:
+            target_height = max(1, round(height * self.max_width / width))
+            return cv2.resize(frame_bgr, (self.max_width, target_height),
+                              interpolation=cv2.INTER_AREA)
+        return frame_bgr.copy()
+
+    def encode(self, frame_bgr: np.ndarray) -> Optional[bytes]:
+        """Encode at the current quality and steer quality for the next frame."""
+        with self._lock:
+            quality = self.quality
+
+        try:
+            success, buffer = cv2.imencode('.jpg', frame_bgr,
+                                           [cv2.IMWRITE_JPEG_QUALITY, quality])
+        except Exception as e:
+            print(f"⚠️ Preview encode error: {e}")
+            return None
+        if not success:
+            return None
+
+        jpeg_bytes = buffer.tobytes()
+        with self._lock:
+            self.frames_encoded += 1
+            self.bytes_encoded += len(jpeg_bytes)
+            if self.max_bytes:
+                self.quality = self._next_quality(quality, len(jpeg_bytes))
+
+        return jpeg_bytes
+
+    def _next_quality(self, quality: int, size: int) -> int:
+        ratio = size / self.max_bytes
+        if ratio > 1.0:
+            # Over budget: step down harder the further over we are
+            step = -max(2, min(15, round((ratio - 1.0) * 20)))
+        elif ratio < BUDGET_SLACK:
+            step = max(1, min(5, round((BUDGET_SLACK - ratio) * 20)))
+        else:
+            step = 0
+        return clamp_quality(quality + step)
+
+    def submit(self, frame_bgr: np.ndarray) -> Future:
+        """Prepare now, encode on the pool. The future resolves to JPEG bytes or None."""
+        return ENCODE_EXECUTOR.submit(self.encode, self.prepare(frame_bgr))
+
+    def stats(self) -> dict:
+        return {
+            "preview_quality": self.quality,
+            "preview_frames_encoded": self.frames_encoded,
+            "preview_avg_bytes": round(self.bytes_encoded / self.frames_encoded) if self.frames_encoded else 0
+        }
+
+    def describe(self) -> dict:
+        return {"width": self.max_width, "max_bytes": self.max_bytes, "quality": self.quality}
+
+
+# Budget check: a 1080p frame settling under 40 KB at 640px wide
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 3)
+
+    fixed = PreviewEncoder()
+    adaptive = PreviewEncoder(max_width=640, max_bytes=40_000)
+
+    for name, encoder in (("fixed 1080p q75", fixed), ("adaptive 640px 40KB", adaptive)):
+        start = time.perf_counter()
+        sizes = [len(encoder.submit(base).result()) for _ in range(20)]
+        elapsed = (time.perf_counter() - start) / len(sizes) * 1000
+        print(f"📦 {name}: last {sizes[-1] / 1024:.1f} KB, quality {encoder.quality}, {elapsed:.1f} ms/frame")
@@ -0,0 +1,119 @@
+"""
+Reference Adapter - Exponential moving average for vacant slots' reference crops
+The empty-lot reference is captured once (first frame or /set-reference), so
+daylight drift slowly pushes every vacant slot's reference difference towards
+"occupied" and sends more frames down the expensive shadow checks. The
+adapter keeps a float32 copy of the reference frame and, every few detection
+frames, blends the current frame into it for slots that are confirmed vacant
+and motion-free:
+
+    reference = (1 - rate) * reference + rate * frame    (inside eligible slots only)
+
+All eligible slots are blended in one masked cv2.accumulateWeighted call over
+their union; only those slots' uint8 reference pixels, gray plane and cached
+reference features are refreshed afterwards.
+
+Config (start-detection "adaptive_reference"):
+    true, or {"rate": 0.05, "interval": 10, "max_motion": 5.0}
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from slot_stats import workspace_buffer
+
+DEFAULT_RATE = 0.05        # Blend weight per adaptation step
+DEFAULT_INTERVAL = 10      # Adapt every N detection frames
+DEFAULT_MAX_MOTION = 5.0   # Mean gray change vs previous frame that still counts as still
+
+
+class ReferenceAdapter:
+    """Per-session EMA state for the adaptive empty-lot reference."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, interval: int = DEFAULT_INTERVAL,
+                 max_motion: float = DEFAULT_MAX_MOTION):
+        self.rate = float(rate)
+        self.interval = max(1, int(interval))
+        self.max_motion = float(max_motion)
+        self.accumulator: Optional[np.ndarray] = None  # float32 reference frame
+        self.workspace: Dict[str, np.ndarray] = {}
+        self.detection_frames = 0
+        self.slots_adapted = 0
+
+    @classmethod
+    def from_config(cls, value: Any) -> Optional["ReferenceAdapter"]:
+        """Build an adapter from a start-detection "adaptive_reference" value (None = off)."""
+        if not value:
+            return None
+        if value is True:
+            return cls()
+        if not isinstance(value, dict):
+            raise ValueError("adaptive_reference must be true or an object with rate / interval / max_motion")
+        try:
+            adapter = cls(value.get("rate", DEFAULT_RATE), value.get("interval", DEFAULT_INTERVAL),
+                          value.get("max_motion", DEFAULT_MAX_MOTION))
+        except (TypeError, ValueError):
+            raise ValueError("adaptive_reference rate / interval / max_motion must be numbers")
+        if not 0.0 < adapter.rate <= 1.0:
+            raise ValueError("adaptive_reference rate must be in (0, 1]")
+        return adapter
+
+    def describe(self) -> dict:
+        return {"rate": self.rate, "interval": self.interval, "max_motion": self.max_motion}
+
+    def reset(self):
+        """Forget the blended state (a new reference frame was set)."""
+        self.accumulator = None
+
+    def due(self) -> bool:
+        """Count one detection frame; True on every interval-th."""
+        self.detection_frames += 1
+        return self.detection_frames % self.interval == 0
+
+    def blend(self, frame_bgr: np.ndarray, reference_bgr: np.ndarray,
+              boxes: Iterable[Tuple[int, int, int, int]]):
+        """Blend frame_bgr into reference_bgr (in place) inside boxes."""
+        boxes = list(boxes)
+        if not boxes:
+            return
+        if self.accumulator is None or self.accumulator.shape != reference_bgr.shape:
+            self.accumulator = reference_bgr.astype(np.float32)
+
+        # One masked update over the union of the eligible slots
+        ux1 = min(b[0] for b in boxes)
+        uy1 = min(b[1] for b in boxes)
+        ux2 = max(b[2] for b in boxes)
+        uy2 = max(b[3] for b in boxes)
+        mask = workspace_buffer(self.workspace, "mask", reference_bgr.shape[:2], np.uint8)[uy1:uy2, ux1:ux2]
+        mask.fill(0)
+        for x1, y1, x2, y2 in boxes:
+            mask[y1 - uy1:y2 - uy1, x1 - ux1:x2 - ux1] = 255
+        cv2.accumulateWeighted(frame_bgr[uy1:uy2, ux1:ux2], self.accumulator[uy1:uy2, ux1:ux2],
+                               self.rate, mask=mask)
+
+        for x1, y1, x2, y2 in boxes:
+            cv2.convertScaleAbs(self.accumulator[y1:y2, x1:x2], dst=reference_bgr[y1:y2, x1:x2])
+        self.slots_adapted += len(boxes)
+
+
+# Drift check: a vacant slot's reference follows the light, an unlisted one does not
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    lot = cv2.GaussianBlur(rng.integers(60, 120, (720, 1280, 3), dtype=np.uint8), (0, 0), 3)
+    reference = lot.copy()
+    vacant, static = (100, 100, 260, 220), (400, 100, 560, 220)
+
+    adapter = ReferenceAdapter()
+    for step in range(1, 601):
+        frame = cv2.add(lot, np.full_like(lot, step // 10))  # +60 brightness over the run
+        if adapter.due():
+            adapter.blend(frame, reference, [vacant])
+        if step % 150 == 0:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            ref_gray = cv2.cvtColor(reference, cv2.COLOR_BGR2GRAY)
+            ratios = []
+            for x1, y1, x2, y2 in (vacant, static):
+                ratios.append(float(np.mean(cv2.absdiff(gray[y1:y2, x1:x2], ref_gray[y1:y2, x1:x2]) > 40)))
+            print(f"🌅 frame {step}: brightness +{step // 10}, diff_ratio adapted {ratios[0]:.2f}, "
+                  f"static {ratios[1]:.2f}")
@@ -0,0 +1,138 @@
+"""
+Slot Stats - Integral-image statistics for every slot rectangle at once
+The cheap ensemble only reads per-slot means / stds of S and V, edge density,
+reference-difference ratio and motion against the previous frame. Instead of
+np.mean / np.std / np.sum over every crop, the planes of the slot union are
+turned into integral images once per frame and every slot's statistics come
+from four corner lookups, vectorized across all slot rectangles. Per-frame
+cost depends on the union area, not on the number of slots.
+
+Callers that run every frame on same-size planes can pass a workspace dict;
+masks, differences and integral images are then written into buffers kept
+there (OpenCV dst= arguments) instead of being allocated per frame.
+"""
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+REFERENCE_DIFF_THRESHOLD = 40  # Gray difference counted as "changed vs reference"
+MOTION_DIFF_THRESHOLD = 30     # Gray difference counted as "moving vs previous frame"
+
+
+def rect_sums(integral: np.ndarray, rects: np.ndarray) -> np.ndarray:
+    """
+    Sums of the source image over rects from its integral image.
+    Args:
+        integral: (h + 1, w + 1) or (h + 1, w + 1, c) integral image
+        rects: (N, 4) int array of x1, y1, x2, y2 (x2 / y2 exclusive)
+    """
+    x1, y1, x2, y2 = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    return integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+
+
+def grid_means(integral: np.ndarray, rects: np.ndarray, grid: int) -> np.ndarray:
+    """
+    Mean of each cell of a grid x grid split of every rect (a tiny thumbnail).
+    Args:
+        integral: (h + 1, w + 1) integral image of a single-channel plane
+        rects: (N, 4) int array of x1, y1, x2, y2; at least grid pixels per side
+    Returns: (N, grid, grid) float64 cell means
+    """
+    rects = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+    steps = np.arange(grid + 1)
+    xs = rects[:, 0:1] + (rects[:, 2:3] - rects[:, 0:1]) * steps // grid  # (N, grid + 1)
+    ys = rects[:, 1:2] + (rects[:, 3:4] - rects[:, 1:2]) * steps // grid
+    corners = integral[ys[:, :, None], xs[:, None, :]]                     # (N, grid + 1, grid + 1)
+    sums = corners[:, 1:, 1:] - corners[:, :-1, 1:] - corners[:, 1:, :-1] + corners[:, :-1, :-1]
+    area = np.diff(ys, axis=1)[:, :, None] * np.diff(xs, axis=1)[:, None, :]
+    return sums / area
+
+
+def workspace_buffer(workspace: Optional[dict], name: str, shape: tuple, dtype) -> Optional[np.ndarray]:
+    """Reusable buffer from workspace (None without one, so OpenCV allocates)."""
+    if workspace is None:
+        return None
+    buffer = workspace.get(name)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype=dtype)
+        workspace[name] = buffer
+    return buffer
+
+
+def integral_shape(plane: np.ndarray) -> tuple:
+    return (plane.shape[0] + 1, plane.shape[1] + 1)
+
+
+def mask_integral(plane: np.ndarray, threshold: int, workspace: Optional[dict] = None,
+                  name: str = "mask") -> np.ndarray:
+    """Integral image of (plane > threshold) as 0 / 1 counts."""
+    mask = workspace_buffer(workspace, name, plane.shape, np.uint8)
+    _, mask = cv2.threshold(plane, threshold, 1, cv2.THRESH_BINARY, dst=mask)
+    return cv2.integral(mask, sum=workspace_buffer(workspace, name + "_sum", integral_shape(plane), np.float64),
+                        sdepth=cv2.CV_64F)
+
+
+def compute_slot_stats(hsv: np.ndarray, edges: np.ndarray, gray: np.ndarray, rects: np.ndarray,
+                       reference_gray: Optional[np.ndarray] = None,
+                       previous_gray: Optional[np.ndarray] = None,
+                       workspace: Optional[dict] = None) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Cheap-ensemble statistics for all slots of one frame.
+    Args:
+        hsv, edges, gray: Planes of the slot union (same height / width)
+        rects: (N, 4) slot rectangles in union coordinates
+        reference_gray / previous_gray: Same-size gray planes of the reference
+            (empty lot) and previous detection frame, if available
+        workspace: Optional dict of reusable buffers (see module docstring)
+    Returns:
+        Arrays of length N: mean_sat, mean_val, std_val, edge_density, plus
+        diff_ratio (reference) and motion_level / motion_ratio (previous frame),
+        which are None when that plane is missing
+    """
+    rects = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+    area = ((rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])).astype(np.float64)
+
+    # S and V: sums and squared sums in one pass each
+    shape = integral_shape(gray)
+    sat_sum, sat_sqsum = cv2.integral2(hsv[:, :, 1],
+                                       sum=workspace_buffer(workspace, "sat_sum", shape, np.float64),
+                                       sqsum=workspace_buffer(workspace, "sat_sqsum", shape, np.float64),
+                                       sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    val_sum, val_sqsum = cv2.integral2(hsv[:, :, 2],
+                                       sum=workspace_buffer(workspace, "val_sum", shape, np.float64),
+                                       sqsum=workspace_buffer(workspace, "val_sqsum", shape, np.float64),
+                                       sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+    mean_sat = rect_sums(sat_sum, rects) / area
+    mean_val = rect_sums(val_sum, rects) / area
+    val_var = rect_sums(val_sqsum, rects) / area - mean_val ** 2
+    std_val = np.sqrt(np.maximum(val_var, 0.0))
+
+    edge_density = rect_sums(mask_integral(edges, 0, workspace, "edges"), rects) / area
+
+    stats = {
+        "mean_sat": mean_sat,
+        "mean_val": mean_val,
+        "std_val": std_val,
+        "edge_density": edge_density,
+        "diff_ratio": None,
+        "motion_level": None,
+        "motion_ratio": None
+    }
+
+    if reference_gray is not None and reference_gray.shape == gray.shape:
+        diff = cv2.absdiff(gray, reference_gray, dst=workspace_buffer(workspace, "diff", gray.shape, np.uint8))
+        stats["diff_ratio"] = rect_sums(mask_integral(diff, REFERENCE_DIFF_THRESHOLD, workspace, "diff_mask"),
+                                        rects) / area
+
+    if previous_gray is not None and previous_gray.shape == gray.shape:
+        motion = cv2.absdiff(gray, previous_gray,
+                             dst=workspace_buffer(workspace, "motion", gray.shape, np.uint8))
+        motion_sum = cv2.integral(motion, sum=workspace_buffer(workspace, "motion_sum", shape, np.float64),
+                                  sdepth=cv2.CV_64F)
+        stats["motion_level"] = rect_sums(motion_sum, rects) / area
+        stats["motion_ratio"] = rect_sums(mask_integral(motion, MOTION_DIFF_THRESHOLD, workspace, "motion_mask"),
+                                          rects) / area
+
+    return stats
@@ -0,0 +1,673 @@
+"""
+Per-crop slot voters as they were before plane sharing (copied unchanged).
+The oracle for test_frame_features: every voter fed shared FrameFeatures
+planes must return exactly what these return on the bare slot crop.
+"""
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+
+def detect_vehicle_color_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+    """
+    Detect vehicle based on color intensity (works for colored toy cars).
+    SHADOW-ROBUST: Focuses on hue and saturation, ignores brightness changes.
+    WHITE-OBJECT-AWARE: Detects white/light objects using brightness uniformity.
+    Returns: (is_occupied, confidence)
+    """
+    try:
+        # Convert to HSV for better color detection
+        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        
+        # Calculate mean saturation and value
+        mean_saturation = float(np.mean(hsv[:, :, 1]))  # type: ignore
+        mean_value = float(np.mean(hsv[:, :, 2]))  # type: ignore
+        std_saturation = float(np.std(hsv[:, :, 1]))  # type: ignore
+        std_value = float(np.std(hsv[:, :, 2]))  # type: ignore
+        
+        # Structural white-object detection using edges
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray, 80, 200)
+        edge_density = np.sum(edges > 0) / edges.size
+        
+        # If significant hard edges exist, it's a real object (not shadow)
+        if edge_density > 0.04:
+            return True, 0.75
+        
+        # SHADOW DETECTION
+        is_likely_shadow = (mean_saturation < 25 and 40 < mean_value < 160)
+        
+        if is_likely_shadow:
+            return False, 0.6
+        
+        # Check for color presence
+        if mean_saturation > 45 and std_saturation > 15:
+            return True, 0.7
+        
+        # Check for dark objects
+        if mean_value < 60:
+            return True, 0.6
+        
+        return False, 0.5
+    
+    except Exception as e:
+        print(f"⚠️ Color detection error: {e}")
+        return False, 0.5
+
+
+def detect_vehicle_texture_based(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+    """
+    Detect vehicle based on texture/edge density.
+    SHADOW-ROBUST: Filters out soft shadow edges, focuses on hard object edges.
+    """
+    try:
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        gray_blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        
+        edges_strong = cv2.Canny(gray_blurred, 90, 220)
+        edges_weak = cv2.Canny(gray_blurred, 20, 60)
+        
+        strong_edge_density = np.sum(edges_strong > 0) / edges_strong.size
+        weak_edge_density = np.sum(edges_weak > 0) / edges_weak.size
+        
+        edge_ratio = strong_edge_density / (weak_edge_density + 0.001)
+        
+        laplacian = cv2.Laplacian(gray_blurred, cv2.CV_64F)
+        texture_var = float(np.var(laplacian))  # type: ignore
+        
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        gradient_magnitude = np.sqrt(sobelx**2 + sobely**2)
+        gradient_std = float(np.std(gradient_magnitude))  # type: ignore
+        
+        # Circular object detection
+        circles = cv2.HoughCircles(
+            gray_blurred, 
+            cv2.HOUGH_GRADIENT, 
+            dp=1.2, 
+            minDist=30,
+            param1=100, 
+            param2=30,
+            minRadius=15, 
+            maxRadius=min(gray.shape[0], gray.shape[1]) // 2
+        )
+        
+        if circles is not None:
+            return True, 0.75
+        
+        is_likely_shadow = (edge_ratio < 0.3 and gradient_std < 30)
+        
+        if is_likely_shadow:
+            return False, 0.55
+        
+        if strong_edge_density > 0.06 or (texture_var > 200 and gradient_std > 35):
+            return True, 0.65
+        
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            total_area = gray.shape[0] * gray.shape[1]
+            if 0.15 < area / total_area < 0.9:
+                return True, 0.6
+        
+        return False, 0.6
+    
+    except Exception as e:
+        print(f"⚠️ Texture detection error: {e}")
+        return False, 0.5
+
+
+def detect_vehicle_difference_based(slot_region_bgr: np.ndarray, 
+                                    reference_region_bgr: Optional[np.ndarray]) -> Tuple[bool, float]:
+    """
+    Detect vehicle by comparing with reference (empty) image.
+    SHADOW-ROBUST: Uses normalized color space and hue comparison.
+    """
+    if reference_region_bgr is None:
+        return False, 0.5
+    
+    try:
+        if slot_region_bgr.shape != reference_region_bgr.shape:
+            reference_region_bgr = cv2.resize(reference_region_bgr, 
+                                             (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
+        
+        diff_bgr = cv2.absdiff(slot_region_bgr, reference_region_bgr)
+        gray_diff = cv2.cvtColor(diff_bgr, cv2.COLOR_BGR2GRAY)
+        
+        hsv_current = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        hsv_reference = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+        
+        hue_diff = cv2.absdiff(hsv_current[:, :, 0], hsv_reference[:, :, 0])
+        hue_diff = np.minimum(hue_diff, 180 - hue_diff)
+        
+        sat_diff = cv2.absdiff(hsv_current[:, :, 1], hsv_reference[:, :, 1])
+        val_diff = cv2.absdiff(hsv_current[:, :, 2], hsv_reference[:, :, 2])
+        
+        mean_hue_diff = float(np.mean(hue_diff))  # type: ignore
+        mean_sat_diff = float(np.mean(sat_diff))  # type: ignore
+        mean_val_diff = float(np.mean(val_diff))  # type: ignore
+        
+        is_likely_shadow = (
+            mean_val_diff > 30 and
+            mean_hue_diff < 15 and
+            mean_sat_diff < 40
+        )
+        
+        gray_current = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        gray_reference = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2GRAY)
+        
+        edges_current = cv2.Canny(gray_current, 30, 100)
+        edges_reference = cv2.Canny(gray_reference, 30, 100)
+        
+        edge_diff = cv2.absdiff(edges_current, edges_reference)
+        new_edges_ratio = np.sum(edge_diff > 0) / edge_diff.size
+        
+        current_edge_density = np.sum(edges_current > 0) / edges_current.size
+        reference_edge_density = np.sum(edges_reference > 0) / edges_reference.size
+        edge_increase = current_edge_density - reference_edge_density
+        
+        if new_edges_ratio > 0.03 and edge_increase > 0.02:
+            return True, 0.7
+        
+        if is_likely_shadow:
+            return False, 0.65
+        
+        combined_hs_diff = (hue_diff.astype(np.float32) * 2 + sat_diff.astype(np.float32)) / 3
+        _, thresh_hs = cv2.threshold(combined_hs_diff.astype(np.uint8), 20, 255, cv2.THRESH_BINARY)
+        _, thresh_bgr = cv2.threshold(gray_diff, 40, 255, cv2.THRESH_BINARY)
+        
+        hs_change_ratio = np.sum(thresh_hs > 0) / thresh_hs.size
+        bgr_change_ratio = np.sum(thresh_bgr > 0) / thresh_bgr.size
+        
+        if hs_change_ratio > 0.12 and bgr_change_ratio > 0.15:
+            return True, min(0.95, 0.75 + hs_change_ratio)
+        elif hs_change_ratio > 0.20:
+            return True, min(0.90, 0.7 + hs_change_ratio)
+        elif bgr_change_ratio > 0.35 and hs_change_ratio > 0.1:
+            return True, 0.65
+        
+        std_current = float(np.std(gray_current))  # type: ignore
+        std_reference = float(np.std(gray_reference))  # type: ignore
+        mean_current = float(np.mean(gray_current))  # type: ignore
+        mean_reference = float(np.mean(gray_reference))  # type: ignore
+        
+        if mean_current > mean_reference + 20 and std_current < std_reference - 10:
+            return True, 0.65
+        
+        return False, 0.7
+    
+    except Exception as e:
+        print(f"⚠️ Difference detection error: {e}")
+        return False, 0.5
+
+
+def detect_shadow(slot_region_bgr: np.ndarray, 
+                  reference_region_bgr: Optional[np.ndarray] = None) -> Tuple[bool, float]:
+    """
+    Dedicated shadow detection to filter out false positives.
+    Returns: (is_shadow, confidence)
+    """
+    try:
+        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        
+        mean_sat = float(np.mean(hsv[:, :, 1]))  # type: ignore
+        mean_val = float(np.mean(hsv[:, :, 2]))  # type: ignore
+        std_val = float(np.std(hsv[:, :, 2]))  # type: ignore
+        
+        sat_check = mean_sat < 30
+        val_check = 40 < mean_val < 170
+        uniformity_check = std_val < 35
+        
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        edges_strong = cv2.Canny(gray, 90, 220)
+        edges_weak = cv2.Canny(gray, 30, 80)
+        
+        strong_edge_ratio = np.sum(edges_strong > 0) / edges_strong.size
+        weak_edge_ratio = np.sum(edges_weak > 0) / edges_weak.size
+        
+        soft_edge_check = (weak_edge_ratio > 0.02 and strong_edge_ratio < 0.03)
+        
+        hue_unchanged = False
+        if reference_region_bgr is not None:
+            try:
+                if slot_region_bgr.shape != reference_region_bgr.shape:
+                    reference_region_bgr = cv2.resize(reference_region_bgr, 
+                                                     (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
+                
+                hsv_ref = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+                
+                hue_diff = cv2.absdiff(hsv[:, :, 0], hsv_ref[:, :, 0])
+                hue_diff = np.minimum(hue_diff, 180 - hue_diff)
+                mean_hue_diff = float(np.mean(hue_diff))  # type: ignore
+                
+                val_diff = cv2.absdiff(hsv[:, :, 2], hsv_ref[:, :, 2])
+                mean_val_diff = float(np.mean(val_diff))  # type: ignore
+                
+                hue_unchanged = (mean_hue_diff < 12 and mean_val_diff > 25)
+            except:
+                pass
+        
+        shadow_score = sum([
+            sat_check,
+            val_check,
+            uniformity_check,
+            soft_edge_check,
+            hue_unchanged
+        ])
+        
+        is_shadow = bool(shadow_score >= 3)
+        confidence = min(0.95, 0.5 + shadow_score * 0.1)
+        
+        return is_shadow, confidence
+    
+    except Exception as e:
+        return False, 0.5
+
+
+def detect_rapid_motion(current_region_bgr: np.ndarray, 
+                        previous_region_bgr: Optional[np.ndarray]) -> Tuple[bool, float]:
+    """
+    Detect rapid motion that indicates a hand or moving object passing through.
+    Returns: (is_rapid_motion, motion_level)
+    """
+    if previous_region_bgr is None:
+        return False, 0.0
+    
+    try:
+        if current_region_bgr.shape != previous_region_bgr.shape:
+            return False, 0.0
+        
+        # Convert to grayscale
+        gray_current = cv2.cvtColor(current_region_bgr, cv2.COLOR_BGR2GRAY)
+        gray_previous = cv2.cvtColor(previous_region_bgr, cv2.COLOR_BGR2GRAY)
+        
+        # Calculate frame difference
+        diff = cv2.absdiff(gray_current, gray_previous)
+        motion_level = float(np.mean(diff))
+        
+        # Calculate motion distribution (hands have large connected motion areas)
+        _, motion_mask = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
+        motion_ratio = np.sum(motion_mask > 0) / motion_mask.size
+        
+        # Rapid motion detection:
+        # - High motion level (pixels changing significantly)
+        # - Large area affected (hand covers significant portion)
+        is_rapid = motion_level > 35.0 and motion_ratio > 0.25
+        
+        return is_rapid, motion_level
+    except:
+        return False, 0.0
+
+
+def detect_vehicle_ensemble(slot_region_bgr: np.ndarray, 
+                           reference_region_bgr: Optional[np.ndarray] = None,
+                           previous_region_bgr: Optional[np.ndarray] = None,
+                           use_ai: bool = True) -> Tuple[bool, float, bool]:
+    """
+    🚀 OPTIMIZED FAST DETECTION - Single pass, minimal conversions
+    Target: 30+ FPS by reducing redundant operations
+    Returns: (is_occupied, confidence, is_shadow)
+    """
+    try:
+        # === SINGLE COLOR CONVERSION (do once, reuse) ===
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        
+        h, s, v = hsv[:, :, 0], hsv[:, :, 1], hsv[:, :, 2]
+        
+        # === FAST STATISTICS (vectorized) ===
+        mean_sat = float(np.mean(s))
+        mean_val = float(np.mean(v))
+        std_val = float(np.std(v))
+        
+        # === SINGLE EDGE DETECTION ===
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = np.sum(edges > 0) / edges.size
+        
+        # === RAPID MOTION CHECK (lightweight) ===
+        if previous_region_bgr is not None:
+            try:
+                if slot_region_bgr.shape == previous_region_bgr.shape:
+                    gray_prev = cv2.cvtColor(previous_region_bgr, cv2.COLOR_BGR2GRAY)
+                    diff = cv2.absdiff(gray, gray_prev)
+                    motion_level = float(np.mean(diff))
+                    motion_ratio = np.sum(diff > 30) / diff.size
+                    
+                    # Rapid motion = transient object (hand)
+                    if motion_level > 35.0 and motion_ratio > 0.25:
+                        return False, 0.8, False
+            except:
+                pass
+        
+        # === SHADOW DETECTION (fast check) ===
+        is_shadow = False
+        shadow_conf = 0.0
+        
+        # Shadows: low saturation, uniform, few edges
+        if mean_sat < 30 and std_val < 30 and edge_density < 0.02:
+            is_shadow = True
+            shadow_conf = 0.85
+            return False, shadow_conf, True
+        
+        # === FAST OCCUPANCY DETECTION ===
+        score = 0.0
+        
+        # Edge-based (objects have structure)
+        if edge_density > 0.03:
+            score += 0.25
+        if edge_density > 0.06:
+            score += 0.25
+        
+        # Color saturation (colored objects)
+        if mean_sat > 40:
+            score += 0.2
+        if mean_sat > 70:
+            score += 0.15
+        
+        # Texture variance
+        if std_val > 25:
+            score += 0.15
+        
+        # Reference comparison (if available)
+        if reference_region_bgr is not None:
+            try:
+                if slot_region_bgr.shape == reference_region_bgr.shape:
+                    ref_gray = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2GRAY)
+                    diff = cv2.absdiff(gray, ref_gray)
+                    diff_ratio = np.sum(diff > 40) / diff.size
+                    
+                    if diff_ratio > 0.15:
+                        score += 0.3
+                    if diff_ratio > 0.30:
+                        score += 0.2
+            except:
+                pass
+        
+        # Dark object detection
+        if mean_val < 60 and edge_density > 0.02:
+            score += 0.2
+        
+        # White/bright object detection
+        if mean_val > 200 and edge_density > 0.02:
+            score += 0.2
+        
+        is_occupied = score >= 0.45
+        confidence = min(0.95, 0.5 + score * 0.5)
+        
+        return is_occupied, confidence, is_shadow
+        
+    except Exception as e:
+        return False, 0.5, False
+
+
+def detect_vehicle_ensemble_full(slot_region_bgr: np.ndarray, 
+                           reference_region_bgr: Optional[np.ndarray] = None,
+                           previous_region_bgr: Optional[np.ndarray] = None,
+                           use_ai: bool = True) -> Tuple[bool, float, bool]:
+    """
+    FULL Ensemble detection - used only every Nth frame for accuracy validation.
+    Returns: (is_occupied, confidence, is_shadow)
+    """
+    
+    # First check for rapid motion (hand passing through)
+    is_rapid_motion, motion_level = detect_rapid_motion(slot_region_bgr, previous_region_bgr)
+    if is_rapid_motion:
+        return False, 0.8, False
+    
+    # Check if this is likely a shadow (dark area with no internal structure)
+    is_shadow_region, shadow_confidence = is_likely_shadow(slot_region_bgr, reference_region_bgr)
+    
+    if is_shadow_region and shadow_confidence > 0.75:
+        return False, shadow_confidence, True
+    
+    votes = []
+    confidences = []
+    weights = []
+    
+    # Method 1: Color-based detection
+    is_occ_color, conf_color = detect_vehicle_color_based(slot_region_bgr)
+    votes.append(is_occ_color)
+    confidences.append(conf_color)
+    weights.append(1.5)
+    
+    # Method 2: Texture-based detection
+    is_occ_texture, conf_texture = detect_vehicle_texture_based(slot_region_bgr)
+    votes.append(is_occ_texture)
+    confidences.append(conf_texture)
+    weights.append(1.5)
+    
+    # Method 3: Simple object detection (edges, gradients, structure)
+    is_occ_simple, conf_simple = detect_object_simple(slot_region_bgr)
+    votes.append(is_occ_simple)
+    confidences.append(conf_simple)
+    weights.append(2.0)
+    
+    # Method 4: Internal structure check (real objects have internal edges)
+    has_structure, structure_conf = has_internal_structure(slot_region_bgr)
+    votes.append(has_structure)
+    confidences.append(structure_conf)
+    weights.append(2.5)  # High weight - this is key for shadow rejection
+    
+    # If it looks like a shadow, add negative vote
+    if is_shadow_region:
+        votes.append(False)
+        confidences.append(shadow_confidence)
+        weights.append(2.0)
+    
+    weighted_occupied_votes = sum(w for v, w in zip(votes, weights) if v)
+    weighted_vacant_votes = sum(w for v, w in zip(votes, weights) if not v)
+    total_weight = sum(weights)
+    
+    is_occupied = weighted_occupied_votes > weighted_vacant_votes
+    
+    weighted_conf = sum(c * w for c, w in zip(confidences, weights)) / total_weight
+    vote_agreement = max(weighted_occupied_votes, weighted_vacant_votes) / total_weight
+    final_confidence = float(weighted_conf * vote_agreement)
+    
+    return is_occupied, final_confidence, is_shadow_region
+
+
+def is_likely_shadow(slot_region_bgr: np.ndarray, 
+                     reference_region_bgr: Optional[np.ndarray] = None) -> Tuple[bool, float]:
+    """
+    Determine if a region is likely a shadow rather than an object.
+    
+    Shadows have these characteristics:
+    - Darker than reference but same hue
+    - Low internal edge density (uniform darkness)
+    - Low color saturation variation
+    - No distinct internal structure
+    """
+    try:
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        
+        # Check 1: Internal edge density (shadows have few internal edges)
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = np.sum(edges > 0) / edges.size
+        low_edges = edge_density < 0.02  # Shadows have very few internal edges
+        
+        # Check 2: Color uniformity (shadows are uniformly dark)
+        val_std = float(np.std(hsv[:, :, 2]))
+        sat_std = float(np.std(hsv[:, :, 1]))
+        uniform_color = val_std < 30 and sat_std < 25
+        
+        # Check 3: Low saturation overall (shadows desaturate colors)
+        mean_sat = float(np.mean(hsv[:, :, 1]))
+        low_saturation = mean_sat < 50
+        
+        # Check 4: If we have reference, check if only brightness changed
+        hue_preserved = False
+        if reference_region_bgr is not None:
+            try:
+                if slot_region_bgr.shape != reference_region_bgr.shape:
+                    reference_region_bgr = cv2.resize(reference_region_bgr, 
+                                                     (slot_region_bgr.shape[1], slot_region_bgr.shape[0]))
+                
+                hsv_ref = cv2.cvtColor(reference_region_bgr, cv2.COLOR_BGR2HSV)
+                
+                # Hue difference (shadows preserve hue)
+                hue_diff = cv2.absdiff(hsv[:, :, 0], hsv_ref[:, :, 0])
+                hue_diff = np.minimum(hue_diff, 180 - hue_diff)
+                mean_hue_diff = float(np.mean(hue_diff))
+                
+                # Value difference (shadows are darker)
+                val_diff = float(np.mean(hsv_ref[:, :, 2])) - float(np.mean(hsv[:, :, 2]))
+                
+                # Shadow: hue similar, but darker
+                hue_preserved = mean_hue_diff < 15 and val_diff > 20
+            except:
+                pass
+        
+        # Calculate shadow score
+        shadow_indicators = sum([low_edges, uniform_color, low_saturation, hue_preserved])
+        
+        # Need multiple indicators to call it a shadow
+        is_shadow = shadow_indicators >= 3
+        confidence = min(0.95, 0.5 + shadow_indicators * 0.15)
+        
+        return is_shadow, confidence
+        
+    except Exception as e:
+        return False, 0.5
+
+
+def has_internal_structure(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+    """
+    Check if the region has internal structure (edges, texture, patterns).
+    Real objects have internal detail, shadows don't.
+    
+    This helps detect:
+    - White objects (they still have edges/structure)
+    - Colored objects (they have texture)
+    
+    And reject:
+    - Shadows (uniform darkness, no internal edges)
+    """
+    try:
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        
+        # Edge detection at multiple scales
+        edges_fine = cv2.Canny(gray, 30, 100)
+        edges_coarse = cv2.Canny(gray, 50, 150)
+        
+        edge_density_fine = np.sum(edges_fine > 0) / edges_fine.size
+        edge_density_coarse = np.sum(edges_coarse > 0) / edges_coarse.size
+        
+        # Gradient magnitude (texture indicator)
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        gradient_mag = np.sqrt(sobelx**2 + sobely**2)
+        mean_gradient = float(np.mean(gradient_mag))
+        max_gradient = float(np.max(gradient_mag))
+        
+        # Local contrast (variance in small windows)
+        kernel_size = max(5, min(gray.shape) // 10)
+        local_mean = cv2.blur(gray.astype(np.float32), (kernel_size, kernel_size))
+        local_var = cv2.blur((gray.astype(np.float32) - local_mean)**2, (kernel_size, kernel_size))
+        mean_local_var = float(np.mean(np.sqrt(local_var)))
+        
+        # Scoring
+        score = 0
+        
+        # Fine edges (detail)
+        if edge_density_fine > 0.03:
+            score += 1
+        if edge_density_fine > 0.06:
+            score += 1
+            
+        # Coarse edges (object boundaries)
+        if edge_density_coarse > 0.02:
+            score += 1
+            
+        # Gradient (texture)
+        if mean_gradient > 12:
+            score += 1
+        if mean_gradient > 25:
+            score += 1
+            
+        # Strong edges somewhere (object boundary)
+        if max_gradient > 100:
+            score += 1
+            
+        # Local contrast (internal detail)
+        if mean_local_var > 10:
+            score += 1
+        if mean_local_var > 20:
+            score += 1
+        
+        has_structure = score >= 3
+        confidence = min(0.95, 0.4 + score * 0.08)
+        
+        return has_structure, confidence
+        
+    except Exception as e:
+        return False, 0.5
+
+
+def detect_object_simple(slot_region_bgr: np.ndarray) -> Tuple[bool, float]:
+    """
+    Simple object detection based on visual complexity.
+    Detects if there's any significant object in the region.
+    """
+    try:
+        gray = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2GRAY)
+        
+        # Edge detection
+        edges = cv2.Canny(gray, 50, 150)
+        edge_density = np.sum(edges > 0) / edges.size
+        
+        # Color variance
+        hsv = cv2.cvtColor(slot_region_bgr, cv2.COLOR_BGR2HSV)
+        hue_std = float(np.std(hsv[:, :, 0]))
+        sat_std = float(np.std(hsv[:, :, 1]))
+        val_std = float(np.std(hsv[:, :, 2]))
+        
+        # Gradient magnitude
+        sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        gradient_mag = np.sqrt(sobelx**2 + sobely**2)
+        mean_gradient = float(np.mean(gradient_mag))
+        
+        # Score based on multiple factors
+        score = 0
+        
+        # Edge density check (objects have edges)
+        if edge_density > 0.03:
+            score += 1
+        if edge_density > 0.06:
+            score += 1
+            
+        # Hue variation (colored objects)
+        if hue_std > 15:
+            score += 1
+        if hue_std > 30:
+            score += 1
+            
+        # Saturation variation
+        if sat_std > 30:
+            score += 1
+            
+        # Value variation (contrast)
+        if val_std > 25:
+            score += 1
+            
+        # Gradient (sharp features)
+        if mean_gradient > 15:
+            score += 1
+        if mean_gradient > 30:
+            score += 1
+        
+        # Need at least 3 indicators to consider occupied
+        is_occupied = score >= 3
+        confidence = min(0.95, 0.5 + score * 0.08)
+        
+        return is_occupied, confidence
+        
+    except Exception as e:
+        print(f"⚠️ Simple detection error: {e}")
+        return False, 0.5
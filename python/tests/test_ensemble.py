@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+ai_detection = pytest.importorskip("ai_detection")
+
+# Every threshold ensemble_decision compares against, per statistic
+THRESHOLDS = {
+    "mean_sat": [30, 40, 70],
+    "mean_val": [60, 200],
+    "std_val": [25, 30],
+    "edge_density": [0.02, 0.03, 0.06],
+    "diff_ratio": [0.15, 0.30],
+    "motion_level": [35.0],
+    "motion_ratio": [0.25],
+}
+RANGES = {
+    "mean_sat": 255.0, "mean_val": 255.0, "std_val": 128.0, "edge_density": 0.2,
+    "diff_ratio": 1.0, "motion_level": 80.0, "motion_ratio": 1.0,
+}
+
+
+def random_stats(rng, n):
+    """Random values, a third of them exactly on a threshold or one ulp either side."""
+    stats = {}
+    for name, limits in THRESHOLDS.items():
+        values = rng.random(n) * RANGES[name]
+        edges = np.array(limits, dtype=np.float64)
+        edges = np.concatenate([edges, np.nextafter(edges, -np.inf), np.nextafter(edges, np.inf)])
+        on_edge = rng.random(n) < 1 / 3
+        values[on_edge] = rng.choice(edges, on_edge.sum())
+        stats[name] = values
+    return stats
+
+
+def scalar_decisions(stats, n):
+    def value(name, i):
+        column = stats.get(name)
+        if column is None or np.isnan(column[i]):
+            return None
+        return float(column[i])
+
+    return [ai_detection.ensemble_decision(
+        value("mean_sat", i), value("mean_val", i), value("std_val", i), value("edge_density", i),
+        value("diff_ratio", i), value("motion_level", i), value("motion_ratio", i)) for i in range(n)]
+
+
+def assert_identical(stats, n):
+    occupied, confidence, shadow = ai_detection.ensemble_decisions(**stats)
+    expected = scalar_decisions(stats, n)
+
+    assert occupied.tolist() == [e[0] for e in expected]
+    assert confidence.tolist() == [e[1] for e in expected]  # Exact float equality
+    assert shadow.tolist() == [e[2] for e in expected]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar(seed):
+    rng = np.random.default_rng(seed)
+    assert_identical(random_stats(rng, 5000), 5000)
+
+
+def test_batch_matches_scalar_without_reference_or_motion():
+    stats = random_stats(np.random.default_rng(10), 5000)
+    for name in ("diff_ratio", "motion_level", "motion_ratio"):
+        stats[name] = None
+    assert_identical(stats, 5000)
+
+
+def test_nan_entries_match_missing_values():
+    rng = np.random.default_rng(11)
+    stats = random_stats(rng, 5000)
+    stats["diff_ratio"][rng.random(5000) < 0.3] = np.nan  # No reference for these slots
+    no_previous = rng.random(5000) < 0.3                   # Motion level and ratio go missing together
+    stats["motion_level"][no_previous] = np.nan
+    stats["motion_ratio"][no_previous] = np.nan
+    assert_identical(stats, 5000)
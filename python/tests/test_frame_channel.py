@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+
+import pytest
+
+from frame_channel import ChannelClosed, FrameChannel, LatestFrameSlot
+
+flask = pytest.importorskip("flask")
+flask_sock = pytest.importorskip("flask_sock")
+simple_websocket = pytest.importorskip("simple_websocket")
+from werkzeug.serving import make_server  # noqa: E402
+
+
+def test_latest_frame_slot_keeps_newest():
+    slot = LatestFrameSlot()
+    for frame in (1, 2, 3):
+        slot.put(frame)
+    assert slot.get(timeout=0) == 3
+    assert slot.dropped == 2
+    assert slot.get(timeout=0) is None
+
+    slot.close()
+    assert slot.closed
+    assert slot.get(timeout=1) is None
+
+
+@pytest.fixture
+def channel_server():
+    """Local frame channel server; yields (url, state): set state["process"], read state["channel"]."""
+    app = flask.Flask(__name__)
+    sock = flask_sock.Sock(app)
+    state = {}
+
+    @sock.route("/ws/frames/<spot_id>")
+    def frames(ws, spot_id):
+        state["channel"] = FrameChannel(ws, state["process"])
+        state["channel"].run()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"ws://127.0.0.1:{server.server_port}/ws/frames/A1", state
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+def receive_json(client, timeout=5):
+    message = client.receive(timeout=timeout)
+    assert message is not None, "no message from the frame channel"
+    return json.loads(message)
+
+
+def test_binary_and_base64_frames(channel_server):
+    url, state = channel_server
+    state["process"] = lambda item: [{"type": "occupancy", "bytes": len(item["frame_bytes"] or b""),
+                                      "b64": item["frame_b64"], "timestamp": item["timestamp"],
+                                      "delta": item["delta"], "ack_seq": item["ack_seq"]}]
+    client = simple_websocket.Client.connect(url)
+    try:
+        client.send(json.dumps({"timestamp": 123, "delta": True, "ack_seq": 7}))
+        client.send(b"\xff\xd8jpeg\xff\xd9")
+        message = receive_json(client)
+        assert message["bytes"] == 8
+        assert (message["timestamp"], message["delta"], message["ack_seq"]) == (123, True, 7)
+        assert message["frames_dropped"] == 0
+
+        # Metadata applies to one frame only; base64 frames carry their own
+        client.send(json.dumps({"frame": "aGVsbG8=", "timestamp": 456}))
+        message = receive_json(client)
+        assert (message["b64"], message["timestamp"], message["delta"]) == ("aGVsbG8=", 456, False)
+
+        client.send("not json")
+        assert receive_json(client) == {"type": "error", "error": "Invalid JSON message"}
+    finally:
+        client.close()
+
+
+def test_slow_processing_keeps_only_newest_frame(channel_server):
+    url, state = channel_server
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def process(item):
+        seen.append(item["frame_bytes"])
+        started.set()
+        release.wait(5)
+        return [{"type": "occupancy", "frame": item["frame_bytes"].decode()}]
+
+    state["process"] = process
+    client = simple_websocket.Client.connect(url)
+    try:
+        client.send(b"0")
+        assert started.wait(5)
+        # Frame 0 is being processed; 1-3 are replaced by 4 while it runs
+        for i in range(1, 5):
+            client.send(f"{i}".encode())
+        for _ in range(50):
+            if state["channel"].frames_received == 5:
+                break
+            time.sleep(0.05)
+        release.set()
+        first, last = receive_json(client), receive_json(client)
+        assert first["frame"] == "0"
+        assert last["frame"] == "4"
+        assert last["frames_dropped"] == 3
+        assert seen == [b"0", b"4"]
+    finally:
+        client.close()
+
+
+def test_channel_closed_sends_error_and_disconnects(channel_server):
+    url, state = channel_server
+
+    def process(item):
+        raise ChannelClosed("Detection session stopped")
+
+    state["process"] = process
+    client = simple_websocket.Client.connect(url)
+    client.send(b"frame")
+    assert receive_json(client) == {"type": "error", "error": "Detection session stopped"}
+    with pytest.raises(simple_websocket.ConnectionClosed):
+        for _ in range(10):
+            client.receive(timeout=1)
+
+
+def test_session_replacement_closes_channel():
+    pytest.importorskip("torch")
+    import cv2
+    import numpy as np
+    import ai_detection
+
+    if ai_detection.SOCK is None:
+        pytest.skip("flask-sock not available to ai_detection")
+    api = ai_detection.app.test_client()
+    start = {"parking_spot_id": "ws_replace",
+             "grid_config": {"cells": [{"slot_number": 1, "bbox": [10, 10, 100, 100]}]}}
+    assert api.post("/start-detection", json=start).status_code == 200
+    jpeg = cv2.imencode(".jpg", np.full((240, 320, 3), 80, np.uint8))[1].tobytes()
+
+    server = make_server("127.0.0.1", 0, ai_detection.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = simple_websocket.Client.connect(f"ws://127.0.0.1:{server.server_port}/ws/frames/ws_replace")
+    try:
+        client.send(jpeg)
+        message = receive_json(client, timeout=30)
+        assert message["type"] == "occupancy"
+
+        assert api.post("/start-detection", json=start).status_code == 200
+        client.send(jpeg)
+        assert receive_json(client, timeout=30) == {
+            "type": "error", "error": "Detection session was restarted; reconnect"}
+        with pytest.raises(simple_websocket.ConnectionClosed):
+            for _ in range(10):
+                client.receive(timeout=1)
+    finally:
+        if client.connected:
+            client.close()
+        api.post("/stop-detection", json={"parking_spot_id": "ws_replace"})
+        server.shutdown()
+        thread.join(timeout=5)
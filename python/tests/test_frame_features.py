@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from frame_features import FrameFeatures, RegionFeatures
+
+cv2 = pytest.importorskip("cv2")
+
+
+def scene(seed, height=360, width=480):
+    """Textured lot with coloured, dark, bright and shadow-like blobs straddling slot lines."""
+    rng = np.random.default_rng(seed)
+    frame = cv2.GaussianBlur(rng.integers(60, 140, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    for _ in range(12):
+        x, y = int(rng.integers(0, width - 40)), int(rng.integers(0, height - 40))
+        w, h = int(rng.integers(20, 120)), int(rng.integers(20, 90))
+        color = [int(c) for c in rng.integers(0, 256, 3)]
+        if rng.random() < 0.3:
+            frame[y:y + h, x:x + w] = (frame[y:y + h, x:x + w] * 0.5).astype(np.uint8)  # Shadow
+        else:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, -1)
+            cv2.circle(frame, (x + w // 2, y + h // 2), max(4, min(w, h) // 4), (255 - color[0], 30, 200), 2)
+    return frame
+
+
+def grid_boxes(height=360, width=480, rows=3, cols=4):
+    """Tiled slots: the union is covered once, so planes are shared."""
+    step_x, step_y = width // cols, height // rows
+    return [(c * step_x, r * step_y, (c + 1) * step_x, (r + 1) * step_y)
+            for r in range(rows) for c in range(cols)]
+
+
+def overlapping_boxes():
+    """Perspective-style slots overlapping their neighbours."""
+    return [(10 + i * 70, 40 + (i % 2) * 20, 130 + i * 70, 200 + (i % 2) * 30) for i in range(6)]
+
+
+def sparse_boxes():
+    """Slots covering a small part of their union: each slot converts its own pixels."""
+    return [(0, 0, 60, 60), (400, 280, 470, 350)]
+
+
+LAYOUTS = [grid_boxes(), overlapping_boxes(), sparse_boxes()]
+
+
+@pytest.mark.parametrize("boxes", LAYOUTS)
+def test_slot_planes_match_per_crop(boxes):
+    frame = scene(0)
+    features = FrameFeatures(frame, boxes)
+    for x1, y1, x2, y2 in boxes:
+        crop = frame[y1:y2, x1:x2].copy()
+        slot = features.slot((x1, y1, x2, y2))
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+
+        assert np.array_equal(slot.gray, gray)
+        assert np.array_equal(slot.hsv, cv2.cvtColor(crop, cv2.COLOR_BGR2HSV))
+        assert np.array_equal(slot.blurred, blurred)
+        for low, high in [(30, 100), (50, 150), (80, 200), (90, 220)]:
+            assert np.array_equal(slot.edges(low, high), cv2.Canny(gray, low, high))
+        for low, high in [(20, 60), (90, 220)]:
+            assert np.array_equal(slot.edges(low, high, blurred=True), cv2.Canny(blurred, low, high))
+
+
+def test_layouts_cover_shared_and_per_slot_paths():
+    assert FrameFeatures(scene(0), grid_boxes()).shared
+    assert FrameFeatures(scene(0), overlapping_boxes()).shared
+    assert not FrameFeatures(scene(0), sparse_boxes()).shared
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("boxes", LAYOUTS)
+def test_voters_match_per_crop_functions(seed, boxes):
+    pytest.importorskip("torch")
+    ai = pytest.importorskip("ai_detection")
+    baseline = pytest.importorskip("baseline_voters")
+
+    frame, reference_frame, previous_frame = scene(seed), scene(seed + 100), scene(seed + 200)
+    if seed % 2:
+        previous_frame = frame.copy()  # Still scene: motion voters see no motion
+    features = FrameFeatures(frame, boxes)
+
+    for box in boxes:
+        x1, y1, x2, y2 = box
+        region = frame[y1:y2, x1:x2]
+        reference = reference_frame[y1:y2, x1:x2].copy()
+        previous = previous_frame[y1:y2, x1:x2].copy()
+        fused = features.slot(box)
+        reference_features = RegionFeatures(reference).precompute(ai.REFERENCE_EDGE_THRESHOLDS, ("gray", "val"))
+        crop = region.copy()
+
+        checks = {
+            "color": (baseline.detect_vehicle_color_based(crop),
+                      ai.detect_vehicle_color_based(region, fused)),
+            "texture": (baseline.detect_vehicle_texture_based(crop),
+                        ai.detect_vehicle_texture_based(region, fused)),
+            "difference": (baseline.detect_vehicle_difference_based(crop, reference),
+                           ai.detect_vehicle_difference_based(region, reference, fused, reference_features)),
+            "shadow": (baseline.detect_shadow(crop, reference),
+                       ai.detect_shadow(region, reference, fused, reference_features)),
+            "rapid_motion": (baseline.detect_rapid_motion(crop, previous),
+                             ai.detect_rapid_motion(region, previous, fused)),
+            "likely_shadow": (baseline.is_likely_shadow(crop, reference),
+                              ai.is_likely_shadow(region, reference, fused, reference_features)),
+            "structure": (baseline.has_internal_structure(crop),
+                          ai.has_internal_structure(region, fused)),
+            "simple": (baseline.detect_object_simple(crop),
+                       ai.detect_object_simple(region, fused)),
+            "ensemble": (baseline.detect_vehicle_ensemble(crop, reference, previous, use_ai=False),
+                         ai.detect_vehicle_ensemble(region, reference, previous, use_ai=False,
+                                                    features=fused, reference_features=reference_features)),
+            "ensemble_full": (baseline.detect_vehicle_ensemble_full(crop, reference, previous),
+                              ai.detect_vehicle_ensemble_full(region, reference, previous, features=fused,
+                                                              reference_features=reference_features)),
+        }
+        for name, (expected, actual) in checks.items():
+            assert tuple(actual) == tuple(expected), f"{name} differs for slot {box}"
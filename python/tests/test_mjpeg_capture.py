@@ -0,0 +1,123 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from mjpeg_capture import MjpegCapture, make_mjpeg_server
+
+cv2 = pytest.importorskip("cv2")
+
+
+def encode(seed, progressive=False, restart_interval=0, size=(120, 160)):
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 255, (*size, 3), dtype=np.uint8), (0, 0), 1)
+    params = [cv2.IMWRITE_JPEG_QUALITY, 80, cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive),
+              cv2.IMWRITE_JPEG_RST_INTERVAL, restart_interval]
+    return cv2.imencode(".jpg", image, params)[1].tobytes()
+
+
+def with_exif_thumbnail(jpeg):
+    """Insert an APP1/EXIF segment that embeds a complete JPEG (its own SOI ... EOI)."""
+    payload = b"Exif\x00\x00II*\x00" + bytes(16) + encode(99, size=(24, 32))
+    return jpeg[:2] + b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload + jpeg[2:]
+
+
+def multipart(jpegs):
+    return b"".join(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(j)
+                    + j + b"\r\n" for j in jpegs)
+
+
+def feed(capture, stream, chunk_sizes):
+    """Feed stream in chunks; returns every JPEG extract_latest_jpeg handed out."""
+    buffer, returned, pos, i = bytearray(), [], 0, 0
+    while pos < len(stream):
+        size = chunk_sizes[i % len(chunk_sizes)]
+        buffer += stream[pos:pos + size]
+        pos, i = pos + size, i + 1
+        jpeg = capture.extract_latest_jpeg(buffer)
+        if jpeg is not None:
+            returned.append(jpeg)
+    return returned, buffer
+
+
+FRAMES = [encode(0), with_exif_thumbnail(encode(1)), encode(2, progressive=True),
+          with_exif_thumbnail(encode(3, restart_interval=4)), encode(4, restart_interval=1)]
+
+
+@pytest.mark.parametrize("chunk_sizes", [[1], [2, 3, 5, 7], [4096], [65536], [len(multipart(FRAMES))]])
+def test_split_and_concatenated_chunks(chunk_sizes):
+    capture = MjpegCapture("http://unused")
+    returned, _ = feed(capture, multipart(FRAMES), chunk_sizes)
+
+    assert capture.frames_captured == len(FRAMES)
+    assert returned[-1] == FRAMES[-1]
+    # Frames completed in one chunk collapse to the newest; each one comes back whole
+    assert all(jpeg in FRAMES for jpeg in returned)
+    if chunk_sizes == [1]:
+        assert returned == FRAMES
+
+
+def test_exif_thumbnail_does_not_end_frame():
+    frame = with_exif_thumbnail(encode(5))
+    capture = MjpegCapture("http://unused")
+    returned, _ = feed(capture, multipart([frame]), [1000])
+
+    assert returned == [frame]
+    assert cv2.imdecode(np.frombuffer(returned[0], np.uint8), cv2.IMREAD_COLOR).shape == (120, 160, 3)
+
+
+def test_partial_frame_waits_for_the_rest():
+    capture = MjpegCapture("http://unused")
+    stream = multipart([FRAMES[1]])
+    buffer = bytearray(stream[:len(stream) // 2])
+
+    assert capture.extract_latest_jpeg(buffer) is None
+    assert capture.frames_captured == 0
+    buffer += stream[len(stream) // 2:]
+    assert capture.extract_latest_jpeg(buffer) == FRAMES[1]
+    assert len(buffer) < 4  # Only the trailing boundary bytes remain
+
+
+@pytest.mark.parametrize("cut", [0.2, 0.5, 0.9])
+def test_truncated_frame_is_dropped(cut):
+    truncated = FRAMES[3][:int(len(FRAMES[3]) * cut)]
+    stream = multipart([FRAMES[0]]) + b"--frame\r\n\r\n" + truncated + multipart(FRAMES[1:3])
+    capture = MjpegCapture("http://unused")
+    returned, _ = feed(capture, stream, [333])
+
+    assert returned[0] == FRAMES[0]
+    assert returned[-1] == FRAMES[2]
+    assert all(jpeg in FRAMES for jpeg in returned)
+
+
+def test_newest_complete_frame_wins():
+    capture = MjpegCapture("http://unused")
+    buffer = bytearray(multipart(FRAMES) + multipart([FRAMES[0]])[:200])
+
+    assert capture.extract_latest_jpeg(buffer) == FRAMES[-1]
+    assert capture.frames_captured == len(FRAMES)
+    assert buffer.startswith(b"\xff\xd8")  # The partial next frame is kept
+
+
+def test_pull_from_local_mjpeg_server(tmp_path):
+    for i, jpeg in enumerate(FRAMES):
+        (tmp_path / f"{i:02d}.jpg").write_bytes(jpeg)
+    frames = [(tmp_path / name).read_bytes() for name in sorted(os.listdir(tmp_path))]
+
+    server = make_mjpeg_server(frames, port=0, fps=100)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    capture = MjpegCapture(f"http://127.0.0.1:{server.server_port}/", timeout=5)
+    capture.start()
+    try:
+        received = [capture.slot.get(timeout=5) for _ in range(10)]
+    finally:
+        capture.stop()
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    assert all(item is not None for item in received)
+    assert all(jpeg in FRAMES for jpeg, _ in received)
+    assert capture.frames_captured >= 10
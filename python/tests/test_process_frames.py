@@ -0,0 +1,49 @@
+import base64
+import io
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+cv2 = pytest.importorskip("cv2")
+ai_detection = pytest.importorskip("ai_detection")
+
+CELLS = [{"slot_number": 1, "bbox": [10, 10, 100, 100]}]
+
+
+@pytest.fixture
+def client():
+    api = ai_detection.app.test_client()
+    for spot_id in ("batch_a", "batch_b"):
+        api.post("/start-detection", json={"parking_spot_id": spot_id, "grid_config": {"cells": CELLS}})
+    yield api
+    for spot_id in ("batch_a", "batch_b"):
+        api.post("/stop-detection", json={"parking_spot_id": spot_id})
+
+
+def jpeg_bytes(value=80):
+    return cv2.imencode(".jpg", np.full((240, 320, 3), value, np.uint8))[1].tobytes()
+
+
+def test_batch_results_keyed_by_spot(client):
+    frame = base64.b64encode(jpeg_bytes()).decode()
+    response = client.post("/process-frames", json={"frames": [
+        {"spot_id": "batch_a", "frame": frame}, {"spot_id": "batch_b", "frame": frame}]})
+
+    assert response.status_code == 200
+    assert sorted(response.get_json()["results"]) == ["batch_a", "batch_b"]
+
+
+def test_duplicate_spot_rejected_before_processing(client):
+    session = ai_detection.active_sessions["batch_a"]
+    frames_before = session.frame_count
+
+    response = client.post("/process-frames", data={
+        "batch_a": (io.BytesIO(jpeg_bytes()), "a.jpg"),
+        "frame_batch_a": (io.BytesIO(jpeg_bytes(90)), "b.jpg"),
+        "batch_b": (io.BytesIO(jpeg_bytes()), "c.jpg"),
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert response.get_json()["duplicates"] == ["batch_a"]
+    assert session.frame_count == frames_before
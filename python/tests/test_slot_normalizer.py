@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import pytest
+
+from slot_normalizer import SlotNormalizer
+
+
+def scene(seed):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, (360, 640, 3), dtype=np.uint8), (0, 0), 1.5)
+
+
+BOXES = {i + 1: (10 + (i % 6) * 100, 20 + (i // 6) * 110, 100 + (i % 6) * 100, 120 + (i // 6) * 110)
+         for i in range(18)}
+
+
+@pytest.mark.parametrize("indices", [[0], [3, 7, 17], [17, 2, 9], list(range(18))])
+def test_subset_stats_match_full_layout(indices):
+    full, subset = SlotNormalizer(48, 32), SlotNormalizer(48, 32)
+    for seed in range(3):  # Later frames add the motion statistics
+        frame = scene(seed)
+        full.load(frame, BOXES, scene(99), reference_version=1)
+        subset.load(frame, BOXES, scene(99), reference_version=1)
+        expected = full.slot_stats()
+        # Clean slots' edge tiles go stale in between; that must not leak into others
+        stats = subset.slot_stats(indices if seed else [i for i in range(18) if i not in indices] or None)
+
+    for name, values in expected.items():
+        assert values is not None
+        np.testing.assert_array_equal(stats[name], values[indices], err_msg=name)
+
+
+def test_default_scores_every_slot_in_layout_order():
+    normalizer = SlotNormalizer(32, 32)
+    normalizer.load(scene(0), BOXES)
+    stats = normalizer.slot_stats()
+    assert stats["diff_ratio"] is None and stats["motion_level"] is None
+    assert len(stats["edge_density"]) == len(BOXES)
+    np.testing.assert_array_equal(normalizer.slot_stats(list(range(len(BOXES))))["edge_density"],
+                                  stats["edge_density"])
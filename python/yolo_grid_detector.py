@@ -8,10 +8,10 @@ import numpy as np
 import os
 import tempfile
 import base64
-from io import BytesIO
-from PIL import Image
 from typing import List, Tuple, Optional, Dict
 
+from frame_decoder import decode_jpeg_bytes
+
 # Global model instance (loaded once)
 YOLO_MODEL = None
 YOLO_LOADED = False
@@ -46,41 +46,60 @@ def load_yolo_model(model_path: str) -> bool:
         return False
 
 
-def decode_base64_image(frame_b64: str) -> Optional[np.ndarray]:
+def decode_base64_image(frame_b64: str, scale: int = 1) -> Optional[np.ndarray]:
     """
     Decode a base64 image string to BGR numpy array.
     Args:
         frame_b64: Base64 encoded image (with or without data URL prefix)
+        scale: Decode at 1/scale resolution (1, 2, 4 or 8)
     Returns:
         BGR numpy array or None if decoding fails
     """
+    img_bytes = decode_base64_bytes(frame_b64)
+    if img_bytes is None:
+        return None
+    
+    return decode_image_bytes(img_bytes, scale)
+
+
+def decode_base64_bytes(frame_b64: str) -> Optional[bytes]:
+    """
+    Decode a base64 image string to the encoded image bytes.
+    Args:
+        frame_b64: Base64 encoded image (with or without data URL prefix)
+    Returns:
+        Encoded image bytes or None if the string is not valid base64
+    """
     try:
         # Remove data URL prefix if present
         if "," in frame_b64:
             frame_b64 = frame_b64.split(",", 1)[1]
         
-        # Decode base64
-        img_bytes = base64.b64decode(frame_b64)
-        
-        if len(img_bytes) < 100:
-            print(f"⚠️ Image data too small: {len(img_bytes)} bytes")
-            return None
-        
-        # Convert to PIL Image
-        pil_image = Image.open(BytesIO(img_bytes))
-        
-        if pil_image.mode != "RGB":
-            pil_image = pil_image.convert("RGB")
-        
-        # Convert to numpy array
-        rgb_array = np.array(pil_image)
-        
-        if rgb_array is None or rgb_array.size == 0:
+        return base64.b64decode(frame_b64)
+    
+    except Exception as e:
+        print(f"⚠️ Image decode error: {e}")
+        return None
+
+
+def decode_image_bytes(img_bytes: bytes, scale: int = 1) -> Optional[np.ndarray]:
+    """
+    Decode raw encoded image bytes (JPEG/PNG) to BGR numpy array.
+    Used directly by binary frame uploads, which skip the base64 step.
+    Single pass: JPEG is decoded straight to BGR (no PIL/RGB round-trip),
+    optionally at reduced resolution in the DCT domain.
+    Args:
+        img_bytes: Encoded image bytes
+        scale: Decode at 1/scale resolution (1, 2, 4 or 8)
+    Returns:
+        BGR numpy array or None if decoding fails
+    """
+    try:
+        if img_bytes is None or len(img_bytes) < 100:
+            print(f"⚠️ Image data too small: {len(img_bytes) if img_bytes else 0} bytes")
             return None
         
-        # Convert RGB to BGR (OpenCV format)
-        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGB2BGR)
-        return bgr_array
+        return decode_jpeg_bytes(img_bytes, scale)
     
     except Exception as e:
         print(f"⚠️ Image decode error: {e}")
@@ -96,18 +115,39 @@ def encode_frame_to_base64(frame_bgr: np.ndarray, quality: int = 85) -> str:
     Returns:
         Base64 data URL string
     """
+    jpeg_bytes = encode_frame_to_jpeg(frame_bgr, quality)
+    if not jpeg_bytes:
+        return ""
+    
+    return jpeg_to_data_url(jpeg_bytes)
+
+
+def encode_frame_to_jpeg(frame_bgr: np.ndarray, quality: int = 85) -> Optional[bytes]:
+    """
+    Encode a BGR frame to JPEG bytes.
+    Args:
+        frame_bgr: BGR numpy array
+        quality: JPEG quality (0-100)
+    Returns:
+        JPEG bytes or None if encoding fails
+    """
     try:
         success, buffer = cv2.imencode('.jpg', frame_bgr, 
                                         [cv2.IMWRITE_JPEG_QUALITY, quality])
         if not success:
-            return ""
+            return None
         
-        b64 = base64.b64encode(buffer).decode('utf-8')
-        return f"data:image/jpeg;base64,{b64}"
+        return buffer.tobytes()
     
     except Exception as e:
         print(f"⚠️ Frame encode error: {e}")
-        return ""
+        return None
+
+
+def jpeg_to_data_url(jpeg_bytes: bytes) -> str:
+    """Wrap already encoded JPEG bytes as a base64 data URL."""
+    b64 = base64.b64encode(jpeg_bytes).decode('utf-8')
+    return f"data:image/jpeg;base64,{b64}"
 
 
 def preprocess_for_detection(frame_bgr: np.ndarray) -> np.ndarray: